@@ -3,7 +3,9 @@ from abc import ABC, abstractmethod
 import time
 from app.services.llm_service import get_llm_service
 from app.services.embedding_service import get_embedding_service
+from app.services.token_ledger import get_token_ledger
 from app.utils.logger import get_logger
+from app.utils.metrics import AGENT_DURATION
 
 class BaseAgent(ABC):
     """Base class for all agents with common functionality"""
@@ -44,18 +46,23 @@ class BaseAgent(ABC):
         self.logger.info(f"Starting execution #{self.execution_count}")
         
         try:
-            result = await self.execute(state)
+            with get_token_ledger().agent_scope(self.name) as usage:
+                result = await self.execute(state)
             execution_time = time.time() - start_time
+            AGENT_DURATION.observe(execution_time, self.name, "success")
             
             self.logger.info(f"Completed in {execution_time:.2f}s")
             if 'agent_outputs' not in result:
                 result['agent_outputs'] = {}
             
             result['agent_outputs'][self.name] = {
+                **result['agent_outputs'].get(self.name, {}),
                 'execution_time': execution_time,
                 'success': True,
                 'timestamp': time.time()
             }
+            if usage.calls:
+                result['agent_outputs'][self.name]['token_usage'] = usage.to_dict()
             
             if 'processing_steps' not in result:
                 result['processing_steps'] = []
@@ -65,6 +72,7 @@ class BaseAgent(ABC):
             
         except Exception as e:
             execution_time = time.time() - start_time
+            AGENT_DURATION.observe(execution_time, self.name, "error")
             self.logger.error(f"Failed after {execution_time:.2f}s: {e}")
             state['error_message'] = f"{self.name} error: {str(e)}"
             
@@ -88,6 +96,21 @@ class BaseAgent(ABC):
         """Log agent output"""
         self.logger.debug(f"Output: {data}")
     
+    def mark_degraded(self, state: Dict[str, Any], stage: str) -> Dict[str, Any]:
+        """
+        Record a stage skipped by the degradation controller
+        
+        Args:
+            state: Current state
+            stage: Skipped stage
+            
+        Returns:
+            State updates carrying the extended 'degradation' entry
+        """
+        degradation = state.get('degradation') or {}
+        self.logger.info(f"Skipping {stage} ({degradation.get('mode')})")
+        return {'degradation': {**degradation, 'skipped': degradation.get('skipped', []) + [stage]}}
+    
     def update_state(
         self,
         state: Dict[str, Any],
@@ -1,4 +1,5 @@
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, List, Tuple
 from app.agents.base_agent import BaseAgent
 from app.prompts.jd_extraction_prompts import (
     JD_EXTRACTOR_SYSTEM_INSTRUCTION,
@@ -6,7 +7,10 @@ from app.prompts.jd_extraction_prompts import (
 )
 from app.models.schemas import URLExtractionResult
 from app.services.jd_fetcher_service import get_jd_fetcher_service
-from app.utils.validators import extract_urls_from_text
+from app.services.vector_store_service import get_vector_store_service
+from app.config import settings
+from app.utils.url_detector import catalog_assessment_url, detect_urls, get_url_detector
+from app.utils.deadline import record_exceeded, run_with_deadline, stage_budget
 
 
 class JDExtractorAgent(BaseAgent):
@@ -15,6 +19,7 @@ class JDExtractorAgent(BaseAgent):
     def __init__(self):
         super().__init__("jd_extractor")
         self.jd_fetcher = get_jd_fetcher_service()
+        self.vector_store = get_vector_store_service()
     
     async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -31,60 +36,36 @@ class JDExtractorAgent(BaseAgent):
         self.log_input({'query': query})
         
         try:
-            extracted_urls = extract_urls_from_text(query)
+            extracted_urls = detect_urls(query)
             
             if extracted_urls:
-                self.logger.info(f"Found {len(extracted_urls)} URLs using regex")
-                primary_url = extracted_urls[0]
-                jd_result = await self.jd_fetcher.fetch_jd_from_url(primary_url)
-                
-                if jd_result['success']:
-                    self.logger.info(f"Successfully fetched JD from {primary_url}")
-                    
-                    return self.update_state(state, {
-                        'has_url': True,
-                        'extracted_urls': extracted_urls,
-                        'jd_text': jd_result['jd_text'],
-                        'jd_extraction_success': True
-                    })
-                else:
-                    self.logger.warning(f"Failed to fetch JD: {jd_result['error_message']}")
-                    
-                    return self.update_state(state, {
-                        'has_url': True,
-                        'extracted_urls': extracted_urls,
-                        'jd_extraction_success': False,
-                        'error_message': jd_result['error_message']
-                    })
-            self.logger.info("No URLs found with regex, trying LLM extraction")
+                self.logger.info(f"Found {len(extracted_urls)} URLs using detector")
+                return await self._fetch_jd(state, extracted_urls)
+            
+            if not settings.JD_URL_LLM_FALLBACK:
+                self.logger.info("No URLs found in query")
+                return self.update_state(state, {
+                    'has_url': False,
+                    'extracted_urls': [],
+                    'jd_extraction_success': False
+                })
+            self.logger.info("No URLs found with detector, trying LLM extraction")
             
             prompt = get_url_extraction_prompt(query)
             
-            result = await self.llm_service.generate_structured_output(
+            result = await run_with_deadline(state, "url_extraction", self.llm_service.generate_structured_output(
                 prompt=prompt,
                 schema=URLExtractionResult,
                 system_instruction=JD_EXTRACTOR_SYSTEM_INSTRUCTION
-            )
+            ))
+            get_url_detector().record_llm_fallback(bool(result.has_url and result.urls))
             
             if result.has_url and result.urls:
                 self.logger.info(f"LLM found URLs: {result.urls}")
-                primary_url = result.primary_url or result.urls[0]
-                jd_result = await self.jd_fetcher.fetch_jd_from_url(primary_url)
-                
-                if jd_result['success']:
-                    return self.update_state(state, {
-                        'has_url': True,
-                        'extracted_urls': result.urls,
-                        'jd_text': jd_result['jd_text'],
-                        'jd_extraction_success': True
-                    })
-                else:
-                    return self.update_state(state, {
-                        'has_url': True,
-                        'extracted_urls': result.urls,
-                        'jd_extraction_success': False,
-                        'error_message': jd_result['error_message']
-                    })
+                urls = result.urls
+                if result.primary_url:
+                    urls = [result.primary_url] + [url for url in urls if url != result.primary_url]
+                return await self._fetch_jd(state, urls)
             self.logger.info("No URLs found in query")
             return self.update_state(state, {
                 'has_url': False,
@@ -92,6 +73,14 @@ class JDExtractorAgent(BaseAgent):
                 'jd_extraction_success': False
             })
             
+        except asyncio.TimeoutError:
+            return self.update_state(state, {
+                'has_url': False,
+                'extracted_urls': [],
+                'jd_extraction_success': False,
+                **record_exceeded(state, "url_extraction")
+            })
+            
         except Exception as e:
             self.logger.error(f"JD extraction failed: {e}")
             
@@ -102,6 +91,94 @@ class JDExtractorAgent(BaseAgent):
                 'error_message': f"JD extraction error: {str(e)}"
             })
 
+    async def _resolve_catalog_urls(self, urls: List[str]) -> Tuple[Dict[str, str], List[str]]:
+        """
+        Look up links to SHL catalog assessments instead of fetching them
+        
+        Catalog pages are served from the catalog cache (LRU, then the
+        assessment_cache table, then Chroma); links that are not in the
+        index are left to the JD fetcher.
+        
+        Args:
+            urls: Extracted URLs
+            
+        Returns:
+            (catalog URL -> assessment text, URLs still to fetch)
+        """
+        texts: Dict[str, str] = {}
+        remaining = []
+        for url in urls:
+            catalog_url = catalog_assessment_url(url)
+            assessment = await self.vector_store.get_assessment_by_url(catalog_url) if catalog_url else None
+            if assessment:
+                texts[catalog_url] = self._assessment_text(assessment)
+            else:
+                remaining.append(url)
+        return texts, remaining
+    
+    @staticmethod
+    def _assessment_text(assessment: Dict[str, Any]) -> str:
+        """JD-like text for a catalog assessment"""
+        lines = [f"Assessment: {assessment['name']}"]
+        if assessment.get('description'):
+            lines.append(assessment['description'])
+        if assessment.get('test_type'):
+            lines.append(f"Test types: {', '.join(assessment['test_type'])}")
+        if assessment.get('job_levels'):
+            lines.append(f"Job levels: {assessment['job_levels'].strip(', ')}")
+        if assessment.get('duration'):
+            lines.append(f"Duration: {assessment['duration']} minutes")
+        return "\n".join(lines)
+    
+    async def _fetch_jd(self, state: Dict[str, Any], urls: List[str]) -> Dict[str, Any]:
+        """
+        Fetch all URLs concurrently and update state with the merged JD
+        
+        Links to catalog assessments are resolved from the catalog cache
+        and their text is put before the fetched JD.
+        
+        Args:
+            state: Graph state
+            urls: Extracted URLs
+            
+        Returns:
+            Updated state
+        """
+        catalog_texts, to_fetch = await self._resolve_catalog_urls(urls)
+        jd_result = {'success': False, 'jd_text': None, 'source_urls': [], 'error_message': None}
+        if to_fetch:
+            budget = stage_budget(state, "jd_fetch")
+            jd_result = await self.jd_fetcher.fetch_jd_from_urls(
+                to_fetch,
+                deadline=None if budget is None else min(budget, settings.JD_FETCH_DEADLINE)
+            )
+        
+        if catalog_texts or jd_result['success']:
+            texts = list(catalog_texts.values()) + ([jd_result['jd_text']] if jd_result['success'] else [])
+            source_urls = list(catalog_texts) + (jd_result['source_urls'] if jd_result['success'] else [])
+            self.logger.info(
+                f"Successfully built JD from {len(catalog_texts)} catalog assessments and "
+                f"{len(source_urls) - len(catalog_texts)} fetched pages ({len(source_urls)}/{len(urls)} URLs merged)"
+            )
+            
+            return self.update_state(state, {
+                'has_url': True,
+                'extracted_urls': urls,
+                'jd_source_urls': source_urls,
+                'jd_text': "\n\n".join(texts),
+                'jd_extraction_success': True
+            })
+        
+        self.logger.warning(f"Failed to fetch JD: {jd_result['error_message']}")
+        
+        return self.update_state(state, {
+            'has_url': True,
+            'extracted_urls': urls,
+            'jd_source_urls': [],
+            'jd_extraction_success': False,
+            'error_message': jd_result['error_message']
+        })
+
 jd_extractor_agent = JDExtractorAgent()
 
 
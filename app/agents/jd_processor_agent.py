@@ -1,13 +1,17 @@
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Optional
 from app.agents.base_agent import BaseAgent
 from app.prompts.jd_extraction_prompts import (
     JD_PROCESSOR_SYSTEM_INSTRUCTION,
     get_jd_enhancement_prompt
 )
 from app.models.schemas import EnhancedQuery
+from app.services.degradation_controller import get_degradation_controller
 from app.config import settings
 from app.utils.helpers import extract_duration_from_text
-from app.utils.assessment_map import get_assessment_map, get_fallback_skill
+from app.utils.assessment_map import match_assessment_terms, match_fallback_skills
+from app.utils.query_rules import extract_query_rules
+from app.utils.deadline import record_exceeded, run_with_deadline
 
 
 class JDProcessorAgent(BaseAgent):
@@ -18,9 +22,13 @@ class JDProcessorAgent(BaseAgent):
     def __init__(self):
         super().__init__("jd_processor")
         self.enable_query_expansion = settings.ENABLE_QUERY_EXPANSION
+        self.enable_query_rules = settings.QUERY_RULES_ENABLED
+        self.path_counts = {'rules': 0, 'llm': 0, 'fallback': 0, 'degraded': 0, 'deadline': 0}
+        self.rule_rejections: Dict[str, int] = {}
         
         self.logger.info(
-            f"JD Processor initialized - Query Expansion: {self.enable_query_expansion}"
+            f"JD Processor initialized - Query Expansion: {self.enable_query_expansion}, "
+            f"Rule fast path: {self.enable_query_rules}"
         )
     
     async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -44,16 +52,27 @@ class JDProcessorAgent(BaseAgent):
         self.log_input({'text_length': len(jd_text)})
         
         try:
-            prompt = get_jd_enhancement_prompt(jd_text)
+            enhanced = self._try_rules(jd_text) if not state.get('jd_text') else None
+            if enhanced is None and get_degradation_controller().should_skip(state, "processor_llm"):
+                self.path_counts['degraded'] += 1
+                return self.update_state(state, {
+                    'enhanced_query': self._fallback_enhanced_query(jd_text),
+                    'agent_outputs': {**state.get('agent_outputs', {}), self.name: {'path': 'degraded'}},
+                    **self.mark_degraded(state, "processor_llm")
+                })
+            path = 'rules' if enhanced else 'llm'
             
-            enhanced = await self.llm_service.generate_structured_output(
-                prompt=prompt,
-                schema=EnhancedQuery,
-                system_instruction=JD_PROCESSOR_SYSTEM_INSTRUCTION
-            )
+            if enhanced is None:
+                prompt = get_jd_enhancement_prompt(jd_text)
+                
+                enhanced = await run_with_deadline(state, "processor", self.llm_service.generate_structured_output(
+                    prompt=prompt,
+                    schema=EnhancedQuery,
+                    system_instruction=JD_PROCESSOR_SYSTEM_INSTRUCTION
+                ))
             
             self.logger.info(
-                f"LLM extraction: {len(enhanced.extracted_skills)} skills, "
+                f"{path.upper()} extraction: {len(enhanced.extracted_skills)} skills, "
                 f"{len(enhanced.required_test_types)} test types, "
                 f"{len(enhanced.key_requirements)} requirements"
             )
@@ -77,27 +96,74 @@ class JDProcessorAgent(BaseAgent):
                 'query_length': len(final_enhanced.cleaned_query)
             })
             
+            self.path_counts[path] += 1
+            return self.update_state(state, {
+                'enhanced_query': final_enhanced,
+                'agent_outputs': {**state.get('agent_outputs', {}), self.name: {'path': path}}
+            })
+            
+        except asyncio.TimeoutError:
+            self.path_counts['deadline'] += 1
             return self.update_state(state, {
-                'enhanced_query': final_enhanced
+                'enhanced_query': self._fallback_enhanced_query(jd_text),
+                'agent_outputs': {**state.get('agent_outputs', {}), self.name: {'path': 'deadline'}},
+                **record_exceeded(state, "processor")
             })
             
         except Exception as e:
             self.logger.error(f"JD processing failed: {e}")
-            fallback_enhanced = EnhancedQuery(
-                original_query=jd_text,
-                cleaned_query=self._create_fallback_query(jd_text),
-                extracted_skills=[],
-                extracted_duration=extract_duration_from_text(jd_text),
-                extracted_job_levels=["Mid-Professional"],
-                required_test_types=["K", "P"],
-                key_requirements=[]
-            )
+            self.path_counts['fallback'] += 1
             
             return self.update_state(state, {
-                'enhanced_query': fallback_enhanced,
+                'enhanced_query': self._fallback_enhanced_query(jd_text),
+                'agent_outputs': {**state.get('agent_outputs', {}), self.name: {'path': 'fallback'}},
                 'error_message': f"JD processing error (using fallback): {str(e)}"
             })
     
+    def _try_rules(self, query: str) -> Optional[EnhancedQuery]:
+        """
+        Build the enhanced query with rules when they are confident enough
+        
+        Args:
+            query: User query
+            
+        Returns:
+            EnhancedQuery, or None when the LLM should be used
+        """
+        if not self.enable_query_rules:
+            return None
+        
+        rules = extract_query_rules(query, settings.QUERY_RULES_MAX_CHARS)
+        confidence = rules.pop('confidence')
+        reasons = rules.pop('reasons')
+        
+        if confidence < settings.QUERY_RULES_MIN_CONFIDENCE:
+            for reason in reasons or ['low_confidence']:
+                key = reason.split(':')[0]
+                self.rule_rejections[key] = self.rule_rejections.get(key, 0) + 1
+            self.logger.info(f"Rule extraction not confident ({confidence:.2f}, {reasons}), using LLM")
+            return None
+        
+        self.logger.info(f"Rule extraction confident ({confidence:.2f}), skipping LLM")
+        return EnhancedQuery(cleaned_query=query, **rules)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get query processing metrics
+        
+        Returns:
+            Counts per extraction path, LLM skip rate and why rules were rejected
+        """
+        total = sum(self.path_counts.values())
+        return {
+            'rules_enabled': self.enable_query_rules,
+            'min_confidence': settings.QUERY_RULES_MIN_CONFIDENCE,
+            'queries': total,
+            **self.path_counts,
+            'llm_skip_rate': self.path_counts['rules'] / total if total else 0.0,
+            'rule_rejections': dict(self.rule_rejections)
+        }
+    
     def _build_optimized_search_query(self, enhanced: EnhancedQuery, original_text: str) -> str:
         """
         Build search query optimized for vector retrieval
@@ -107,13 +173,7 @@ class JDProcessorAgent(BaseAgent):
         2. Map skills to likely assessment names
         3. Include job level and test type context
         """
-        query_parts = []
-
-        assessment_mappings = get_assessment_map()
-        text_lower = original_text.lower()
-        for keyword, assessment_terms in assessment_mappings.items():
-            if keyword in text_lower:
-                query_parts.append(assessment_terms)
+        query_parts = match_assessment_terms(original_text)
         if enhanced.extracted_skills:
             top_skills = enhanced.extracted_skills[:6]
             skills_text = ' '.join(top_skills)
@@ -154,15 +214,21 @@ class JDProcessorAgent(BaseAgent):
         
         return search_query
     
+    def _fallback_enhanced_query(self, text: str) -> EnhancedQuery:
+        """Enhanced query built without the LLM from fallback keywords"""
+        return EnhancedQuery(
+            original_query=text,
+            cleaned_query=self._create_fallback_query(text),
+            extracted_skills=[],
+            extracted_duration=extract_duration_from_text(text),
+            extracted_job_levels=["Mid-Professional"],
+            required_test_types=["K", "P"],
+            key_requirements=[]
+        )
+    
     def _create_fallback_query(self, text: str) -> str:
         """Create basic fallback query when LLM extraction fails"""
-        keywords = []
-        
-        skill_keywords = get_fallback_skill()
-        text_lower = text.lower()
-        for keyword in skill_keywords:
-            if keyword in text_lower:
-                keywords.append(keyword)
+        keywords = match_fallback_skills(text)
         
         if not keywords:
             return text[:200]
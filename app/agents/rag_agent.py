@@ -1,7 +1,10 @@
+import asyncio
 from typing import Dict, Any, List
 from collections import Counter
 from app.agents.base_agent import BaseAgent
 from app.services.vector_store_service import get_vector_store_service
+from app.services.token_ledger import get_token_ledger
+from app.services.degradation_controller import get_degradation_controller
 from app.prompts.rag_prompts import (
     RAG_SYSTEM_INSTRUCTION,
     get_reranking_prompt
@@ -9,6 +12,7 @@ from app.prompts.rag_prompts import (
 from app.config import settings
 from app.models.schemas import EnhancedQuery
 from app.utils.formatters import extract_json_from_response
+from app.utils.deadline import record_exceeded, remaining, run_with_deadline
 
 
 class RAGAgent(BaseAgent):
@@ -63,10 +67,10 @@ class RAGAgent(BaseAgent):
             search_query = enhanced_query.cleaned_query
             
             self.logger.info(f"Vector search query: {search_query[:200]}...")
-            retrieved = await self.vector_store.search_assessments(
+            retrieved = await run_with_deadline(state, "retrieval", self.vector_store.search_assessments(
                 query=search_query,
                 top_k=self.top_k_retrieve
-            )
+            ))
             
             if not retrieved:
                 self.logger.warning("No assessments retrieved from vector search")
@@ -92,10 +96,22 @@ class RAGAgent(BaseAgent):
             filtered = self._filter_by_similarity_threshold(retrieved)
             self.logger.info(f"After threshold filter: {len(filtered)} assessments")
             
-            if self.enable_llm_reranking and len(filtered) > 0:
-                reranked = await self._rerank_with_llm(filtered, enhanced_query)
-                self.logger.info(f"After LLM reranking: {len(reranked)} assessments")
-            else:
+            rerank = self.enable_llm_reranking and len(filtered) > 0
+            rerank_skipped = None
+            time_left = remaining(state)
+            if rerank and get_degradation_controller().should_skip(state, "rerank"):
+                rerank_skipped = 'load'
+            elif rerank and get_token_ledger().over_budget("rerank"):
+                rerank_skipped = 'token_budget'
+            elif rerank and time_left is not None and time_left < settings.DEADLINE_MIN_RERANK:
+                rerank_skipped = 'deadline'
+            if rerank and not rerank_skipped:
+                try:
+                    reranked = await run_with_deadline(state, "rerank", self._rerank_with_llm(filtered, enhanced_query))
+                    self.logger.info(f"After LLM reranking: {len(reranked)} assessments")
+                except asyncio.TimeoutError:
+                    rerank_skipped = 'deadline'
+            if not rerank or rerank_skipped:
                 reranked = sorted(
                     filtered,
                     key=lambda x: x.get('similarity_score', 0),
@@ -119,9 +135,27 @@ class RAGAgent(BaseAgent):
                 'test_type_distribution': stats['test_type_distribution']
             })
             
-            return self.update_state(state, {
+            updates = {
                 'retrieved_assessments': retrieved,
                 'final_recommendations': final_recommendations
+            }
+            if rerank_skipped:
+                updates['agent_outputs'] = {
+                    **state.get('agent_outputs', {}),
+                    self.name: {'rerank_skipped': rerank_skipped}
+                }
+            if rerank_skipped == 'load':
+                updates.update(self.mark_degraded(state, "rerank"))
+            elif rerank_skipped == 'deadline':
+                updates.update(record_exceeded(state, "rerank"))
+            return self.update_state(state, updates)
+            
+        except asyncio.TimeoutError:
+            return self.update_state(state, {
+                'retrieved_assessments': [],
+                'final_recommendations': [],
+                'error_message': 'Vector search did not finish before the request deadline',
+                **record_exceeded(state, "retrieval")
             })
             
         except Exception as e:
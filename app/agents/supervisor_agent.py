@@ -1,3 +1,4 @@
+import asyncio
 from typing import Dict, Any
 from app.agents.base_agent import BaseAgent
 from app.prompts.supervisor_prompts import (
@@ -5,6 +6,8 @@ from app.prompts.supervisor_prompts import (
     get_intent_classification_prompt
 )
 from app.models.schemas import IntentClassification
+from app.services.degradation_controller import get_degradation_controller
+from app.utils.deadline import record_exceeded, run_with_deadline
 class SupervisorAgent(BaseAgent):
     """Agent that classifies user intent and routes to appropriate handler"""
     
@@ -33,13 +36,20 @@ class SupervisorAgent(BaseAgent):
         
         self.log_input({'query': query})
         
+        if get_degradation_controller().should_skip(state, "supervisor_llm"):
+            return self.update_state(state, {
+                'intent': self._fallback_classification(query),
+                'intent_confidence': 0.5,
+                **self.mark_degraded(state, "supervisor_llm")
+            })
+        
         try:
             prompt = get_intent_classification_prompt(query)
-            result = await self.llm_service.generate_structured_output(
+            result = await run_with_deadline(state, "supervisor", self.llm_service.generate_structured_output(
                 prompt=prompt,
                 schema=IntentClassification,
                 system_instruction=SUPERVISOR_SYSTEM_INSTRUCTION
-            )
+            ))
             
             self.logger.info(
                 f"Classified intent: {result.intent} "
@@ -56,6 +66,13 @@ class SupervisorAgent(BaseAgent):
                 'intent_confidence': result.confidence
             })
             
+        except asyncio.TimeoutError:
+            return self.update_state(state, {
+                'intent': self._fallback_classification(query),
+                'intent_confidence': 0.5,
+                **record_exceeded(state, "supervisor")
+            })
+            
         except Exception as e:
             self.logger.error(f"Intent classification failed: {e}")
             intent = self._fallback_classification(query)
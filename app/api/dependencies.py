@@ -1,3 +1,7 @@
+import secrets
+from typing import Optional
+from fastapi import Header, HTTPException
+from app.config import settings
 from app.database.sqlite_db import get_db
 from app.utils.logger import get_logger
 
@@ -15,4 +19,19 @@ def get_db_session():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def require_admin_key(x_api_key: Optional[str] = Header(None)):
+    """
+    Dependency restricting a route to callers with the admin key
+    
+    Args:
+        x_api_key: X-API-Key header, compared with REFRESH_API_KEY
+        
+    Raises:
+        HTTPException: 401 if the key is missing or wrong
+    """
+    if not x_api_key or not secrets.compare_digest(x_api_key, settings.REFRESH_API_KEY):
+        logger.warning("Rejected request with a missing or invalid admin key")
+        raise HTTPException(status_code=401, detail="Invalid or missing API key")
@@ -1,7 +1,15 @@
+import asyncio
+import math
+import secrets
 import time
 from fastapi import Request
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
+from app.config import settings
 from app.utils.logger import get_logger
+from app.utils.metrics import HTTP_DURATION
+from app.utils.profiler import get_request_profiler
+from app.utils.rate_limiter import get_rate_limiter
 
 logger = get_logger("middleware")
 
@@ -14,6 +22,13 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         logger.info(f"Request: {request.method} {request.url.path}")
         response = await call_next(request)
         process_time = time.time() - start_time
+        route = request.scope.get("route")
+        HTTP_DURATION.observe(
+            process_time,
+            request.method,
+            route.path if route is not None else "unmatched",
+            str(response.status_code)
+        )
         logger.info(
             f"Response: {response.status_code} "
             f"({process_time:.3f}s) "
@@ -24,40 +39,72 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Samples one request's stacks when asked to
+    
+    Only installed with PROFILING_ENABLED. A request is profiled when it
+    sends X-Profile: 1 together with X-API-Key, or when it is picked by
+    PROFILE_SAMPLE_RATE; the profile id comes back in X-Profile-Id.
+    """
+    
+    async def dispatch(self, request: Request, call_next):
+        profiler = get_request_profiler()
+        requested = request.headers.get("x-profile") == "1" and secrets.compare_digest(
+            request.headers.get("x-api-key", ""), settings.REFRESH_API_KEY
+        )
+        session = profiler.start() if requested or profiler.should_sample() else None
+        profiler.in_flight += 1
+        in_flight_at_start = profiler.in_flight
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            profiler.in_flight -= 1
+            if session is not None:
+                profile_id = await asyncio.to_thread(profiler.stop, session, {
+                    'method': request.method,
+                    'path': request.url.path,
+                    'status': status_code,
+                    'trigger': "header" if requested else "sample",
+                    'in_flight_at_start': in_flight_at_start
+                })
+        
+        if session is not None and profile_id:
+            response.headers["X-Profile-Id"] = profile_id
+        return response
+
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple rate limiting middleware"""
+    """
+    Per-client rate limiting with a sliding window counter
     
-    def __init__(self, app, calls: int = 100, period: int = 60):
+    Allows RATE_LIMIT_CALLS requests per RATE_LIMIT_PERIOD seconds per
+    client IP. The SQLite backend is shared between worker processes and
+    is checked off the event loop.
+    """
+    
+    def __init__(self, app, limiter=None):
         super().__init__(app)
-        self.calls = calls
-        self.period = period
-        self.requests = {}
+        self.limiter = limiter or get_rate_limiter()
     
     async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host
-        current_time = time.time()
-        self.requests = {
-            ip: times
-            for ip, times in self.requests.items()
-            if any(t > current_time - self.period for t in times)
-        }
-        if client_ip in self.requests:
-            recent_requests = [
-                t for t in self.requests[client_ip]
-                if t > current_time - self.period
-            ]
-            
-            if len(recent_requests) >= self.calls:
-                logger.warning(f"Rate limit exceeded for {client_ip}")
-                from fastapi.responses import JSONResponse
-                return JSONResponse(
-                    status_code=429,
-                    content={"detail": "Rate limit exceeded. Please try again later."}
-                )
-            
-            self.requests[client_ip] = recent_requests + [current_time]
+        client_ip = request.client.host if request.client else "unknown"
+        if self.limiter.shared:
+            decision = await asyncio.to_thread(self.limiter.hit, client_ip)
         else:
-            self.requests[client_ip] = [current_time]
+            decision = self.limiter.hit(client_ip)
+        
+        if not decision.allowed:
+            logger.warning(f"Rate limit exceeded for {client_ip}")
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Rate limit exceeded. Please try again later."},
+                headers={"Retry-After": str(math.ceil(decision.retry_after))}
+            )
         
         response = await call_next(request)
-        return response
\ No newline at end of file
+        response.headers["X-RateLimit-Limit"] = str(self.limiter.calls)
+        response.headers["X-RateLimit-Remaining"] = str(decision.remaining)
+        return response
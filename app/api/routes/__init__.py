@@ -1,9 +1,15 @@
 from app.api.routes import (
     health,
     recommend,
+    stats,
+    metrics,
+    debug,
 )
 
 __all__ = [
     "health",
-    "recommend"
+    "recommend",
+    "stats",
+    "metrics",
+    "debug"
 ]
\ No newline at end of file
@@ -0,0 +1,58 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.api.dependencies import require_admin_key
+from app.utils.logger import get_logger
+from app.utils.profiler import get_request_profiler
+from app.utils.tracing import get_tracer, render_trace
+
+logger = get_logger("debug_route")
+
+router = APIRouter(prefix="/debug", tags=["debug"], dependencies=[Depends(require_admin_key)])
+
+
+@router.get("/trace/{session_id}")
+async def session_trace(session_id: str):
+    """
+    Trace of one request, by session id
+    
+    Only the most recent TRACE_BUFFER_SIZE traces are kept in memory; older
+    ones are in the OTLP/JSON file at TRACE_EXPORT_PATH.
+    
+    Returns:
+        Critical path with per-span self time, and the full span tree
+    """
+    trace = get_tracer().get_trace(session_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return render_trace(trace)
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """
+    Saved request profiles, newest first
+    
+    Returns:
+        Profiler settings and counters, and metadata of each profile
+    """
+    profiler = get_request_profiler()
+    return {
+        **profiler.get_metrics(),
+        'profiles': await asyncio.to_thread(profiler.list_profiles)
+    }
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """
+    One request profile
+    
+    Returns:
+        Collapsed stacks, one "frame;frame;... count" line per stack, for
+        flamegraph.pl or speedscope
+    """
+    collapsed = await asyncio.to_thread(get_request_profiler().get_profile, profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(collapsed)
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from app.models.schemas import HealthResponse
-from app.database.sqlite_db import get_db
+from app.database.sqlite_db import get_async_db
 from app.database.chroma_db import get_chroma_client
 from app.services.llm_service import get_llm_service
 from app.utils.logger import get_logger
@@ -13,7 +13,7 @@ router = APIRouter(tags=["health"])
 
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     """
     Health check endpoint
     
@@ -21,7 +21,7 @@ async def health_check(db: Session = Depends(get_db)):
         Health status
     """
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         chroma = get_chroma_client()
         doc_count = chroma.count_documents()
         llm = get_llm_service()
@@ -0,0 +1,71 @@
+from typing import List
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.agents.jd_processor_agent import get_jd_processor_agent
+from app.services.catalog_cache_service import get_catalog_cache_service
+from app.services.degradation_controller import get_degradation_controller
+from app.services.interaction_writer import get_interaction_writer
+from app.services.jd_fetcher_service import get_jd_fetcher_service
+from app.services.model_providers import get_provider_metrics
+from app.utils.logger import get_logger
+from app.utils.metrics import CollectedMetric, get_metrics_registry
+from app.utils.rate_limiter import get_rate_limiter
+
+logger = get_logger("metrics_route")
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def collect_service_metrics() -> List[CollectedMetric]:
+    """Cache, queue and query path counters the services already keep"""
+    catalog = get_catalog_cache_service().get_metrics()
+    jd_cache = get_jd_fetcher_service().get_metrics()["cache"]
+    cassette = get_provider_metrics()["cassette"] or {"hits": 0, "misses": 0}
+    writer = get_interaction_writer().get_metrics()
+    query_processing = get_jd_processor_agent().get_metrics()
+    degradation = get_degradation_controller().get_metrics()
+    rate_limit = get_rate_limiter().get_metrics()
+    
+    caches = {
+        "catalog_lru": (catalog["lru"]["hits"], catalog["lru"]["misses"]),
+        "catalog_table": (catalog["table_hits"], catalog["loader_calls"]),
+        "jd_fetch": (jd_cache["hits"], jd_cache["misses"]),
+        "model_cassette": (cassette["hits"], cassette["misses"])
+    }
+    return [
+        ("cache_hits_total", "counter", "Cache hits", [({"cache": name}, hits) for name, (hits, _) in caches.items()]),
+        ("cache_misses_total", "counter", "Cache misses", [({"cache": name}, misses) for name, (_, misses) in caches.items()]),
+        ("query_processing_total", "counter", "Enhanced queries by extraction path", [
+            ({"path": path}, query_processing[path]) for path in ("rules", "llm", "fallback", "degraded", "deadline")
+        ]),
+        ("interaction_queue_depth", "gauge", "Interactions waiting to be written", [({}, writer["queue_depth"])]),
+        ("interactions_dropped_total", "counter", "Interactions dropped because the queue was full", [({}, writer["dropped"])]),
+        ("degradation_level", "gauge", "Current degradation level (0 is normal)", [({}, degradation["level"])]),
+        ("degradation_mode_seconds_total", "counter", "Seconds spent in each degradation mode", [
+            ({"mode": mode}, seconds) for mode, seconds in degradation["seconds_in_mode"].items()
+        ]),
+        ("degradation_skipped_stages_total", "counter", "Optional stages skipped under load", [
+            ({"stage": stage}, count) for stage, count in degradation["skipped_stages"].items()
+        ]),
+        ("rate_limit_requests_total", "counter", "Requests checked by the rate limiter in this process", [
+            ({"outcome": "allowed"}, rate_limit["allowed"]),
+            ({"outcome": "rejected"}, rate_limit["rejected"])
+        ])
+    ]
+
+
+get_metrics_registry().register_collector(collect_service_metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metrics
+    
+    Returns:
+        Latency histograms (agents, LLM and embedding calls, Chroma, DB writes,
+        HTTP routes), token usage and cache counters in the text format
+    """
+    return PlainTextResponse(get_metrics_registry().render(), media_type=PROMETHEUS_CONTENT_TYPE)
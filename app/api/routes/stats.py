@@ -0,0 +1,186 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from app.agents.jd_processor_agent import get_jd_processor_agent
+from app.services.interaction_writer import get_interaction_writer
+from app.services.retention_service import get_retention_service
+from app.services.session_service import get_session_service
+from app.services.catalog_cache_service import get_catalog_cache_service
+from app.services.parse_executor import get_parse_executor
+from app.services.jd_fetcher_service import get_jd_fetcher_service
+from app.services.model_providers import get_provider_metrics
+from app.services.token_ledger import get_token_ledger
+from app.services.degradation_controller import get_degradation_controller
+from app.utils.logger import get_logger
+from app.utils.url_detector import get_url_detector
+from app.utils.jd_preprocessing import get_jd_preprocessor
+from app.utils.tracing import get_tracer
+
+logger = get_logger("stats_route")
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("/persistence")
+async def persistence_stats():
+    """
+    Write-behind persistence metrics
+    
+    Returns:
+        Queue depth and flush latency metrics
+    """
+    return get_interaction_writer().get_metrics()
+
+
+@router.get("/retention")
+async def retention_stats():
+    """
+    Retention, archival and vacuum metrics
+    
+    Returns:
+        Sweep counters and database size
+    """
+    return await asyncio.to_thread(get_retention_service().get_metrics)
+
+
+@router.get("/catalog-cache")
+async def catalog_cache_stats():
+    """
+    Catalog cache metrics
+    
+    Returns:
+        LRU hit rate, table hits, loader calls and write-back counters
+    """
+    return get_catalog_cache_service().get_metrics()
+
+
+@router.get("/parsing")
+async def parsing_stats():
+    """
+    HTML parse executor metrics
+    
+    Returns:
+        Pool/inline parse counts and average parse times
+    """
+    return get_parse_executor().get_metrics()
+
+
+@router.get("/jd-fetcher")
+async def jd_fetcher_stats():
+    """
+    JD URL fetcher metrics
+    
+    Returns:
+        JD cache hit rate, fetch, coalescing and truncation counters
+    """
+    return get_jd_fetcher_service().get_metrics()
+
+
+@router.get("/url-detection")
+async def url_detection_stats():
+    """
+    URL detection metrics
+    
+    Returns:
+        Queries checked and how often each detection path and the LLM fallback fired
+    """
+    return get_url_detector().get_metrics()
+
+
+@router.get("/jd-preprocessing")
+async def jd_preprocessing_stats():
+    """
+    JD preprocessing metrics
+    
+    Returns:
+        JDs preprocessed and skipped, character reduction and average time
+    """
+    return get_jd_preprocessor().get_metrics()
+
+
+@router.get("/query-processing")
+async def query_processing_stats():
+    """
+    Query processing metrics
+    
+    Returns:
+        Queries handled by the rule fast path, the LLM and the fallback, and the LLM skip rate
+    """
+    return get_jd_processor_agent().get_metrics()
+
+
+@router.get("/model-provider")
+async def model_provider_stats():
+    """
+    Model provider metrics
+    
+    Returns:
+        MODEL_PROVIDER mode and cassette hit/miss/record counts
+    """
+    return get_provider_metrics()
+
+
+@router.get("/tracing")
+async def tracing_stats():
+    """
+    Tracing metrics
+    
+    Returns:
+        Buffered traces and OTLP file export counts
+    """
+    return get_tracer().get_metrics()
+
+
+@router.get("/tokens")
+async def token_stats(
+    window_hours: int = Query(24, ge=1, le=24 * 90, description="Look-back window in hours for persisted usage")
+):
+    """
+    LLM token usage and cost
+    
+    Returns:
+        Totals since startup per agent, call type and model with the token
+        budget state, and persisted totals per intent over the window
+    """
+    return {
+        **get_token_ledger().get_metrics(),
+        'persisted': await asyncio.to_thread(get_session_service().get_token_usage, window_hours)
+    }
+
+
+@router.get("/degradation")
+async def degradation_stats():
+    """
+    Degradation controller metrics
+    
+    Returns:
+        Current mode, load ratios, seconds spent in each mode and skipped stage counts
+    """
+    return get_degradation_controller().get_metrics()
+
+
+@router.get("/intents")
+async def intent_stats(
+    window_hours: int = Query(24, ge=1, le=24 * 90, description="Look-back window in hours"),
+    bucket_minutes: int = Query(60, ge=1, le=24 * 60, description="Time bucket width in minutes")
+):
+    """
+    Per-intent latency and success rates over a time window
+    
+    Returns:
+        Overall and bucketed metrics per intent
+    """
+    return await asyncio.to_thread(get_session_service().get_intent_analytics, window_hours, bucket_minutes)
+
+
+@router.get("/sessions/{session_id}")
+async def session_stats(session_id: str):
+    """
+    Materialized counters for one session
+    
+    Returns:
+        Session statistics
+    """
+    stats = await asyncio.to_thread(get_session_service().get_session_stats, session_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return stats
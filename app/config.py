@@ -12,6 +12,13 @@ class Settings(BaseSettings):
     OPENAI_TEMPERATURE: float = 0.2
     OPENAI_MAX_TOKENS: int = 2048
     SQLITE_DB_PATH: str = "./storage/sqlite/sessions.db"
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE: int = -64000
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_POOL_SIZE: int = 5
+    SQLITE_MAX_OVERFLOW: int = 10
     CHROMA_DB_PATH: str = "./storage/chroma"
     CHROMA_COLLECTION_NAME: str = "assessments"
     API_HOST: str = "0.0.0.0"
@@ -22,13 +29,38 @@ class Settings(BaseSettings):
     CHAINLIT_PORT: int = 8001
     REFRESH_API_KEY: str
     CORS_ORIGINS: str = "http://localhost:8001,http://localhost:3000"
+    RATE_LIMIT_CALLS: int = 100
+    RATE_LIMIT_PERIOD: int = 60
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_MAX_CLIENTS: int = 10000
+    RATE_LIMIT_SQLITE_PATH: str = "./storage/sqlite/rate_limit.db"
     
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "./logs/app.log"
     
     SHL_CATALOG_URL: str = "https://www.shl.com/products/product-catalog/"
-    SCRAPER_DELAY: float = 1.5
     SCRAPER_TIMEOUT: int = 30
+    SCRAPER_CONCURRENCY: int = 8
+    SCRAPER_RATE_LIMIT: float = 5.0
+    SCRAPER_MAX_RETRIES: int = 3
+    SCRAPER_BACKOFF_BASE: float = 0.5
+    SCRAPER_BACKOFF_MAX: float = 10.0
+    
+    PARSE_WORKERS: int = 2
+    PARSE_INLINE_MAX_BYTES: int = 16384
+    
+    JD_FETCH_MAX_BYTES: int = 2000000
+    JD_FETCH_MAX_CONNECTIONS: int = 20
+    JD_CACHE_SIZE: int = 256
+    JD_CACHE_TTL: float = 3600.0
+    JD_CACHE_MAX_TTL: float = 86400.0
+    JD_MAX_URLS: int = 5
+    JD_FETCH_DEADLINE: float = 15.0
+    JD_HEDGE_GRACE: float = 0.5
+    JD_MERGE_MAX_CHARS: int = 12000
+    JD_URL_LLM_FALLBACK: bool = False
+    JD_PREPROCESS_MAX_TOKENS: int = 1500
+    JD_PREPROCESS_MIN_CHARS: int = 1500
     RAG_TOP_K: int = 15  
     RAG_SIMILARITY_THRESHOLD: float = 0.50  
     RAG_SIMILARITY_THRESHOLD_FALLBACK: float = 0.30  
@@ -37,9 +69,61 @@ class Settings(BaseSettings):
     RAG_ENABLE_LLM_RERANKING: bool = True   
     EMBEDDING_BATCH_SIZE: int = 20
     ENABLE_QUERY_EXPANSION: bool = True
+    QUERY_RULES_ENABLED: bool = True
+    QUERY_RULES_MIN_CONFIDENCE: float = 0.85
+    QUERY_RULES_MAX_CHARS: int = 300
+    MODEL_PROVIDER: str = "openai"
+    MODEL_CASSETTE_PATH: str = "./storage/cassettes/openai.jsonl"
+    MODEL_STUB_LLM_LATENCY_MS: float = 800.0
+    MODEL_STUB_EMBEDDING_LATENCY_MS: float = 150.0
+    MODEL_STUB_LATENCY_JITTER: float = 0.25
+    MODEL_REPLAY_RECORDED_LATENCY: bool = True
+    LLM_INPUT_PRICE_PER_1M: float = 0.15
+    LLM_OUTPUT_PRICE_PER_1M: float = 0.60
+    LLM_TOKEN_BUDGET_PER_MINUTE: int = 0
+    DEGRADATION_ENABLED: bool = False
+    DEGRADE_MAX_IN_FLIGHT: int = 16
+    DEGRADE_LLM_LATENCY_TARGET: float = 5.0
+    DEGRADE_LATENCY_MIN_IN_FLIGHT: int = 4
+    DEGRADE_QUEUE_HIGH_WATER: float = 0.5
+    DEGRADE_STEP: float = 0.5
+    DEGRADE_RECOVERY_RATIO: float = 0.8
+    DEGRADE_MIN_DWELL: float = 10.0
+    DEGRADE_WINDOW: float = 30.0
+    REQUEST_DEADLINE: float = 25.0
+    REQUEST_TIMEOUT: float = 30.0
+    DEADLINE_MIN_RERANK: float = 2.0
     ASSESSMENTS_JSON_PATH: str = "./data/shl_assessments.json"
     TRAIN_SET_PATH: str = "./data/labeled_train_set.json"
     
+    PERSISTENCE_QUEUE_MAXSIZE: int = 1000
+    PERSISTENCE_BATCH_SIZE: int = 50
+    PERSISTENCE_FLUSH_INTERVAL: float = 1.0
+    PERSISTENCE_ENQUEUE_TIMEOUT: float = 2.0
+    
+    RETENTION_ENABLED: bool = True
+    RETENTION_DAYS: int = 30
+    RETENTION_SWEEP_INTERVAL: float = 3600.0
+    RETENTION_BATCH_SIZE: int = 500
+    RETENTION_ARCHIVE_DIR: str = "./storage/archive"
+    RETENTION_ZSTD_LEVEL: int = 10
+    RETENTION_VACUUM_PAGES: int = 2000
+    RETENTION_VACUUM_CONVERT: bool = False
+    
+    CATALOG_CACHE_SIZE: int = 1024
+    CATALOG_CACHE_FLUSH_INTERVAL: float = 5.0
+    CATALOG_SYNC_ON_STARTUP: bool = True
+    
+    TRACING_ENABLED: bool = True
+    TRACE_EXPORT_PATH: str = ""
+    TRACE_BUFFER_SIZE: int = 500
+    
+    PROFILING_ENABLED: bool = False
+    PROFILE_SAMPLE_RATE: int = 0
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_DIR: str = "./logs/profiles"
+    PROFILE_MAX_FILES: int = 100
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -59,6 +143,7 @@ class Settings(BaseSettings):
             Path(self.CHROMA_DB_PATH),
             Path(self.LOG_FILE).parent,
             Path(self.ASSESSMENTS_JSON_PATH).parent,
+            Path(self.RETENTION_ARCHIVE_DIR),
         ]
         
         for directory in directories:
@@ -2,6 +2,7 @@ from app.database.sqlite_db import (
     SQLiteDatabase,
     db_manager,
     get_db,
+    get_async_db,
     init_db,
     close_db
 )
@@ -17,6 +18,7 @@ __all__ = [
     "SQLiteDatabase",
     "db_manager",
     "get_db",
+    "get_async_db",
     "init_db",
     "close_db",
     "ChromaDBManager",
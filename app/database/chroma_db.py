@@ -7,6 +7,8 @@ import chromadb
 from chromadb.config import Settings
 from app.config import settings
 from app.utils.logger import get_logger
+from app.utils.metrics import CHROMA_DURATION
+from app.utils.tracing import get_tracer
 
 logger = get_logger("chroma_db")
 
@@ -78,12 +80,13 @@ class ChromaDBManager:
             self.initialize()
         
         try:
-            self.collection.add(
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadatas,
-                ids=ids
-            )
+            with CHROMA_DURATION.time("add"):
+                self.collection.add(
+                    documents=documents,
+                    embeddings=embeddings,
+                    metadatas=metadatas,
+                    ids=ids
+                )
             logger.info(f"Added {len(documents)} documents to collection")
         except Exception as e:
             logger.error(f"Failed to add documents: {e}")
@@ -112,13 +115,14 @@ class ChromaDBManager:
             self.initialize()
         
         try:
-            results = self.collection.query(
-                query_embeddings=query_embeddings,
-                n_results=n_results,
-                where=where,
-                where_document=where_document,
-                include=["documents", "metadatas", "distances"]
-            )
+            with get_tracer().span("chroma.query", **{"chroma.n_results": n_results}), CHROMA_DURATION.time("query"):
+                results = self.collection.query(
+                    query_embeddings=query_embeddings,
+                    n_results=n_results,
+                    where=where,
+                    where_document=where_document,
+                    include=["documents", "metadatas", "distances"]
+                )
             
             logger.debug(f"Query returned {len(results['ids'][0])} results")
             return results
@@ -141,15 +145,33 @@ class ChromaDBManager:
             self.initialize()
         
         try:
-            results = self.collection.get(
-                ids=ids,
-                include=["documents", "metadatas"]
-            )
+            with get_tracer().span("chroma.get", **{"chroma.ids": len(ids)}), CHROMA_DURATION.time("get"):
+                results = self.collection.get(
+                    ids=ids,
+                    include=["documents", "metadatas"]
+                )
             return results
         except Exception as e:
             logger.error(f"Failed to get documents by IDs: {e}")
             raise
     
+    def get_all_metadatas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the metadata of every document
+        
+        Returns:
+            Metadata keyed by document ID
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        try:
+            results = self.collection.get(include=["metadatas"])
+            return dict(zip(results["ids"], results["metadatas"]))
+        except Exception as e:
+            logger.error(f"Failed to get document metadata: {e}")
+            raise
+    
     def delete_collection(self):
         """Delete the collection"""
         if not self._initialized:
@@ -1,8 +1,10 @@
+import threading
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
-from contextlib import contextmanager
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from contextlib import contextmanager, asynccontextmanager
 from app.models.database_models import Base
 from app.config import settings
 from app.utils.logger import get_logger
@@ -10,13 +12,39 @@ from app.utils.logger import get_logger
 logger = get_logger("sqlite_db")
 
 
+def _apply_pragmas(dbapi_connection, connection_record):
+    """Apply the tuned SQLite profile to every new connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
 class SQLiteDatabase:
-    """SQLite database manager"""
+    """
+    SQLite database manager
+    
+    Uses WAL mode so readers never block the writer. Reads go through a
+    connection pool while all writes share one dedicated connection guarded
+    by a lock (single-writer discipline), which avoids "database is locked"
+    errors between concurrent API and Chainlit writers.
+    """
     
     def __init__(self, db_path: str = None):
         self.db_path = db_path or settings.SQLITE_DB_PATH
         self.engine = None
+        self.write_engine = None
+        self.async_engine = None
         self.SessionLocal = None
+        self.WriteSessionLocal = None
+        self.AsyncSessionLocal = None
+        self._write_lock = threading.Lock()
         self._initialized = False
     
     def initialize(self):
@@ -31,23 +59,98 @@ class SQLiteDatabase:
             self.engine = create_engine(
                 f"sqlite:///{self.db_path}",
                 connect_args={"check_same_thread": False},
-                poolclass=StaticPool,
+                poolclass=QueuePool,
+                pool_size=settings.SQLITE_POOL_SIZE,
+                max_overflow=settings.SQLITE_MAX_OVERFLOW,
+                pool_pre_ping=True,
+                echo=False
+            )
+            self.write_engine = create_engine(
+                f"sqlite:///{self.db_path}",
+                connect_args={"check_same_thread": False},
+                poolclass=QueuePool,
+                pool_size=1,
+                max_overflow=0,
+                echo=False
+            )
+            self.async_engine = create_async_engine(
+                f"sqlite+aiosqlite:///{self.db_path}",
+                pool_size=settings.SQLITE_POOL_SIZE,
+                max_overflow=settings.SQLITE_MAX_OVERFLOW,
                 echo=False
             )
+            for engine in (self.engine, self.write_engine, self.async_engine.sync_engine):
+                event.listen(engine, "connect", _apply_pragmas)
+            
             self.SessionLocal = sessionmaker(
                 autocommit=False,
                 autoflush=False,
                 bind=self.engine
             )
-            Base.metadata.create_all(bind=self.engine)
+            self.WriteSessionLocal = sessionmaker(
+                autocommit=False,
+                autoflush=False,
+                bind=self.write_engine
+            )
+            self.AsyncSessionLocal = async_sessionmaker(
+                bind=self.async_engine,
+                class_=AsyncSession,
+                autoflush=False,
+                expire_on_commit=False
+            )
+            self._enable_auto_vacuum()
+            Base.metadata.create_all(bind=self.write_engine)
+            self._migrate_schema()
             
             self._initialized = True
-            logger.info(f"Database initialized at {self.db_path}")
-            
+            logger.info(
+                f"Database initialized at {self.db_path} "
+                f"(journal_mode={settings.SQLITE_JOURNAL_MODE}, "
+                f"synchronous={settings.SQLITE_SYNCHRONOUS}, "
+                f"pool_size={settings.SQLITE_POOL_SIZE})"
+            )
+        
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
             raise
     
+    def _migrate_schema(self):
+        """
+        Bring an existing database file up to the current models
+        
+        create_all only creates missing tables, so columns and indexes added
+        to existing models are applied here. New columns must be nullable.
+        """
+        with self.write_engine.begin() as conn:
+            inspector = inspect(conn)
+            for table in Base.metadata.sorted_tables:
+                existing = {column["name"] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing:
+                        continue
+                    column_type = column.type.compile(dialect=self.write_engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                    logger.info(f"Added column {table.name}.{column.name}")
+                
+                for index in table.indexes:
+                    index.create(bind=conn, checkfirst=True)
+    
+    def _enable_auto_vacuum(self):
+        """
+        Use incremental auto-vacuum for a newly created database
+        
+        auto_vacuum only changes on a VACUUM once the file has a header (the
+        journal_mode pragma already writes one), which is instant while the
+        database has no tables; existing databases are converted by
+        scripts/vacuum_database.py.
+        """
+        with self.write_engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            if inspect(conn).get_table_names():
+                return
+            conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.exec_driver_sql("VACUUM")
+    
     @contextmanager
     def get_session(self):
         """Get database session with context manager"""
@@ -65,6 +168,56 @@ class SQLiteDatabase:
         finally:
             session.close()
     
+    @contextmanager
+    def write_session(self):
+        """Get the single writer session, serialized across threads"""
+        if not self._initialized:
+            self.initialize()
+        
+        with self._write_lock:
+            session = self.WriteSessionLocal()
+            try:
+                yield session
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Database write session error: {e}")
+                raise
+            finally:
+                session.close()
+    
+    @contextmanager
+    def write_connection(self, autocommit: bool = False):
+        """
+        Get a raw connection on the write engine, holding the writer lock
+        
+        Args:
+            autocommit: Run statements outside a transaction (VACUUM, checkpoints)
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        with self._write_lock:
+            with self.write_engine.connect() as conn:
+                if autocommit:
+                    conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+                yield conn
+    
+    @asynccontextmanager
+    async def get_async_session(self):
+        """Get async (aiosqlite) database session for read paths on the event loop"""
+        if not self._initialized:
+            self.initialize()
+        
+        async with self.AsyncSessionLocal() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"Async database session error: {e}")
+                raise
+    
     def get_db_session(self) -> Session:
         """Get database session for dependency injection"""
         if not self._initialized:
@@ -81,18 +234,27 @@ class SQLiteDatabase:
         """Close database connection"""
         if self.engine:
             self.engine.dispose()
-            logger.info("Database connection closed")
+        if self.write_engine:
+            self.write_engine.dispose()
+        logger.info("Database connection closed")
+    
+    async def close_async(self):
+        """Close the async engine"""
+        if self.async_engine:
+            await self.async_engine.dispose()
     
     def drop_all_tables(self):
         """Drop all tables (use with caution)"""
-        if self.engine:
-            Base.metadata.drop_all(bind=self.engine)
+        if self.write_engine:
+            with self._write_lock:
+                Base.metadata.drop_all(bind=self.write_engine)
             logger.warning("All database tables dropped")
     
     def recreate_tables(self):
         """Drop and recreate all tables"""
         self.drop_all_tables()
-        Base.metadata.create_all(bind=self.engine)
+        with self._write_lock:
+            Base.metadata.create_all(bind=self.write_engine)
         logger.info("Database tables recreated")
 
 db_manager = SQLiteDatabase()
@@ -107,6 +269,12 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency for FastAPI to get async database session"""
+    async with db_manager.get_async_session() as db:
+        yield db
+
+
 def init_db():
     """Initialize database on startup"""
     db_manager.initialize()
@@ -116,4 +284,5 @@ def init_db():
 async def close_db():
     """Close database on shutdown"""
     db_manager.close()
-    logger.info("Database closed")
\ No newline at end of file
+    await db_manager.close_async()
+    logger.info("Database closed")
@@ -3,6 +3,7 @@ from app.graph.nodes import (
     supervisor_node,
     input_check_node,
     extractor_node,
+    preprocess_node,
     processor_node,
     rag_node,
     general_node,
@@ -34,6 +35,7 @@ __all__ = [
     "supervisor_node",
     "input_check_node",
     "extractor_node",
+    "preprocess_node",
     "processor_node",
     "rag_node",
     "general_node",
@@ -1,7 +1,8 @@
 from typing import Literal
 from app.graph.state import GraphState
 from app.utils.logger import get_logger
-from app.utils.validators import extract_urls_from_text
+from app.config import settings
+from app.utils.url_detector import get_url_detector
 
 logger = get_logger("graph_edges")
 
@@ -34,6 +35,9 @@ def has_url(state: GraphState) -> Literal["extractor", "processor"]:
     """
     Check if query contains URL
     
+    Queries without a detected URL only go to the extractor when the
+    LLM URL-extraction fallback is enabled.
+    
     Args:
         state: Current graph state
         
@@ -41,13 +45,13 @@ def has_url(state: GraphState) -> Literal["extractor", "processor"]:
         Next node name
     """
     query = state.get('query', '')
-    urls = extract_urls_from_text(query)
+    urls = get_url_detector().detect(query)
     
     has_urls = len(urls) > 0
     
     logger.info(f"URL check: {has_urls} (found {len(urls)} URLs)")
     
-    if has_urls:
+    if has_urls or settings.JD_URL_LLM_FALLBACK:
         return "extractor"
     else:
         return "processor"
@@ -8,11 +8,15 @@ from app.agents import (
 )
 from app.graph.state import GraphState
 from app.utils.logger import get_logger
+from app.utils.tracing import traced
+from app.utils.jd_preprocessing import get_jd_preprocessor
+from app.utils.deadline import LOW_BUDGET_FRACTION, fraction_left
 from app.prompts.general_query_prompts import OUT_OF_CONTEXT_RESPONSE
 
 logger = get_logger("graph_nodes")
 
 
+@traced("node.supervisor")
 async def supervisor_node(state: GraphState) -> GraphState:
     """
     Supervisor node - classifies user intent
@@ -31,6 +35,7 @@ async def supervisor_node(state: GraphState) -> GraphState:
     return result
 
 
+@traced("node.input_check")
 async def input_check_node(state: GraphState) -> GraphState:
     """
     Input check node - determines if query contains URL
@@ -45,6 +50,7 @@ async def input_check_node(state: GraphState) -> GraphState:
     return state
 
 
+@traced("node.extractor")
 async def extractor_node(state: GraphState) -> GraphState:
     """
     JD Extractor node - extracts URL and fetches JD
@@ -63,6 +69,46 @@ async def extractor_node(state: GraphState) -> GraphState:
     return result
 
 
+@traced("node.preprocess")
+async def preprocess_node(state: GraphState) -> GraphState:
+    """
+    JD preprocessing node - trims long JDs before the processor
+    
+    Drops boilerplate, repeated sentences and whatever exceeds the token
+    budget; short queries pass through unchanged. With less than half the
+    request deadline left the budget is halved.
+    
+    Args:
+        state: Current graph state
+        
+    Returns:
+        Updated state with reduced 'jd_text'
+    """
+    logger.info("Executing preprocess_node")
+    
+    text = state.get('jd_text') or state.get('query', '')
+    preprocessor = get_jd_preprocessor()
+    short_on_time = fraction_left(state) < LOW_BUDGET_FRACTION
+    max_tokens = preprocessor.max_tokens // 2 if short_on_time else None
+    result = preprocessor.process(text, max_tokens)
+    if not result['applied']:
+        return state
+    
+    stats = {key: value for key, value in result.items() if key != 'text'}
+    stats['deadline_budget'] = short_on_time
+    logger.info(
+        f"JD preprocessed: {stats['original_chars']} -> {stats['chars']} chars, "
+        f"dropped sections: {stats['dropped_sections']}, truncated: {stats['truncated']}"
+    )
+    
+    state['jd_text'] = result['text']
+    state['jd_preprocessing'] = stats
+    state.setdefault('processing_steps', []).append("jd_preprocessing completed")
+    
+    return state
+
+
+@traced("node.processor")
 async def processor_node(state: GraphState) -> GraphState:
     """
     JD Processor node - processes and enhances JD/query
@@ -81,6 +127,7 @@ async def processor_node(state: GraphState) -> GraphState:
     return result
 
 
+@traced("node.rag")
 async def rag_node(state: GraphState) -> GraphState:
     """
     RAG node - retrieves and ranks assessments
@@ -99,6 +146,7 @@ async def rag_node(state: GraphState) -> GraphState:
     return result
 
 
+@traced("node.general")
 async def general_node(state: GraphState) -> GraphState:
     """
     General query node - handles general questions
@@ -117,6 +165,7 @@ async def general_node(state: GraphState) -> GraphState:
     return result
 
 
+@traced("node.error")
 async def error_node(state: GraphState) -> GraphState:
     """
     Error handler node - handles errors in processing
@@ -142,6 +191,7 @@ async def error_node(state: GraphState) -> GraphState:
     return state
 
 
+@traced("node.end")
 async def end_node(state: GraphState) -> GraphState:
     """
     End node - handles out of context queries
@@ -159,6 +209,7 @@ async def end_node(state: GraphState) -> GraphState:
     return state
 
 
+@traced("node.format")
 async def format_output_node(state: GraphState) -> GraphState:
     """
     Format output node - final formatting before return
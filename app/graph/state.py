@@ -10,7 +10,9 @@ class GraphState(TypedDict):
     intent_confidence: Optional[float]
     has_url: bool
     extracted_urls: List[str]
+    jd_source_urls: List[str]
     jd_text: Optional[str]
+    jd_preprocessing: Optional[Dict[str, Any]]
     jd_extraction_success: bool
     enhanced_query: Optional[EnhancedQuery]
     retrieved_assessments: List[Dict[str, Any]]
@@ -19,15 +21,24 @@ class GraphState(TypedDict):
     error_message: Optional[str]
     processing_steps: List[str]
     agent_outputs: Dict[str, Any]
+    degradation: Optional[Dict[str, Any]]
+    deadline: Optional[Dict[str, Any]]
 
 
-def create_initial_state(query: str, session_id: str) -> GraphState:
+def create_initial_state(
+    query: str,
+    session_id: str,
+    degradation: Optional[Dict[str, Any]] = None,
+    deadline: Optional[Dict[str, Any]] = None
+) -> GraphState:
     """
     Create initial graph state
     
     Args:
         query: User query
         session_id: Session identifier
+        degradation: Degradation mode the request runs in
+        deadline: Deadline entry from new_deadline()
         
     Returns:
         Initial graph state
@@ -39,7 +50,9 @@ def create_initial_state(query: str, session_id: str) -> GraphState:
         intent_confidence=None,
         has_url=False,
         extracted_urls=[],
+        jd_source_urls=[],
         jd_text=None,
+        jd_preprocessing=None,
         jd_extraction_success=False,
         enhanced_query=None,
         retrieved_assessments=[],
@@ -47,5 +60,7 @@ def create_initial_state(query: str, session_id: str) -> GraphState:
         general_answer=None,
         error_message=None,
         processing_steps=[],
-        agent_outputs={}
+        agent_outputs={},
+        degradation=degradation,
+        deadline=deadline
     )
\ No newline at end of file
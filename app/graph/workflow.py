@@ -1,9 +1,11 @@
+import asyncio
 from langgraph.graph import StateGraph, END
 from app.graph.state import GraphState, create_initial_state
 from app.graph.nodes import (
     supervisor_node,
     input_check_node,
     extractor_node,
+    preprocess_node,
     processor_node,
     rag_node,
     general_node,
@@ -16,6 +18,11 @@ from app.graph.edges import (
     has_url
 )
 from app.utils.logger import get_logger
+from app.services.degradation_controller import get_degradation_controller
+from app.utils.tracing import get_tracer
+from app.utils.deadline import new_deadline
+from app.utils.metrics import DEADLINE_EXCEEDED
+from app.config import settings
 
 logger = get_logger("workflow")
 
@@ -27,7 +34,7 @@ def create_workflow() -> StateGraph:
     This implements the workflow:
     1. Supervisor classifies intent
     2. Routes to JD query flow, general query, or out of context
-    3. JD query flow: check URL -> extract if URL -> process -> RAG -> format
+    3. JD query flow: check URL -> extract if URL -> preprocess -> process -> RAG -> format
     4. General query flow: answer -> format
     5. Out of context: redirect message
     
@@ -39,6 +46,7 @@ def create_workflow() -> StateGraph:
     workflow.add_node("supervisor", supervisor_node)
     workflow.add_node("input_check", input_check_node)
     workflow.add_node("extractor", extractor_node)
+    workflow.add_node("preprocess", preprocess_node)
     workflow.add_node("processor", processor_node)
     workflow.add_node("rag", rag_node)
     workflow.add_node("general", general_node)
@@ -62,10 +70,11 @@ def create_workflow() -> StateGraph:
         has_url,
         {
             "extractor": "extractor",
-            "processor": "processor"
+            "processor": "preprocess"
         }
     )
-    workflow.add_edge("extractor", "processor")
+    workflow.add_edge("extractor", "preprocess")
+    workflow.add_edge("preprocess", "processor")
     workflow.add_edge("processor", "rag")
     workflow.add_edge("rag", "format")
     workflow.add_edge("general", "format")
@@ -90,6 +99,10 @@ class WorkflowExecutor:
         """
         Execute the workflow for a given query
         
+        Nodes budget their slow calls against REQUEST_DEADLINE. If the run
+        still exceeds REQUEST_TIMEOUT it is cancelled and the state after
+        the last finished node is returned as a partial result.
+        
         Args:
             query: User query
             session_id: Session identifier
@@ -99,25 +112,78 @@ class WorkflowExecutor:
         """
         logger.info(f"Starting workflow execution for session {session_id}")
         
-        try:
-            initial_state = create_initial_state(query, session_id)
-            final_state = await self.app.ainvoke(initial_state)
-            
-            logger.info(f"Workflow execution completed for session {session_id}")
-            logger.info(f"Processing steps: {final_state.get('processing_steps', [])}")
+        controller = get_degradation_controller()
+        degradation = controller.begin_request()
+        with get_tracer().span("workflow", session_id=session_id, **{"query.chars": len(query)}) as span:
+            try:
+                initial_state = create_initial_state(query, session_id, degradation, new_deadline())
+                latest = initial_state
+                
+                async def run():
+                    nonlocal latest
+                    async for values in self.app.astream(initial_state, stream_mode="values"):
+                        latest = values
+                    return latest
+                
+                try:
+                    final_state = await asyncio.wait_for(run(), settings.REQUEST_TIMEOUT)
+                except asyncio.TimeoutError:
+                    final_state = self._partial_result(latest)
+                
+                logger.info(f"Workflow execution completed for session {session_id}")
+                logger.info(f"Processing steps: {final_state.get('processing_steps', [])}")
+                if span is not None:
+                    span.set_attributes({
+                        "workflow.intent": final_state.get('intent') or "",
+                        "workflow.recommendations": len(final_state.get('final_recommendations') or []),
+                        "workflow.degradation_mode": degradation['mode'],
+                        "workflow.timed_out": final_state['deadline']['timed_out']
+                    })
+                
+                return final_state
+                
+            except Exception as e:
+                logger.error(f"Workflow execution failed: {e}")
+                if span is not None:
+                    span.record_error(e)
+                error_state = create_initial_state(query, session_id, degradation)
+                error_state['error_message'] = f"Workflow execution error: {str(e)}"
+                error_state['general_answer'] = (
+                    "I apologize, but I encountered an unexpected error. "
+                    "Please try again or rephrase your query."
+                )
+                
+                return error_state
             
-            return final_state
-            
-        except Exception as e:
-            logger.error(f"Workflow execution failed: {e}")
-            error_state = create_initial_state(query, session_id)
-            error_state['error_message'] = f"Workflow execution error: {str(e)}"
-            error_state['general_answer'] = (
-                "I apologize, but I encountered an unexpected error. "
-                "Please try again or rephrase your query."
-            )
+            finally:
+                controller.end_request()
+    
+    def _partial_result(self, state: GraphState) -> GraphState:
+        """
+        Best result available when the workflow hit REQUEST_TIMEOUT
+        
+        Args:
+            state: State after the last finished node
             
-            return error_state
+        Returns:
+            State marked as timed out, with the top vector matches as
+            recommendations if ranking had not finished
+        """
+        logger.warning(
+            f"Workflow for session {state['session_id']} exceeded {settings.REQUEST_TIMEOUT:.0f}s, "
+            f"returning partial result after {state.get('processing_steps', [])}"
+        )
+        DEADLINE_EXCEEDED.inc(1.0, "workflow")
+        partial = dict(state)
+        if not partial.get('final_recommendations') and partial.get('retrieved_assessments'):
+            partial['final_recommendations'] = sorted(
+                partial['retrieved_assessments'],
+                key=lambda x: x.get('similarity_score', 0),
+                reverse=True
+            )[:settings.RAG_FINAL_SELECT_MAX]
+        partial['deadline'] = {**(partial.get('deadline') or {}), 'timed_out': True}
+        partial['error_message'] = f"Request timed out after {settings.REQUEST_TIMEOUT:.0f}s; partial result returned"
+        return partial
     
     async def stream_execute(self, query: str, session_id: str):
         """
@@ -132,9 +198,21 @@ class WorkflowExecutor:
         """
         logger.info(f"Starting streaming workflow execution for session {session_id}")
         
+        # The span is made current only while the graph runs, not while the
+        # caller handles a yielded update
+        tracer = get_tracer()
+        span = tracer.start_span("workflow.stream", session_id=session_id, **{"query.chars": len(query)})
+        controller = get_degradation_controller()
+        degradation = controller.begin_request()
         try:
-            initial_state = create_initial_state(query, session_id)
-            async for state in self.app.astream(initial_state):
+            initial_state = create_initial_state(query, session_id, degradation, new_deadline())
+            updates = self.app.astream(initial_state).__aiter__()
+            while True:
+                with tracer.use_span(span):
+                    try:
+                        state = await updates.__anext__()
+                    except StopAsyncIteration:
+                        break
                 logger.debug(f"Streaming state update: {list(state.keys())}")
                 yield state
             
@@ -142,7 +220,9 @@ class WorkflowExecutor:
             
         except Exception as e:
             logger.error(f"Streaming workflow execution failed: {e}")
-            error_state = create_initial_state(query, session_id)
+            if span is not None:
+                span.record_error(e)
+            error_state = create_initial_state(query, session_id, degradation)
             error_state['error_message'] = f"Workflow execution error: {str(e)}"
             error_state['general_answer'] = (
                 "I apologize, but I encountered an unexpected error. "
@@ -150,6 +230,10 @@ class WorkflowExecutor:
             )
             
             yield error_state
+        
+        finally:
+            controller.end_request()
+            tracer.end_span(span)
 
 workflow_executor = WorkflowExecutor()
 
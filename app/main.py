@@ -4,9 +4,16 @@ from contextlib import asynccontextmanager
 
 from app.config import settings
 from app.database import init_db, close_db, init_chroma, close_chroma
-from app.api.middleware import LoggingMiddleware, RateLimitMiddleware
-from app.api.routes import health, recommend
+from app.api.middleware import LoggingMiddleware, RateLimitMiddleware, ProfilingMiddleware
+from app.api.routes import health, recommend, stats, metrics, debug
+from app.services.interaction_writer import start_interaction_writer, stop_interaction_writer
+from app.services.retention_service import start_retention_service, stop_retention_service
+from app.services.session_service import get_session_service
+from app.services.catalog_cache_service import start_catalog_cache, stop_catalog_cache
+from app.services.parse_executor import start_parse_executor, stop_parse_executor
+from app.services.jd_fetcher_service import close_jd_fetcher
 from app.utils.logger import get_logger
+from app.utils.tracing import close_tracer
 from scripts.initailize_vector_store import initialize_vector_store
 logger = get_logger("main")
 
@@ -21,8 +28,13 @@ async def lifespan(app: FastAPI):
         logger.info("Initializing databases...")
         init_db()
         init_chroma()
+        get_session_service().backfill_session_stats()
         
         await initialize_vector_store()
+        await start_interaction_writer()
+        await start_catalog_cache()
+        await start_retention_service()
+        await start_parse_executor()
         
         logger.info("Startup complete!")
         
@@ -35,8 +47,14 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down...")
     
     try:
+        await close_jd_fetcher()
+        await stop_parse_executor()
+        await stop_retention_service()
+        await stop_interaction_writer()
+        await stop_catalog_cache()
         await close_chroma()
         await close_db()
+        await close_tracer()
         
         logger.info("Shutdown complete")
         
@@ -59,10 +77,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
 app.add_middleware(LoggingMiddleware)
-app.add_middleware(RateLimitMiddleware, calls=100, period=60)
+app.add_middleware(RateLimitMiddleware)
 app.include_router(health.router)
 app.include_router(recommend.router)
+app.include_router(stats.router)
+app.include_router(metrics.router)
+app.include_router(debug.router)
 
 
 @app.get("/")
@@ -2,8 +2,11 @@ from app.models.database_models import (
     Base,
     Session,
     Interaction,
+    SessionStats,
+    RecommendationPayload,
     AgentExecution,
     AssessmentCache,
+    CatalogPageState,
     VectorStoreMetadata
 )
 from app.models.schemas import (
@@ -33,8 +36,11 @@ __all__ = [
     "Base",
     "Session",
     "Interaction",
+    "SessionStats",
+    "RecommendationPayload",
     "AgentExecution",
     "AssessmentCache",
+    "CatalogPageState",
     "VectorStoreMetadata",
     
     # Request/Response schemas (Active endpoints only)
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, Float
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -32,7 +32,7 @@ class Interaction(Base):
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     session_id = Column(String(100), nullable=False, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     query = Column(Text, nullable=False)
     query_type = Column(String(50), nullable=True)  
     intent = Column(String(50), nullable=True)
@@ -47,8 +47,9 @@ class Interaction(Base):
     rag_output = Column(JSON, nullable=True)
     general_query_output = Column(JSON, nullable=True)
     
-    # Results
-    recommended_assessments = Column(JSON, nullable=True)
+    # Results (recommended_assessments is stored by reference in recommendation_payloads)
+    recommended_assessments = Column(JSON(none_as_null=True), nullable=True)
+    recommendation_payload_id = Column(String(64), nullable=True, index=True)
     assessment_count = Column(Integer, nullable=True)
     
     # Metadata
@@ -56,6 +57,16 @@ class Interaction(Base):
     error_message = Column(Text, nullable=True)
     success = Column(Integer, default=1)  # 1 for success, 0 for failure
     
+    # LLM usage summed over agents (per-agent usage is in the *_output columns)
+    llm_input_tokens = Column(Integer, nullable=True)
+    llm_output_tokens = Column(Integer, nullable=True)
+    llm_cost_usd = Column(Float, nullable=True)
+    
+    __table_args__ = (
+        # Covers the per-intent analytics scan over a time window
+        Index("ix_interactions_timestamp_intent", "timestamp", "intent", "success", "processing_time"),
+    )
+    
     def to_dict(self):
         return {
             "id": self.id,
@@ -69,7 +80,57 @@ class Interaction(Base):
             "assessment_count": self.assessment_count,
             "processing_time": self.processing_time,
             "error_message": self.error_message,
-            "success": bool(self.success)
+            "success": bool(self.success),
+            "llm_input_tokens": self.llm_input_tokens,
+            "llm_output_tokens": self.llm_output_tokens,
+            "llm_cost_usd": self.llm_cost_usd
+        }
+
+
+class SessionStats(Base):
+    """Materialized per-session counters, maintained with each interaction write"""
+    __tablename__ = "session_stats"
+    
+    session_id = Column(String(100), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_interaction_at = Column(DateTime, nullable=True)
+    
+    total_interactions = Column(Integer, default=0, nullable=False)
+    successful_interactions = Column(Integer, default=0, nullable=False)
+    total_recommendations = Column(Integer, default=0, nullable=False)
+    total_processing_time = Column(Float, default=0.0, nullable=False)
+    intent_counts = Column(JSON, nullable=True)  # {"jd_query": 3, "general": 1}
+    
+    def to_dict(self):
+        total = self.total_interactions or 0
+        return {
+            "session_id": self.session_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": (self.last_interaction_at or self.created_at).isoformat() if self.created_at else None,
+            "total_interactions": total,
+            "successful_interactions": self.successful_interactions,
+            "success_rate": self.successful_interactions / total if total > 0 else 0,
+            "total_recommendations": self.total_recommendations,
+            "avg_processing_time": self.total_processing_time / total if total > 0 else 0,
+            "query_types": self.intent_counts or {}
+        }
+
+
+class RecommendationPayload(Base):
+    """Deduplicated recommendation lists, referenced by content hash"""
+    __tablename__ = "recommendation_payloads"
+    
+    id = Column(String(64), primary_key=True)  # sha256 of the canonical JSON payload
+    payload = Column(JSON, nullable=False)
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "payload": self.payload,
+            "ref_count": self.ref_count,
+            "created_at": self.created_at.isoformat() if self.created_at else None
         }
 
 
@@ -136,6 +197,32 @@ class AssessmentCache(Base):
         }
 
 
+class CatalogPageState(Base):
+    """HTTP validators and content hash of each scraped catalog page"""
+    __tablename__ = "catalog_page_state"
+    
+    url = Column(String(500), primary_key=True)
+    etag = Column(String(200), nullable=True)
+    last_modified = Column(String(100), nullable=True)
+    content_hash = Column(String(64), nullable=True)  # sha256 of the response body
+    
+    payload = Column(JSON, nullable=True)  # parsed result, reused when the page is unchanged
+    
+    last_checked = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_changed = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        return {
+            "url": self.url,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "content_hash": self.content_hash,
+            "payload": self.payload,
+            "last_checked": self.last_checked.isoformat() if self.last_checked else None,
+            "last_changed": self.last_changed.isoformat() if self.last_changed else None
+        }
+
+
 class VectorStoreMetadata(Base):
     """Metadata about vector store updates"""
     __tablename__ = "vector_store_metadata"
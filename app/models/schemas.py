@@ -123,7 +123,9 @@ class GraphState(BaseModel):
     intent_confidence: Optional[float] = None
     has_url: bool = False
     extracted_urls: List[str] = Field(default_factory=list)
+    jd_source_urls: List[str] = Field(default_factory=list)
     jd_text: Optional[str] = None
+    jd_preprocessing: Optional[Dict[str, Any]] = None
     jd_extraction_success: bool = False
     enhanced_query: Optional[EnhancedQuery] = None
     retrieved_assessments: List[Dict[str, Any]] = Field(default_factory=list)
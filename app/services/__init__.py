@@ -4,6 +4,12 @@ from app.services.vector_store_service import VectorStoreService, vector_store_s
 from app.services.scraper_service import ScraperService, scraper_service, get_scraper_service
 from app.services.jd_fetcher_service import JDFetcherService, jd_fetcher_service, get_jd_fetcher_service
 from app.services.session_service import SessionService, session_service, get_session_service
+from app.services.interaction_writer import InteractionWriter, interaction_writer, get_interaction_writer
+from app.services.retention_service import RetentionService, retention_service, get_retention_service
+from app.services.catalog_cache_service import CatalogCacheService, catalog_cache_service, get_catalog_cache_service
+from app.services.parse_executor import ParseExecutor, parse_executor, get_parse_executor
+from app.services.model_providers import CassetteStore, create_chat_provider, create_embedding_provider, get_provider_metrics
+from app.services.token_ledger import TokenLedger, token_ledger, get_token_ledger
 
 __all__ = [
     "LLMService",
@@ -26,4 +32,23 @@ __all__ = [
     "SessionService",
     "session_service",
     "get_session_service",
+    "InteractionWriter",
+    "interaction_writer",
+    "get_interaction_writer",
+    "RetentionService",
+    "retention_service",
+    "get_retention_service",
+    "CatalogCacheService",
+    "catalog_cache_service",
+    "get_catalog_cache_service",
+    "ParseExecutor",
+    "parse_executor",
+    "get_parse_executor",
+    "CassetteStore",
+    "create_chat_provider",
+    "create_embedding_provider",
+    "get_provider_metrics",
+    "TokenLedger",
+    "token_ledger",
+    "get_token_ledger",
 ]
\ No newline at end of file
@@ -0,0 +1,272 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.config import settings
+from app.database.sqlite_db import db_manager
+from app.models.database_models import AssessmentCache
+from app.utils.cache import LRUCache
+from app.utils.logger import get_logger
+from app.utils.metrics import DB_WRITE_DURATION
+
+logger = get_logger("catalog_cache_service")
+
+
+class CatalogCacheService:
+    """
+    Read-through, write-back cache for URL-keyed catalog lookups
+    
+    Lookups go in-process LRU -> assessment_cache table -> loader (Chroma).
+    Loader results and access counters are buffered in memory and written
+    to assessment_cache in one batched transaction by a background task.
+    """
+    
+    def __init__(self, max_size: int = None, flush_interval: float = None):
+        self.lru = LRUCache(max_size or settings.CATALOG_CACHE_SIZE)
+        self.flush_interval = flush_interval or settings.CATALOG_CACHE_FLUSH_INTERVAL
+        self._pending_rows: Dict[str, Dict[str, Any]] = {}
+        self._pending_access: Dict[str, Tuple[int, datetime]] = {}
+        self._pending_lock = threading.Lock()
+        self._worker: Optional[asyncio.Task] = None
+        
+        self.table_hits = 0
+        self.loader_calls = 0
+        self.flush_count = 0
+        self.flush_failures = 0
+        self.last_flush_latency = 0.0
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether the background flush task is alive"""
+        return self._worker is not None and not self._worker.done()
+    
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """Cache key for a catalog URL"""
+        return url.strip().rstrip("/")
+    
+    def start(self):
+        """Start the background flush task on the running event loop"""
+        if self.is_running:
+            return
+        
+        self._worker = asyncio.create_task(self._run(), name="catalog-cache-flush")
+        logger.info(
+            f"Catalog cache started - LRU: {self.lru.max_size}, "
+            f"Flush interval: {self.flush_interval:.1f}s"
+        )
+    
+    async def stop(self):
+        """Stop the background task and write back anything pending"""
+        if self.is_running:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        
+        await asyncio.to_thread(self.flush)
+        logger.info("Catalog cache stopped")
+    
+    async def _run(self):
+        """Background loop writing back buffered rows and access counters"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._pending_rows or self._pending_access:
+                await asyncio.to_thread(self.flush)
+    
+    async def get(
+        self,
+        url: str,
+        loader: Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get an assessment by URL, loading it on a miss
+        
+        Args:
+            url: Assessment URL
+            loader: Coroutine returning the assessment from the source of truth
+        
+        Returns:
+            Assessment data or None
+        """
+        if not self.is_running:
+            self.start()
+        
+        key = self.normalize_url(url)
+        data = self.lru.get(key)
+        
+        if data is None:
+            data = await asyncio.to_thread(self._load_row, key)
+            if data is not None:
+                self.table_hits += 1
+            else:
+                self.loader_calls += 1
+                data = await loader(url)
+                if data is None:
+                    return None
+                with self._pending_lock:
+                    self._pending_rows[key] = data
+            self.lru.set(key, data)
+        
+        self._record_access(key)
+        return dict(data)
+    
+    def put_many(self, assessments: List[Dict[str, Any]]) -> int:
+        """
+        Write assessments straight to the cache table and LRU
+        
+        Used after (re)indexing so the cache matches the vector store.
+        
+        Args:
+            assessments: Assessment dictionaries with url and name
+        
+        Returns:
+            Number of assessments written
+        """
+        rows = {self.normalize_url(a["url"]): a for a in assessments if a.get("url")}
+        if not rows:
+            return 0
+        
+        with db_manager.write_session() as db:
+            self._upsert_rows(db, rows)
+        
+        for key, data in rows.items():
+            if key in self.lru:
+                self.lru.set(key, data)
+        
+        logger.info(f"Wrote {len(rows)} assessments to catalog cache")
+        return len(rows)
+    
+    def invalidate(self, url: Optional[str] = None):
+        """
+        Invalidate one URL or the whole cache
+        
+        Args:
+            url: URL to invalidate, or None for everything
+        """
+        with db_manager.write_session() as db:
+            query = db.query(AssessmentCache)
+            if url:
+                key = self.normalize_url(url)
+                self.lru.pop(key)
+                with self._pending_lock:
+                    self._pending_rows.pop(key, None)
+                query = query.filter(AssessmentCache.url == key)
+            else:
+                self.lru.clear()
+                with self._pending_lock:
+                    self._pending_rows.clear()
+            query.delete(synchronize_session=False)
+    
+    def _load_row(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read one row from the cache table"""
+        with db_manager.get_session() as db:
+            row = db.query(AssessmentCache.data).filter(AssessmentCache.url == key).first()
+            return row[0] if row else None
+    
+    def _record_access(self, key: str):
+        """Buffer an access counter increment"""
+        with self._pending_lock:
+            count, _ = self._pending_access.get(key, (0, None))
+            self._pending_access[key] = (count + 1, datetime.utcnow())
+    
+    def _upsert_rows(self, db, rows: Dict[str, Dict[str, Any]]):
+        """Insert or refresh cache rows"""
+        now = datetime.utcnow()
+        for key, data in rows.items():
+            stmt = sqlite_insert(AssessmentCache).values(
+                url=key,
+                name=data.get("name", ""),
+                data=data,
+                created_at=now,
+                updated_at=now,
+                access_count=0
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[AssessmentCache.url],
+                set_={"name": stmt.excluded.name, "data": stmt.excluded.data, "updated_at": now}
+            )
+            db.execute(stmt)
+    
+    def flush(self) -> int:
+        """
+        Write back buffered rows and access counters in one transaction
+        
+        Returns:
+            Number of access counter updates written
+        """
+        with self._pending_lock:
+            rows, self._pending_rows = self._pending_rows, {}
+            access, self._pending_access = self._pending_access, {}
+        if not rows and not access:
+            return 0
+        
+        start_time = time.perf_counter()
+        try:
+            with db_manager.write_session() as db:
+                if rows:
+                    self._upsert_rows(db, rows)
+                if access:
+                    db.execute(
+                        text(
+                            "UPDATE assessment_cache "
+                            "SET access_count = COALESCE(access_count, 0) + :count, last_accessed = :ts "
+                            "WHERE url = :url"
+                        ),
+                        [{"url": key, "count": count, "ts": ts} for key, (count, ts) in access.items()]
+                    )
+            self.flush_count += 1
+        except Exception as e:
+            self.flush_failures += 1
+            logger.error(f"Catalog cache flush failed: {e}")
+            return 0
+        
+        self.last_flush_latency = time.perf_counter() - start_time
+        DB_WRITE_DURATION.observe(self.last_flush_latency, "catalog_cache_flush")
+        logger.debug(
+            f"Catalog cache flushed {len(rows)} rows and {len(access)} counters "
+            f"in {self.last_flush_latency * 1000:.1f}ms"
+        )
+        return len(access)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get cache metrics
+        
+        Returns:
+            Metrics dictionary
+        """
+        return {
+            "running": self.is_running,
+            "lru": self.lru.get_stats(),
+            "table_hits": self.table_hits,
+            "loader_calls": self.loader_calls,
+            "pending_rows": len(self._pending_rows),
+            "pending_access": len(self._pending_access),
+            "flushes": self.flush_count,
+            "flush_failures": self.flush_failures,
+            "last_flush_latency_ms": self.last_flush_latency * 1000
+        }
+
+
+catalog_cache_service = CatalogCacheService()
+
+
+def get_catalog_cache_service() -> CatalogCacheService:
+    """Get catalog cache service instance"""
+    return catalog_cache_service
+
+
+async def start_catalog_cache():
+    """Start catalog cache write-back on startup"""
+    catalog_cache_service.start()
+
+
+async def stop_catalog_cache():
+    """Write back pending cache updates on shutdown"""
+    await catalog_cache_service.stop()
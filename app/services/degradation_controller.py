@@ -0,0 +1,209 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+from app.config import settings
+from app.services.interaction_writer import get_interaction_writer
+from app.utils.logger import get_logger
+
+logger = get_logger("degradation_controller")
+
+# Modes from normal to most degraded; each one also skips the stages of the modes before it
+MODES = ("normal", "skip_rerank", "skip_supervisor_llm", "skip_processor_llm")
+
+# Optional LLM stage -> lowest level at which it is skipped
+STAGE_LEVELS = {
+    "rerank": 1,
+    "supervisor_llm": 2,
+    "processor_llm": 3
+}
+
+
+class DegradationController:
+    """
+    Load-aware switch for the optional LLM stages
+    
+    Load is the worst of three ratios: requests in flight over
+    DEGRADE_MAX_IN_FLIGHT, mean LLM call latency over the last
+    DEGRADE_WINDOW seconds over DEGRADE_LLM_LATENCY_TARGET, and the
+    interaction queue fill over DEGRADE_QUEUE_HIGH_WATER. The latency ratio
+    only counts while at least DEGRADE_LATENCY_MIN_IN_FLIGHT requests are in
+    flight: slow LLM calls alone mean a slow provider, and skipping stages
+    for every user would not make it faster. A load of 1.0
+    enters the first degraded mode and every further DEGRADE_STEP adds one
+    more. The level goes up as soon as load crosses a threshold and comes
+    down a step once load has been below DEGRADE_RECOVERY_RATIO of that
+    step's threshold for DEGRADE_MIN_DWELL seconds, so an idle service is
+    back to normal on its next request.
+    
+    With no LLM calls in the window the latency ratio is 0, so a fully
+    degraded service probes its way back once the window has emptied.
+    """
+    
+    def __init__(
+        self,
+        enabled: bool = None,
+        max_in_flight: int = None,
+        llm_latency_target: float = None,
+        latency_min_in_flight: int = None,
+        queue_high_water: float = None,
+        step: float = None,
+        recovery_ratio: float = None,
+        min_dwell: float = None,
+        window: float = None
+    ):
+        self.enabled = enabled if enabled is not None else settings.DEGRADATION_ENABLED
+        self.max_in_flight = max_in_flight or settings.DEGRADE_MAX_IN_FLIGHT
+        self.llm_latency_target = llm_latency_target or settings.DEGRADE_LLM_LATENCY_TARGET
+        self.latency_min_in_flight = (
+            latency_min_in_flight if latency_min_in_flight is not None else settings.DEGRADE_LATENCY_MIN_IN_FLIGHT
+        )
+        self.queue_high_water = queue_high_water or settings.DEGRADE_QUEUE_HIGH_WATER
+        self.step = step or settings.DEGRADE_STEP
+        self.recovery_ratio = recovery_ratio or settings.DEGRADE_RECOVERY_RATIO
+        self.min_dwell = min_dwell if min_dwell is not None else settings.DEGRADE_MIN_DWELL
+        self.window = window or settings.DEGRADE_WINDOW
+        
+        self.level = 0
+        self.in_flight = 0
+        self._llm_latencies: Deque[Tuple[float, float]] = deque()
+        self._level_since = time.monotonic()
+        self._hot_at = self._level_since
+        self._time_in_mode = {mode: 0.0 for mode in MODES}
+        self.transitions = 0
+        self.degraded_requests = 0
+        self.skipped_stages = {stage: 0 for stage in STAGE_LEVELS}
+        self._lock = threading.Lock()
+    
+    def observe_llm_latency(self, seconds: float):
+        """Record the latency of one LLM call"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._llm_latencies.append((now, seconds))
+            self._prune(now)
+    
+    def _prune(self, now: float):
+        while self._llm_latencies and self._llm_latencies[0][0] < now - self.window:
+            self._llm_latencies.popleft()
+    
+    def _mean_llm_latency(self, now: float) -> float:
+        self._prune(now)
+        if not self._llm_latencies:
+            return 0.0
+        return sum(latency for _, latency in self._llm_latencies) / len(self._llm_latencies)
+    
+    def _load(self, now: float) -> Dict[str, float]:
+        writer = get_interaction_writer().get_metrics()
+        queue_fill = writer["queue_depth"] / writer["queue_capacity"] if writer["queue_capacity"] else 0.0
+        latency = self._mean_llm_latency(now)
+        if self.in_flight < self.latency_min_in_flight:
+            latency = 0.0
+        return {
+            "in_flight": self.in_flight / self.max_in_flight,
+            "llm_latency": latency / self.llm_latency_target,
+            "queue": queue_fill / self.queue_high_water
+        }
+    
+    def _set_level(self, level: int, now: float, load: float):
+        self._time_in_mode[MODES[self.level]] += now - self._level_since
+        logger.warning(f"Degradation mode {MODES[self.level]} -> {MODES[level]} (load {load:.2f})")
+        self.level = level
+        self._level_since = now
+        self.transitions += 1
+    
+    def evaluate(self) -> int:
+        """
+        Update the level from the current load
+        
+        Returns:
+            Current level (index into MODES)
+        """
+        if not self.enabled:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            load = max(self._load(now).values())
+            target = 0 if load < 1.0 else min(int((load - 1.0) / self.step) + 1, len(MODES) - 1)
+            if target > self.level:
+                self._set_level(target, now, load)
+                self._hot_at = now
+            while self.level > 0:
+                threshold = 1.0 + (self.level - 1) * self.step
+                if load >= threshold * self.recovery_ratio:
+                    self._hot_at = now
+                    break
+                if now - self._hot_at < self.min_dwell:
+                    break
+                self._set_level(self.level - 1, now, load)
+            return self.level
+    
+    def begin_request(self) -> Dict[str, Any]:
+        """
+        Admit a request and fix its mode for the whole workflow run
+        
+        Returns:
+            Degradation entry for the graph state
+        """
+        level = self.evaluate()
+        with self._lock:
+            self.in_flight += 1
+            if level:
+                self.degraded_requests += 1
+        return {'mode': MODES[level], 'level': level, 'skipped': []}
+    
+    def end_request(self):
+        with self._lock:
+            self.in_flight -= 1
+    
+    def should_skip(self, state: Dict[str, Any], stage: str) -> bool:
+        """
+        Whether a request's mode skips an optional stage
+        
+        Args:
+            state: Graph state carrying the request's 'degradation' entry
+            stage: Stage name from STAGE_LEVELS
+        
+        Returns:
+            True if the stage should be skipped
+        """
+        degradation = state.get('degradation')
+        if not degradation or degradation['level'] < STAGE_LEVELS[stage]:
+            return False
+        with self._lock:
+            self.skipped_stages[stage] += 1
+        return True
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get mode, load and time spent in each mode
+        
+        Returns:
+            Metrics dictionary
+        """
+        now = time.monotonic()
+        with self._lock:
+            load = self._load(now)
+            time_in_mode = dict(self._time_in_mode)
+            time_in_mode[MODES[self.level]] += now - self._level_since
+            return {
+                'enabled': self.enabled,
+                'mode': MODES[self.level],
+                'level': self.level,
+                'in_flight': self.in_flight,
+                'load': {name: round(value, 3) for name, value in load.items()},
+                'mean_llm_latency': round(self._mean_llm_latency(now), 3),
+                'seconds_in_mode': {mode: round(seconds, 1) for mode, seconds in time_in_mode.items()},
+                'transitions': self.transitions,
+                'degraded_requests': self.degraded_requests,
+                'skipped_stages': dict(self.skipped_stages)
+            }
+
+
+degradation_controller = DegradationController()
+
+
+def get_degradation_controller() -> DegradationController:
+    """Get degradation controller instance"""
+    return degradation_controller
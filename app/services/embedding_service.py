@@ -1,39 +1,56 @@
-from typing import List
-from langchain_openai import OpenAIEmbeddings
+import time
+from typing import Any, Awaitable, Callable, List
 from app.config import settings
+from app.services.model_providers import create_embedding_provider
 from app.utils.logger import get_logger
+from app.utils.metrics import EMBEDDING_DURATION, EMBEDDING_TEXTS
+from app.utils.tracing import get_tracer
 from app.utils.helpers import chunk_list
 import numpy as np
 logger = get_logger("embedding_service")
 
 
 class EmbeddingService:
-    """Service for generating embeddings using OpenAI text-embedding-3-large"""
+    """
+    Service for generating embeddings using OpenAI text-embedding-3-large
+    
+    Calls go through the embedding provider chosen by MODEL_PROVIDER.
+    """
     
     def __init__(self):
         self.api_key = settings.OPENAI_API_KEY
         self.model_name = settings.OPENAI_EMBEDDING_MODEL
         self.batch_size = settings.EMBEDDING_BATCH_SIZE
         self._initialized = False
-        self.embeddings = None
+        self.provider = None
     
     def initialize(self):
-        """Initialize OpenAI embeddings"""
+        """Initialize the embedding provider"""
         if self._initialized:
             return
         
         try:
-            self.embeddings = OpenAIEmbeddings(
-                model=self.model_name,
-                openai_api_key=self.api_key,
-                dimensions=3072 
-            )
+            self.provider = create_embedding_provider()
             self._initialized = True
-            logger.info(f"Embedding service initialized with model: {self.model_name}")
+            logger.info(f"Embedding service initialized with model: {self.model_name} ({self.provider.mode} provider)")
         except Exception as e:
             logger.error(f"Failed to initialize embedding service: {e}")
             raise
     
+    async def _embed(self, call: str, method: Callable[[Any], Awaitable[Any]], payload: Any) -> Any:
+        """Provider call with latency and volume metrics and a trace span"""
+        texts = len(payload) if isinstance(payload, list) else 1
+        EMBEDDING_TEXTS.inc(texts, call)
+        with get_tracer().span("embedding", **{"embedding.call": call, "embedding.texts": texts, "embedding.model": self.model_name}):
+            start_time = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await method(payload)
+                outcome = "success"
+                return result
+            finally:
+                EMBEDDING_DURATION.observe(time.perf_counter() - start_time, call, outcome)
+    
     async def generate_embedding(self, text: str) -> List[float]:
         """
         Generate embedding for a single text
@@ -48,7 +65,7 @@ class EmbeddingService:
             self.initialize()
         
         try:
-            embedding = self.embeddings.embed_query(text)
+            embedding = await self._embed("query", self.provider.embed_query, text)
             
             logger.debug(f"Generated embedding of dimension {len(embedding)}")
             return embedding
@@ -86,7 +103,7 @@ class EmbeddingService:
         for batch_idx, batch in enumerate(text_batches):
             try:
                 logger.debug(f"Processing batch {batch_idx + 1}/{len(text_batches)}")
-                batch_embeddings = self.embeddings.embed_documents(batch)
+                batch_embeddings = await self._embed("documents", self.provider.embed_documents, batch)
                 embeddings.extend(batch_embeddings)
                 
             except Exception as e:
@@ -111,7 +128,7 @@ class EmbeddingService:
             self.initialize()
         
         try:
-            embedding = self.embeddings.embed_query(query)
+            embedding = await self._embed("query", self.provider.embed_query, query)
             
             logger.debug(f"Generated query embedding of dimension {len(embedding)}")
             return embedding
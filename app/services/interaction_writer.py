@@ -0,0 +1,258 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, StatementError
+from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.metrics import DB_WRITE_DURATION
+
+logger = get_logger("interaction_writer")
+
+
+def _is_record_error(error: Exception) -> bool:
+    """Whether a write failed because of the records rather than the database"""
+    if isinstance(error, (IntegrityError, DataError, TypeError, ValueError)):
+        return True
+    return isinstance(error, StatementError) and not isinstance(error, DBAPIError)
+
+
+class InteractionWriter:
+    """
+    Write-behind queue for interaction persistence
+    
+    Interactions are buffered in memory and flushed to SQLite in batched
+    transactions by a background task, so the request path never waits
+    on database writes.
+    """
+    
+    def __init__(
+        self,
+        max_queue_size: int = None,
+        batch_size: int = None,
+        flush_interval: float = None,
+        enqueue_timeout: float = None
+    ):
+        self.max_queue_size = max_queue_size or settings.PERSISTENCE_QUEUE_MAXSIZE
+        self.batch_size = batch_size or settings.PERSISTENCE_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.PERSISTENCE_FLUSH_INTERVAL
+        self.enqueue_timeout = enqueue_timeout or settings.PERSISTENCE_ENQUEUE_TIMEOUT
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+        
+        self.enqueued_count = 0
+        self.written_count = 0
+        self.dropped_count = 0
+        self.failed_count = 0
+        self.flush_count = 0
+        self.max_queue_depth = 0
+        self.last_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether the background flush task is alive"""
+        return self._worker is not None and not self._worker.done()
+    
+    def start(self):
+        """Start the background flush task on the running event loop"""
+        if self.is_running:
+            return
+        
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._stopping = False
+        self._worker = asyncio.create_task(self._run(), name="interaction-writer")
+        logger.info(
+            f"Interaction writer started - "
+            f"Queue: {self.max_queue_size}, Batch: {self.batch_size}, "
+            f"Interval: {self.flush_interval:.2f}s"
+        )
+    
+    async def stop(self):
+        """Drain the queue and stop the background task"""
+        if not self.is_running:
+            return
+        
+        self._stopping = True
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        
+        self._worker = None
+        logger.info(
+            f"Interaction writer stopped - "
+            f"written={self.written_count}, dropped={self.dropped_count}, failed={self.failed_count}"
+        )
+    
+    async def submit(
+        self,
+        session_id: str,
+        query: str,
+        query_type: str,
+        intent: Optional[str] = None,
+        recommended_assessments: Optional[List[Dict[str, Any]]] = None,
+        processing_time: Optional[float] = None,
+        error_message: Optional[str] = None,
+        agent_outputs: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Queue an interaction for persistence
+        
+        Waits up to the enqueue timeout when the queue is full (backpressure),
+        then drops the record rather than blocking the caller indefinitely.
+        
+        Args:
+            session_id: Session ID
+            query: User query
+            query_type: Type of query
+            intent: Classified intent
+            recommended_assessments: List of recommended assessments
+            processing_time: Processing time in seconds
+            error_message: Error message if any
+            agent_outputs: Outputs from various agents
+        
+        Returns:
+            True if queued, False if dropped
+        """
+        if not self.is_running:
+            self.start()
+        
+        record = {
+            "session_id": session_id,
+            "timestamp": datetime.utcnow(),
+            "query": query,
+            "query_type": query_type,
+            "intent": intent,
+            "recommended_assessments": recommended_assessments,
+            "processing_time": processing_time,
+            "error_message": error_message,
+            "agent_outputs": agent_outputs or {}
+        }
+        
+        try:
+            await asyncio.wait_for(self._queue.put(record), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.dropped_count += 1
+            logger.warning(
+                f"Persistence queue full ({self._queue.qsize()}), "
+                f"dropped interaction for session {session_id}"
+            )
+            return False
+        
+        self.enqueued_count += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return True
+    
+    async def _run(self):
+        """Background loop collecting records into batches and flushing them"""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stopping:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            await self._flush(batch)
+            for _ in batch:
+                self._queue.task_done()
+    
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        """Write one batch in a worker thread so the event loop stays free"""
+        start_time = time.perf_counter()
+        await self._write(batch)
+        
+        latency = time.perf_counter() - start_time
+        DB_WRITE_DURATION.observe(latency, "interactions_batch")
+        self.flush_count += 1
+        self.last_flush_latency = latency
+        self.total_flush_latency += latency
+        self.max_flush_latency = max(self.max_flush_latency, latency)
+        logger.debug(f"Flushed {len(batch)} interactions in {latency * 1000:.1f}ms")
+    
+    async def _write(self, batch: List[Dict[str, Any]]):
+        """
+        Write records in one transaction, halving the batch on bad records
+        
+        When a record breaks the transaction (integrity or data error) the
+        batch is split and each half retried, so the bad record only costs
+        itself. Any other failure, e.g. the database being locked or
+        unavailable, drops the whole batch at once: retrying it piece by
+        piece would only hold the writer lock for another busy timeout per
+        attempt.
+        """
+        from app.services.session_service import get_session_service
+        
+        try:
+            await asyncio.to_thread(get_session_service().save_interactions_batch, batch)
+            self.written_count += len(batch)
+        except Exception as e:
+            if not _is_record_error(e):
+                self.failed_count += len(batch)
+                logger.error(f"Failed to flush {len(batch)} interactions: {e}")
+                return
+            
+            if len(batch) == 1:
+                self.failed_count += 1
+                logger.error(f"Failed to write interaction for session {batch[0]['session_id']}: {e}")
+                return
+            
+            logger.warning(f"Failed to flush {len(batch)} interactions, retrying in halves: {e}")
+            middle = len(batch) // 2
+            await self._write(batch[:middle])
+            await self._write(batch[middle:])
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get queue and flush metrics
+        
+        Returns:
+            Metrics dictionary
+        """
+        return {
+            "running": self.is_running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "queue_capacity": self.max_queue_size,
+            "enqueued": self.enqueued_count,
+            "written": self.written_count,
+            "dropped": self.dropped_count,
+            "failed": self.failed_count,
+            "flushes": self.flush_count,
+            "last_flush_latency_ms": self.last_flush_latency * 1000,
+            "avg_flush_latency_ms": (
+                self.total_flush_latency / self.flush_count * 1000 if self.flush_count else 0.0
+            ),
+            "max_flush_latency_ms": self.max_flush_latency * 1000
+        }
+
+
+interaction_writer = InteractionWriter()
+
+
+def get_interaction_writer() -> InteractionWriter:
+    """Get interaction writer instance"""
+    return interaction_writer
+
+
+async def start_interaction_writer():
+    """Start interaction writer on startup"""
+    interaction_writer.start()
+
+
+async def stop_interaction_writer():
+    """Flush pending interactions and stop the writer on shutdown"""
+    await interaction_writer.stop()
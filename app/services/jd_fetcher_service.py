@@ -1,21 +1,68 @@
+import asyncio
 import re
-from typing import Optional, Dict, Any
-import requests
-from bs4 import BeautifulSoup
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, List
+import httpx
 from app.config import settings
+from app.services.parse_executor import get_parse_executor
+from app.utils.cache import TTLCache
 from app.utils.logger import get_logger
+from app.utils.validators import canonicalize_url
 
 logger = get_logger("jd_fetcher_service")
 
+JD_URL_PATTERN = re.compile(r'job|career|position|opening|hiring|apply|vacancy|recruit')
+SUPPORTED_CONTENT_TYPES = ("html", "xml", "text/plain")
+
 
 class JDFetcherService:
-    """Service for fetching job descriptions from URLs"""
+    """
+    Service for fetching job descriptions from URLs
+    
+    Pages are streamed on a pooled httpx.AsyncClient and cut off at
+    JD_FETCH_MAX_BYTES. Extracted JDs are cached by canonical URL for as
+    long as the page's Cache-Control allows, and concurrent requests for
+    the same URL share one fetch.
+    """
     
     def __init__(self):
         self.timeout = settings.SCRAPER_TIMEOUT
+        self.max_bytes = settings.JD_FETCH_MAX_BYTES
+        self.max_connections = settings.JD_FETCH_MAX_CONNECTIONS
+        self.max_ttl = settings.JD_CACHE_MAX_TTL
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.cache = TTLCache(settings.JD_CACHE_SIZE, default_ttl=settings.JD_CACHE_TTL)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        
+        self.fetch_count = 0
+        self.coalesced_count = 0
+        self.truncated_count = 0
+        self.failure_count = 0
+        self.fetch_time = 0.0
+    
+    async def open(self):
+        """Create the shared client if needed"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+    
+    async def close(self):
+        """Close the shared client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     async def fetch_jd_from_url(self, url: str) -> Dict[str, Any]:
         """
@@ -25,147 +72,244 @@ class JDFetcherService:
             url: URL containing job description
             
         Returns:
-            Dictionary with JD text and metadata
+            Dictionary with JD text and metadata ("cached" tells whether
+            the network and parse were skipped)
         """
+        key = canonicalize_url(url)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"JD cache hit for {key}")
+            return {**cached, "cached": True}
+        
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced_count += 1
+        else:
+            task = asyncio.create_task(self._fetch(url, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # Shielded so one caller being cancelled does not cancel the fetch for the others
+        result = await asyncio.shield(task)
+        return {**result, "cached": False}
+    
+    async def _fetch(self, url: str, key: str) -> Dict[str, Any]:
+        """Download, parse and cache one page"""
+        start_time = time.perf_counter()
+        self.fetch_count += 1
+        
         try:
             logger.info(f"Fetching JD from URL: {url}")
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            jd_text = self._extract_job_description(soup)
+            content, ttl = await self._download(url)
+            parsed = await get_parse_executor().parse_job_page(content, url)
+            jd_text = parsed["jd_text"]
             
             if not jd_text:
                 logger.warning(f"Could not extract JD text from URL: {url}")
-                return {
-                    "success": False,
-                    "jd_text": None,
-                    "error_message": "Failed to extract job description from page",
-                    "metadata": {"url": url}
-                }
-            
-            metadata = self._extract_metadata(soup, url)
+                return self._error(url, "Failed to extract job description from page")
             
             logger.info(f"Successfully fetched JD ({len(jd_text)} characters)")
             
-            return {
+            result = {
                 "success": True,
                 "jd_text": jd_text,
                 "error_message": None,
-                "metadata": metadata
+                "metadata": parsed["metadata"]
             }
+            self.cache.set(key, result, ttl=ttl)
+            return result
             
-        except requests.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             logger.error(f"Failed to fetch URL {url}: {e}")
-            return {
-                "success": False,
-                "jd_text": None,
-                "error_message": f"Failed to fetch URL: {str(e)}",
-                "metadata": {"url": url}
-            }
+            return self._error(url, f"Failed to fetch URL: {str(e)}")
         except Exception as e:
             logger.error(f"Error processing JD from URL {url}: {e}")
-            return {
-                "success": False,
-                "jd_text": None,
-                "error_message": f"Error processing page: {str(e)}",
-                "metadata": {"url": url}
-            }
+            return self._error(url, f"Error processing page: {str(e)}")
+        finally:
+            self.fetch_time += time.perf_counter() - start_time
     
-    def _extract_job_description(self, soup: BeautifulSoup) -> Optional[str]:
+    async def _download(self, url: str) -> tuple[bytes, float]:
         """
-        Extract job description text from HTML
+        Stream a page body, stopping at max_bytes
         
-        Args:
-            soup: BeautifulSoup object
-            
         Returns:
-            Extracted JD text or None
+            (body, cache TTL in seconds)
         """
-        jd_containers = [
-            soup.find('div', class_=re.compile(r'job.*description', re.I)),
-            soup.find('div', id=re.compile(r'job.*description', re.I)),
-            soup.find('section', class_=re.compile(r'job.*description', re.I)),
-            soup.find('div', class_=re.compile(r'description', re.I)),
-            soup.find('article'),
-            soup.find('main'),
-        ]
-        
-        for container in jd_containers:
-            if container:
-                text = self._clean_text(container.get_text())
-                if len(text) > 200:  
-                    return text
-        
-        keywords = ['responsibilities', 'requirements', 'qualifications', 'job description']
-        for keyword in keywords:
-            elements = soup.find_all(string=re.compile(keyword, re.I))
-            if elements:
-                parent = elements[0].find_parent()
-                if parent:
-                    text = self._clean_text(parent.get_text())
-                    if len(text) > 200:
-                        return text
-        paragraphs = soup.find_all('p')
-        if paragraphs:
-            text = '\n'.join([p.get_text() for p in paragraphs])
-            text = self._clean_text(text)
-            if len(text) > 200:
-                return text
-        
-        body = soup.find('body')
-        if body:
-            for script in body(['script', 'style', 'nav', 'header', 'footer']):
-                script.decompose()
-            
-            text = self._clean_text(body.get_text())
-            if len(text) > 200:
-                return text
+        await self.open()
         
-        return None
+        async with self._client.stream("GET", url) as response:
+            response.raise_for_status()
+            
+            content_type = response.headers.get("content-type", "").lower()
+            if content_type and not any(t in content_type for t in SUPPORTED_CONTENT_TYPES):
+                raise ValueError(f"Unsupported content type: {content_type}")
+            
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) >= self.max_bytes:
+                    self.truncated_count += 1
+                    logger.warning(f"Page {url} exceeds {self.max_bytes} bytes, parsing the first part only")
+                    del body[self.max_bytes:]
+                    break
+            
+            return bytes(body), self._cache_ttl(response.headers)
     
-    def _extract_metadata(self, soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+    def _cache_ttl(self, headers: httpx.Headers) -> float:
         """
-        Extract metadata from page
+        How long a response may be cached, from Cache-Control/Expires
         
-        Args:
-            soup: BeautifulSoup object
-            url: Page URL
-            
-        Returns:
-            Metadata dictionary
+        no-store, no-cache and private responses are not cached; max-age
+        and Expires are capped at JD_CACHE_MAX_TTL. Without either the
+        default TTL applies.
         """
-        metadata = {"url": url}
+        directives = {}
+        for part in headers.get("cache-control", "").lower().split(","):
+            name, _, value = part.strip().partition("=")
+            if name:
+                directives[name] = value.strip('"')
+        
+        if {"no-store", "no-cache", "private"} & directives.keys():
+            return 0.0
         
-        title = soup.find('title')
-        if title:
-            metadata['title'] = title.get_text().strip()
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc and meta_desc.get('content'):
-            metadata['meta_description'] = meta_desc['content'].strip()
+        for name in ("s-maxage", "max-age"):
+            if directives.get(name, "").isdigit():
+                age = headers.get("age", "0")
+                return min(float(directives[name]) - (float(age) if age.isdigit() else 0.0), self.max_ttl)
         
-        h1 = soup.find('h1')
-        if h1:
-            metadata['page_heading'] = h1.get_text().strip()
+        if "expires" in headers:
+            try:
+                expires = parsedate_to_datetime(headers["expires"])
+                return min((expires - datetime.now(timezone.utc)).total_seconds(), self.max_ttl)
+            except (TypeError, ValueError):
+                return 0.0
         
-        return metadata
+        return self.cache.default_ttl
     
-    def _clean_text(self, text: str) -> str:
+    async def fetch_jd_from_urls(
+        self,
+        urls: List[str],
+        deadline: Optional[float] = None,
+        grace: Optional[float] = None
+    ) -> Dict[str, Any]:
         """
-        Clean extracted text
+        Fetch several JD URLs concurrently and merge the results
+        
+        All URLs are requested at once (hedged): the first successful
+        response becomes the primary JD, and other responses arriving within
+        `grace` seconds of it are merged in if they add new text. Nothing
+        waits beyond `deadline`; fetches still running then are left to
+        finish in the background and warm the cache.
         
         Args:
-            text: Raw text
+            urls: Candidate JD URLs, in the order they appeared
+            deadline: Overall time budget in seconds
+            grace: How long to wait for more JDs after the first success
             
         Returns:
-            Cleaned text
+            Dictionary with merged JD text, primary URL, source URLs and
+            per-URL failures
         """
-        text = re.sub(r'\s+', ' ', text)
+        deadline = settings.JD_FETCH_DEADLINE if deadline is None else deadline
+        grace = settings.JD_HEDGE_GRACE if grace is None else grace
         
-        text = re.sub(r'[\r\n\t]+', '\n', text)
+        unique: Dict[str, str] = {}
+        for url in urls:
+            unique.setdefault(canonicalize_url(url), url)
+        candidates = list(unique.values())[:settings.JD_MAX_URLS]
         
-        text = re.sub(r'\n+', '\n', text)
+        result = {
+            "success": False,
+            "jd_text": None,
+            "primary_url": None,
+            "source_urls": [],
+            "failed_urls": {},
+            "timed_out_urls": [],
+            "error_message": None
+        }
+        if not candidates:
+            result["error_message"] = "No URLs to fetch"
+            return result
+        
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline
+        tasks = {asyncio.create_task(self.fetch_jd_from_url(url)): url for url in candidates}
+        pending = set(tasks)
+        successes: List[Dict[str, Any]] = []
         
-        return text.strip()
+        while pending:
+            timeout = end - loop.time()
+            if successes:
+                timeout = min(timeout, first_success_at + grace - loop.time())
+            if timeout <= 0:
+                break
+            
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                url = tasks[task]
+                fetched = task.result()
+                if fetched["success"]:
+                    if not successes:
+                        first_success_at = loop.time()
+                    successes.append({**fetched, "url": url})
+                else:
+                    result["failed_urls"][url] = fetched["error_message"]
+        
+        for task in pending:
+            task.cancel()
+        result["timed_out_urls"] = [tasks[task] for task in pending]
+        
+        if not successes:
+            reasons = list(result["failed_urls"].values())
+            if result["timed_out_urls"]:
+                reasons.append(f"Timed out after {deadline:.0f}s")
+            result["error_message"] = "; ".join(reasons) or "Failed to fetch job description"
+            return result
+        
+        primary, others = successes[0], sorted(successes[1:], key=lambda s: len(s["jd_text"]), reverse=True)
+        merged = [primary["jd_text"]]
+        result["source_urls"] = [primary["url"]]
+        for other in others:
+            text = other["jd_text"]
+            total = sum(len(part) for part in merged)
+            if any(text in part or part in text for part in merged) or total + len(text) > settings.JD_MERGE_MAX_CHARS:
+                continue
+            merged.append(text)
+            result["source_urls"].append(other["url"])
+        
+        result.update({
+            "success": True,
+            "jd_text": "\n\n".join(merged),
+            "primary_url": primary["url"]
+        })
+        return result
+    
+    def _error(self, url: str, message: str) -> Dict[str, Any]:
+        self.failure_count += 1
+        return {
+            "success": False,
+            "jd_text": None,
+            "error_message": message,
+            "metadata": {"url": url}
+        }
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get JD fetcher metrics
+        
+        Returns:
+            Metrics dictionary
+        """
+        return {
+            "cache": self.cache.get_stats(),
+            "fetches": self.fetch_count,
+            "coalesced": self.coalesced_count,
+            "in_flight": len(self._inflight),
+            "truncated": self.truncated_count,
+            "failures": self.failure_count,
+            "avg_fetch_ms": self.fetch_time * 1000 / self.fetch_count if self.fetch_count else 0.0,
+            "max_bytes": self.max_bytes
+        }
     
     def is_valid_jd_url(self, url: str) -> bool:
         """
@@ -177,25 +321,16 @@ class JDFetcherService:
         Returns:
             True if likely a JD URL
         """
-
-        jd_patterns = [
-            r'job',
-            r'career',
-            r'position',
-            r'opening',
-            r'hiring',
-            r'apply',
-            r'vacancy',
-            r'recruit'
-        ]
-        
-        url_lower = url.lower()
-        
-        return any(re.search(pattern, url_lower) for pattern in jd_patterns)
+        return bool(JD_URL_PATTERN.search(url.lower()))
 
 jd_fetcher_service = JDFetcherService()
 
 
 def get_jd_fetcher_service() -> JDFetcherService:
     """Get JD fetcher service instance"""
-    return jd_fetcher_service
\ No newline at end of file
+    return jd_fetcher_service
+
+
+async def close_jd_fetcher():
+    """Close the JD fetcher client on shutdown"""
+    await jd_fetcher_service.close()
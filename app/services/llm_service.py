@@ -1,17 +1,26 @@
 import json
-from typing import Dict, Any, Optional, List, Type
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
+import time
+from typing import Dict, Any, Optional, List, Tuple, Type
 from pydantic import BaseModel
 from app.config import settings
+from app.services.model_providers import create_chat_provider
+from app.services.token_ledger import get_token_ledger
+from app.services.degradation_controller import get_degradation_controller
 from app.utils.logger import get_logger
+from app.utils.metrics import LLM_DURATION, LLM_TOKENS
+from app.utils.tracing import get_tracer
 from app.utils.formatters import clean_json_response
 
 logger = get_logger("llm_service")
 
 
 class LLMService:
-    """Service for interacting with OpenAI GPT-4o-mini using LangChain"""
+    """
+    Service for interacting with OpenAI GPT-4o-mini using LangChain
+    
+    Calls go through a chat provider chosen by MODEL_PROVIDER: OpenAI, or a
+    record/replay/stub stand-in (app/services/model_providers.py).
+    """
     
     def __init__(self):
         self.api_key = settings.OPENAI_API_KEY
@@ -19,22 +28,17 @@ class LLMService:
         self.temperature = settings.OPENAI_TEMPERATURE
         self.max_tokens = settings.OPENAI_MAX_TOKENS
         self._initialized = False
-        self.llm = None
+        self.provider = None
     
     def initialize(self):
-        """Initialize OpenAI LLM"""
+        """Initialize the chat provider"""
         if self._initialized:
             return
         
         try:
-            self.llm = ChatOpenAI(
-                model=self.model_name,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                openai_api_key=self.api_key
-            )
+            self.provider = create_chat_provider()
             self._initialized = True
-            logger.info(f"LLM service initialized with model: {self.model_name}")
+            logger.info(f"LLM service initialized with model: {self.model_name} ({self.provider.mode} provider)")
         except Exception as e:
             logger.error(f"Failed to initialize LLM service: {e}")
             raise
@@ -46,6 +50,49 @@ class LLMService:
         """
         return text.replace("{", "{{").replace("}", "}}")
     
+    @staticmethod
+    def _messages(prompt: str, system_instruction: Optional[str]) -> List[Tuple[str, str]]:
+        """(role, content) pairs for a provider call"""
+        messages = []
+        if system_instruction:
+            messages.append(("system", system_instruction))
+        messages.append(("human", prompt))
+        return messages
+    
+    async def _complete(
+        self,
+        call: str,
+        messages: List[Tuple[str, str]],
+        temperature: float,
+        schema: Optional[Type[BaseModel]] = None
+    ) -> Any:
+        """Provider call with latency metrics, token accounting and a trace span"""
+        attributes = {"llm.call": call, "gen_ai.request.model": self.model_name, "llm.provider": self.provider.mode}
+        with get_tracer().span("llm", **attributes) as span:
+            start_time = time.perf_counter()
+            outcome = "error"
+            try:
+                result, usage = await self.provider.complete(messages, temperature, schema)
+                outcome = "success"
+            finally:
+                elapsed = time.perf_counter() - start_time
+                LLM_DURATION.observe(elapsed, call, outcome)
+                get_degradation_controller().observe_llm_latency(elapsed)
+            
+            if usage:
+                input_tokens = usage.get('input_tokens', 0)
+                output_tokens = usage.get('output_tokens', 0)
+                LLM_TOKENS.inc(input_tokens, self.model_name, "input")
+                LLM_TOKENS.inc(output_tokens, self.model_name, "output")
+                cost = get_token_ledger().record(self.model_name, call, input_tokens, output_tokens)
+                if span is not None:
+                    span.set_attributes({
+                        "gen_ai.usage.input_tokens": input_tokens,
+                        "gen_ai.usage.output_tokens": output_tokens,
+                        "llm.cost_usd": cost
+                    })
+            return result
+    
     async def generate_text(
         self,
         prompt: str,
@@ -67,27 +114,17 @@ class LLMService:
             self.initialize()
         
         try:
-            llm = self.llm
-            if temperature is not None:
-                llm = ChatOpenAI(
-                    model=self.model_name,
-                    temperature=temperature,
-                    max_tokens=self.max_tokens,
-                    openai_api_key=self.api_key
-                )
-            
-            messages = []
-            if system_instruction:
-                messages.append(SystemMessage(content=system_instruction))
-            messages.append(HumanMessage(content=prompt))
-            
-            response = llm.invoke(messages)
+            response = await self._complete(
+                "text",
+                self._messages(prompt, system_instruction),
+                temperature if temperature is not None else self.temperature
+            )
             
-            if not response or not response.content:
+            if not response:
                 logger.warning("Empty response from LLM")
                 return ""
             
-            return response.content.strip()
+            return response.strip()
             
         except Exception as e:
             logger.error(f"LLM generation failed: {e}")
@@ -116,12 +153,12 @@ class LLMService:
             self.initialize()
         
         try:
-            structured_llm = self.llm.with_structured_output(schema)
-            messages = []
-            if system_instruction:
-                messages.append(SystemMessage(content=system_instruction))
-            messages.append(HumanMessage(content=prompt))
-            result = structured_llm.invoke(messages)
+            result = await self._complete(
+                schema.__name__,
+                self._messages(prompt, system_instruction),
+                self.temperature,
+                schema=schema
+            )
             
             logger.debug(f"Successfully generated structured output of type {schema.__name__}")
             return result
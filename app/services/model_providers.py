@@ -0,0 +1,494 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+import numpy as np
+from pydantic import BaseModel
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("model_providers")
+
+PROVIDER_MODES = ("openai", "record", "replay", "stub")
+
+Messages = List[Tuple[str, str]]
+
+# {'input_tokens': int, 'output_tokens': int}, or None when the provider does not know
+Usage = Optional[Dict[str, int]]
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+class CassetteMiss(LookupError):
+    """No recorded response for a request in replay mode"""
+
+
+def hashed_embedding(text: str, dim: int = 3072) -> np.ndarray:
+    """
+    Deterministic embedding by signed feature hashing of words and word pairs
+    
+    Texts sharing words get similar vectors, so searches over a catalog
+    embedded the same way still return related assessments.
+    
+    Args:
+        text: Input text
+        dim: Embedding dimension
+    
+    Returns:
+        Unit-length vector (all zeros for text without words)
+    """
+    tokens = _TOKEN.findall(text.lower())
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += -1.0 if h & 0x80000000 else 1.0
+    vector = np.sign(vector) * np.log1p(np.abs(vector))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class CassetteStore:
+    """
+    Recorded model responses in an append-only JSONL file
+    
+    Each line holds a request key, the kind of call, the response and how
+    long the real call took. Keys hash the model and the full request, so a
+    replay only serves responses recorded for identical calls.
+    """
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        entry = json.loads(line)
+                        self._entries[entry['key']] = entry
+            logger.info(f"Loaded {len(self._entries)} recorded responses from {self.path}")
+    
+    @staticmethod
+    def make_key(kind: str, request: Dict[str, Any]) -> str:
+        payload = json.dumps({"kind": kind, **request}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+    
+    def put(self, key: str, kind: str, response: Any, latency: float, summary: str = "", usage: Usage = None):
+        entry = {
+            "key": key,
+            "kind": kind,
+            "summary": summary[:120],
+            "latency": round(latency, 4),
+            "response": response
+        }
+        if usage:
+            entry["usage"] = usage
+        with self._lock:
+            self._entries[key] = entry
+            self.recorded += 1
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": str(self.path),
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "recorded": self.recorded
+            }
+
+
+def _chat_request(model: str, messages: Messages, temperature: float, schema: Optional[Type[BaseModel]]) -> Dict[str, Any]:
+    return {
+        "model": model,
+        "messages": [list(message) for message in messages],
+        "temperature": temperature,
+        "schema": schema.__name__ if schema else None
+    }
+
+
+def _stub_value(annotation: Any) -> Any:
+    origin = getattr(annotation, '__origin__', None)
+    if origin is Union:
+        return None if type(None) in annotation.__args__ else _stub_value(annotation.__args__[0])
+    if origin in (list, List):
+        return []
+    if origin in (dict, Dict):
+        return {}
+    return {str: "", bool: False, int: 0, float: 0.0}.get(annotation)
+
+
+def _stub_usage(messages: Messages, response: Any) -> Usage:
+    """Token counts estimated at ~4 characters per token, so budgets work offline"""
+    output = response.model_dump_json() if isinstance(response, BaseModel) else str(response)
+    return {
+        'input_tokens': sum(len(content) for _, content in messages) // 4 + 1,
+        'output_tokens': len(output) // 4 + 1
+    }
+
+
+def _stub_structured(schema: Type[BaseModel], messages: Messages) -> BaseModel:
+    """Schema-valid stand-in for a structured output call"""
+    prompt = messages[-1][1] if messages else ""
+    name = schema.__name__
+    if name == "IntentClassification":
+        return schema(intent="jd_query", confidence=0.9, reasoning="stub provider")
+    if name == "EnhancedQuery":
+        from app.utils.query_rules import extract_query_rules
+        rules = extract_query_rules(prompt, max_chars=len(prompt))
+        rules.pop('confidence')
+        rules.pop('reasons')
+        return schema(cleaned_query=prompt[:1000], **{**rules, 'original_query': prompt[:1000]})
+    values = {
+        field_name: _stub_value(field.annotation)
+        for field_name, field in schema.model_fields.items()
+        if field.is_required()
+    }
+    return schema(**values)
+
+
+class ChatProvider(ABC):
+    """Chat completion backend used by LLMService"""
+    
+    mode = "openai"
+    
+    @abstractmethod
+    async def complete(
+        self,
+        messages: Messages,
+        temperature: float,
+        schema: Optional[Type[BaseModel]] = None
+    ) -> Tuple[Union[str, BaseModel, None], Usage]:
+        """
+        Run a chat completion
+        
+        Args:
+            messages: (role, content) pairs, role is 'system' or 'human'
+            temperature: Sampling temperature
+            schema: Pydantic model for structured output, or None for text
+        
+        Returns:
+            (response text or schema instance, token usage)
+        """
+        pass
+
+
+class EmbeddingProvider(ABC):
+    """Embedding backend used by EmbeddingService"""
+    
+    mode = "openai"
+    
+    @abstractmethod
+    async def embed_query(self, text: str) -> List[float]:
+        """Embed one query text"""
+        pass
+    
+    @abstractmethod
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of documents, in order"""
+        pass
+
+
+class OpenAIChatProvider(ChatProvider):
+    """OpenAI chat models through LangChain"""
+    
+    def __init__(self, model: str, temperature: float, max_tokens: int, api_key: str):
+        from langchain_openai import ChatOpenAI
+        
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.api_key = api_key
+        self._chat_openai = ChatOpenAI
+        self._llms: Dict[float, Any] = {temperature: self._create(temperature)}
+    
+    def _create(self, temperature: float):
+        return self._chat_openai(
+            model=self.model,
+            temperature=temperature,
+            max_tokens=self.max_tokens,
+            openai_api_key=self.api_key
+        )
+    
+    async def complete(self, messages, temperature, schema=None):
+        from langchain_core.messages import SystemMessage, HumanMessage
+        
+        llm = self._llms.get(temperature)
+        if llm is None:
+            llm = self._llms.setdefault(temperature, self._create(temperature))
+        lc_messages = [
+            SystemMessage(content=content) if role == "system" else HumanMessage(content=content)
+            for role, content in messages
+        ]
+        if schema is not None:
+            result = await llm.with_structured_output(schema, include_raw=True).ainvoke(lc_messages)
+            if result.get('parsing_error') is not None:
+                raise result['parsing_error']
+            return result.get('parsed'), self._usage(result.get('raw'))
+        response = await llm.ainvoke(lc_messages)
+        return (response.content if response else None), self._usage(response)
+    
+    @staticmethod
+    def _usage(message: Any) -> Usage:
+        usage = getattr(message, 'usage_metadata', None)
+        if not usage:
+            return None
+        return {'input_tokens': usage.get('input_tokens', 0), 'output_tokens': usage.get('output_tokens', 0)}
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """OpenAI embeddings through LangChain"""
+    
+    def __init__(self, model: str, api_key: str, dimensions: int = 3072):
+        from langchain_openai import OpenAIEmbeddings
+        
+        self.embeddings = OpenAIEmbeddings(model=model, openai_api_key=api_key, dimensions=dimensions)
+    
+    async def embed_query(self, text: str) -> List[float]:
+        return await self.embeddings.aembed_query(text)
+    
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+
+class SyntheticLatency:
+    """Sleeps standing in for model round trips"""
+    
+    def __init__(self, latency_ms: float, jitter: float, use_recorded: bool = False):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter
+        self.use_recorded = use_recorded
+    
+    async def wait(self, recorded: Optional[float] = None):
+        base = recorded if self.use_recorded and recorded is not None else self.latency
+        if base > 0:
+            await asyncio.sleep(base * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+
+class RecordingChatProvider(ChatProvider):
+    """Calls the real provider and records every response"""
+    
+    mode = "record"
+    
+    def __init__(self, inner: ChatProvider, store: CassetteStore, model: str):
+        self.inner = inner
+        self.store = store
+        self.model = model
+    
+    async def complete(self, messages, temperature, schema=None):
+        start_time = time.perf_counter()
+        result, usage = await self.inner.complete(messages, temperature, schema)
+        key = self.store.make_key("chat", _chat_request(self.model, messages, temperature, schema))
+        response = result.model_dump() if isinstance(result, BaseModel) else result
+        self.store.put(
+            key, "chat", response, time.perf_counter() - start_time,
+            messages[-1][1] if messages else "", usage=usage
+        )
+        return result, usage
+
+
+class ReplayChatProvider(ChatProvider):
+    """
+    Serves recorded responses after a synthetic delay
+    
+    In 'replay' mode a request that was never recorded raises CassetteMiss;
+    in 'stub' mode it gets a synthetic, schema-valid response instead.
+    """
+    
+    def __init__(self, store: Optional[CassetteStore], model: str, latency: SyntheticLatency, strict: bool):
+        self.store = store
+        self.model = model
+        self.latency = latency
+        self.strict = strict
+        self.mode = "replay" if strict else "stub"
+    
+    async def complete(self, messages, temperature, schema=None):
+        entry = None
+        if self.store is not None:
+            entry = self.store.get(self.store.make_key("chat", _chat_request(self.model, messages, temperature, schema)))
+        if entry is None and self.strict:
+            raise CassetteMiss(f"No recorded chat response for: {(messages[-1][1] if messages else '')[:80]}")
+        
+        await self.latency.wait(entry['latency'] if entry else None)
+        if entry is not None:
+            response = entry['response']
+            if schema is not None and response is not None:
+                response = schema.model_validate(response)
+            return response, entry.get('usage')
+        response = _stub_structured(schema, messages) if schema is not None else "Stub response"
+        return response, _stub_usage(messages, response)
+
+
+class RecordingEmbeddingProvider(EmbeddingProvider):
+    """Calls the real provider and records every embedding"""
+    
+    mode = "record"
+    
+    def __init__(self, inner: EmbeddingProvider, store: CassetteStore, model: str):
+        self.inner = inner
+        self.store = store
+        self.model = model
+    
+    def _put(self, kind: str, text: str, vector: List[float], latency: float):
+        key = self.store.make_key(kind, {"model": self.model, "text": text})
+        self.store.put(key, kind, [round(float(x), 7) for x in vector], latency, text)
+    
+    async def embed_query(self, text: str) -> List[float]:
+        start_time = time.perf_counter()
+        vector = await self.inner.embed_query(text)
+        self._put("embed_query", text, vector, time.perf_counter() - start_time)
+        return vector
+    
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        start_time = time.perf_counter()
+        vectors = await self.inner.embed_documents(texts)
+        latency = (time.perf_counter() - start_time) / max(len(texts), 1)
+        for text, vector in zip(texts, vectors):
+            self._put("embed_document", text, vector, latency)
+        return vectors
+
+
+class ReplayEmbeddingProvider(EmbeddingProvider):
+    """Serves recorded embeddings, or hashed embeddings in 'stub' mode"""
+    
+    def __init__(
+        self,
+        store: Optional[CassetteStore],
+        model: str,
+        latency: SyntheticLatency,
+        strict: bool,
+        dimensions: int = 3072
+    ):
+        self.store = store
+        self.model = model
+        self.latency = latency
+        self.strict = strict
+        self.dimensions = dimensions
+        self.mode = "replay" if strict else "stub"
+    
+    def _lookup(self, kind: str, text: str) -> Tuple[List[float], Optional[float]]:
+        entry = None
+        if self.store is not None:
+            entry = self.store.get(self.store.make_key(kind, {"model": self.model, "text": text}))
+        if entry is None:
+            if self.strict:
+                raise CassetteMiss(f"No recorded embedding for: {text[:80]}")
+            return hashed_embedding(text, self.dimensions).tolist(), None
+        return entry['response'], entry['latency']
+    
+    async def embed_query(self, text: str) -> List[float]:
+        vector, recorded = self._lookup("embed_query", text)
+        await self.latency.wait(recorded)
+        return vector
+    
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        results = [self._lookup("embed_document", text) for text in texts]
+        recorded = [latency for _, latency in results if latency is not None]
+        await self.latency.wait(sum(recorded) if len(recorded) == len(results) else None)
+        return [vector for vector, _ in results]
+
+
+_cassette_store: Optional[CassetteStore] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette_store() -> Optional[CassetteStore]:
+    """Get the shared cassette store, or None when not recording or replaying"""
+    global _cassette_store
+    if settings.MODEL_PROVIDER == "openai":
+        return None
+    with _cassette_lock:
+        if _cassette_store is None and (settings.MODEL_PROVIDER != "stub" or Path(settings.MODEL_CASSETTE_PATH).exists()):
+            _cassette_store = CassetteStore(settings.MODEL_CASSETTE_PATH)
+        return _cassette_store
+
+
+def _check_mode() -> str:
+    mode = settings.MODEL_PROVIDER
+    if mode not in PROVIDER_MODES:
+        raise ValueError(f"MODEL_PROVIDER must be one of {', '.join(PROVIDER_MODES)}, got '{mode}'")
+    return mode
+
+
+def create_chat_provider() -> ChatProvider:
+    """
+    Create the chat provider selected by MODEL_PROVIDER
+    
+    Returns:
+        ChatProvider for 'openai', 'record', 'replay' or 'stub'
+    """
+    mode = _check_mode()
+    model = settings.OPENAI_MODEL
+    if mode in ("openai", "record"):
+        provider = OpenAIChatProvider(
+            model=model,
+            temperature=settings.OPENAI_TEMPERATURE,
+            max_tokens=settings.OPENAI_MAX_TOKENS,
+            api_key=settings.OPENAI_API_KEY
+        )
+        return provider if mode == "openai" else RecordingChatProvider(provider, get_cassette_store(), model)
+    
+    latency = SyntheticLatency(
+        settings.MODEL_STUB_LLM_LATENCY_MS,
+        settings.MODEL_STUB_LATENCY_JITTER,
+        use_recorded=settings.MODEL_REPLAY_RECORDED_LATENCY
+    )
+    return ReplayChatProvider(get_cassette_store(), model, latency, strict=mode == "replay")
+
+
+def create_embedding_provider() -> EmbeddingProvider:
+    """
+    Create the embedding provider selected by MODEL_PROVIDER
+    
+    Returns:
+        EmbeddingProvider for 'openai', 'record', 'replay' or 'stub'
+    """
+    mode = _check_mode()
+    model = settings.OPENAI_EMBEDDING_MODEL
+    if mode in ("openai", "record"):
+        provider = OpenAIEmbeddingProvider(model=model, api_key=settings.OPENAI_API_KEY)
+        return provider if mode == "openai" else RecordingEmbeddingProvider(provider, get_cassette_store(), model)
+    
+    latency = SyntheticLatency(
+        settings.MODEL_STUB_EMBEDDING_LATENCY_MS,
+        settings.MODEL_STUB_LATENCY_JITTER,
+        use_recorded=settings.MODEL_REPLAY_RECORDED_LATENCY
+    )
+    return ReplayEmbeddingProvider(get_cassette_store(), model, latency, strict=mode == "replay")
+
+
+def get_provider_metrics() -> Dict[str, Any]:
+    """
+    Get provider mode and cassette counters
+    
+    Returns:
+        Mode and, when a cassette is in use, its hit/miss/record counts
+    """
+    store = _cassette_store
+    return {
+        "mode": settings.MODEL_PROVIDER,
+        "cassette": store.get_metrics() if store is not None else None
+    }
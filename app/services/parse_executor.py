@@ -0,0 +1,156 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Union
+from app.config import settings
+from app.utils import html_parsing
+from app.utils.logger import get_logger
+
+logger = get_logger("parse_executor")
+
+
+class ParseExecutor:
+    """
+    Off-loop HTML parsing on a pool of warm worker processes
+    
+    Workers take raw page bytes and return extracted dictionaries, so only
+    small, picklable values cross the process boundary. Pages below the
+    inline threshold are cheaper to parse in place than to ship to a
+    worker, and parsing also falls back to inline if the pool is disabled
+    or breaks.
+    """
+    
+    def __init__(self, workers: int = None, inline_max_bytes: int = None):
+        self.workers = settings.PARSE_WORKERS if workers is None else workers
+        self.inline_max_bytes = settings.PARSE_INLINE_MAX_BYTES if inline_max_bytes is None else inline_max_bytes
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._disabled = self.workers <= 0
+        
+        self.pool_count = 0
+        self.inline_count = 0
+        self.fallback_count = 0
+        self.pool_time = 0.0
+        self.inline_time = 0.0
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether the worker pool is up"""
+        return self._pool is not None
+    
+    async def start(self):
+        """Start the worker processes and wait until each is warm"""
+        if self.is_running or self._disabled:
+            return
+        
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=html_parsing.warm_up
+        )
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(self._pool, html_parsing.warm_up) for _ in range(self.workers)))
+        except Exception as e:
+            logger.error(f"Parse workers failed to start, parsing inline: {e}")
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._disabled = True
+            return
+        
+        logger.info(f"Parse executor started - Workers: {self.workers}, Inline below: {self.inline_max_bytes} bytes")
+    
+    async def stop(self):
+        """Shut down the worker processes"""
+        if not self.is_running:
+            return
+        
+        pool, self._pool = self._pool, None
+        await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+        logger.info("Parse executor stopped")
+    
+    async def run(self, fn: Callable[..., Any], content: Union[bytes, str], *args) -> Any:
+        """
+        Run a parse function on a page
+        
+        The pool is started on first use if it is not running yet.
+        
+        Args:
+            fn: Module-level function from app.utils.html_parsing
+            content: Page body
+            *args: Extra arguments for fn
+        
+        Returns:
+            Whatever fn returns
+        """
+        if len(content) > self.inline_max_bytes and not self._disabled:
+            if not self.is_running:
+                await self.start()
+        
+        if self.is_running and len(content) > self.inline_max_bytes:
+            start_time = time.perf_counter()
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(self._pool, fn, content, *args)
+                self.pool_count += 1
+                self.pool_time += time.perf_counter() - start_time
+                return result
+            except BrokenProcessPool as e:
+                logger.error(f"Parse worker pool broke, parsing inline: {e}")
+                self._pool = None
+                self._disabled = True
+                self.fallback_count += 1
+        
+        start_time = time.perf_counter()
+        result = fn(content, *args)
+        self.inline_count += 1
+        self.inline_time += time.perf_counter() - start_time
+        return result
+    
+    async def parse_catalog_page(self, content: bytes, base_url: str) -> Dict[str, Any]:
+        """Parse a catalog listing page"""
+        return await self.run(html_parsing.parse_catalog_page, content, base_url)
+    
+    async def parse_test_details(self, content: bytes) -> Dict[str, Any]:
+        """Parse an assessment detail page"""
+        return await self.run(html_parsing.parse_test_details, content)
+    
+    async def parse_job_page(self, content: bytes, url: str) -> Dict[str, Any]:
+        """Parse a job posting page"""
+        return await self.run(html_parsing.parse_job_page, content, url)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get parse executor metrics
+        
+        Returns:
+            Metrics dictionary
+        """
+        return {
+            "running": self.is_running,
+            "workers": self.workers,
+            "inline_max_bytes": self.inline_max_bytes,
+            "pool_parses": self.pool_count,
+            "inline_parses": self.inline_count,
+            "fallbacks": self.fallback_count,
+            "avg_pool_ms": self.pool_time * 1000 / self.pool_count if self.pool_count else 0.0,
+            "avg_inline_ms": self.inline_time * 1000 / self.inline_count if self.inline_count else 0.0
+        }
+
+
+parse_executor = ParseExecutor()
+
+
+def get_parse_executor() -> ParseExecutor:
+    """Get parse executor instance"""
+    return parse_executor
+
+
+async def start_parse_executor():
+    """Start the parse worker pool on startup"""
+    await parse_executor.start()
+
+
+async def stop_parse_executor():
+    """Stop the parse worker pool on shutdown"""
+    await parse_executor.stop()
@@ -0,0 +1,382 @@
+import asyncio
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+from sqlalchemy import func, literal_column, null, text
+from app.config import settings
+from app.database.sqlite_db import db_manager
+from app.models.database_models import Session, Interaction, AgentExecution, SessionStats
+from app.services.session_service import get_session_service
+from app.utils.logger import get_logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = get_logger("retention_service")
+
+
+class RetentionService:
+    """
+    Retention, compaction and archival for the interactions tables
+    
+    A background task periodically:
+    - compacts legacy rows so recommendation lists are stored by reference
+    - moves interactions older than the TTL (with their agent executions)
+      into per-day compressed JSONL archives and deletes them
+    - returns freed pages to the filesystem with incremental vacuum
+    """
+    
+    def __init__(
+        self,
+        retention_days: int = None,
+        archive_dir: str = None,
+        batch_size: int = None,
+        interval: float = None
+    ):
+        self.retention_days = retention_days or settings.RETENTION_DAYS
+        self.archive_dir = Path(archive_dir or settings.RETENTION_ARCHIVE_DIR)
+        self.batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+        self.interval = interval or settings.RETENTION_SWEEP_INTERVAL
+        self._worker: Optional[asyncio.Task] = None
+        
+        self.run_count = 0
+        self.failure_count = 0
+        self.archived_count = 0
+        self.deleted_executions_count = 0
+        self.deleted_sessions_count = 0
+        self.compacted_count = 0
+        self.payloads_removed_count = 0
+        self.vacuumed_pages = 0
+        self._conversion_warned = False
+        self.last_run_at: Optional[datetime] = None
+        self.last_run_duration = 0.0
+        self.last_result: Dict[str, Any] = {}
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether the background scheduler is alive"""
+        return self._worker is not None and not self._worker.done()
+    
+    @property
+    def archive_extension(self) -> str:
+        """Archive file extension for the available compressor"""
+        return ".jsonl.zst" if zstandard else ".jsonl.gz"
+    
+    def start(self):
+        """Start the background scheduler on the running event loop"""
+        if self.is_running:
+            return
+        
+        self._worker = asyncio.create_task(self._run(), name="retention-scheduler")
+        logger.info(
+            f"Retention scheduler started - "
+            f"TTL: {self.retention_days}d, Interval: {self.interval:.0f}s, "
+            f"Archive: {self.archive_dir} ({self.archive_extension})"
+        )
+    
+    async def stop(self):
+        """Stop the background scheduler"""
+        if not self.is_running:
+            return
+        
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        
+        self._worker = None
+        logger.info("Retention scheduler stopped")
+    
+    async def _run(self):
+        """Scheduler loop: one retention cycle per interval"""
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+    
+    async def run_once(self) -> Dict[str, Any]:
+        """Run one retention cycle in a worker thread"""
+        return await asyncio.to_thread(self.run_cycle)
+    
+    def run_cycle(self) -> Dict[str, Any]:
+        """
+        Run compaction, TTL sweep and incremental vacuum
+        
+        Returns:
+            Summary of the cycle
+        """
+        start_time = time.perf_counter()
+        result: Dict[str, Any] = {}
+        
+        try:
+            result["compacted"] = self.compact_payloads()
+            result.update(self.sweep())
+            result["vacuumed_pages"] = self.vacuum()
+        except Exception as e:
+            self.failure_count += 1
+            result["error"] = str(e)
+            logger.error(f"Retention cycle failed: {e}")
+        
+        self.run_count += 1
+        self.last_run_at = datetime.utcnow()
+        self.last_run_duration = time.perf_counter() - start_time
+        self.last_result = result
+        
+        logger.info(f"Retention cycle finished in {self.last_run_duration:.2f}s: {result}")
+        return result
+    
+    def compact_payloads(self) -> int:
+        """
+        Move inline recommendation lists of older rows into the payload table
+        
+        Returns:
+            Number of interactions compacted
+        """
+        session_service = get_session_service()
+        total = 0
+        last_id = 0
+        
+        # Rows written before the column stored None as SQL NULL hold the JSON
+        # text 'null'; the id cursor makes every pass advance regardless
+        while True:
+            with db_manager.write_session() as db:
+                rows = db.query(Interaction).filter(
+                    Interaction.id > last_id,
+                    Interaction.recommended_assessments.isnot(None),
+                    Interaction.recommended_assessments != literal_column("'null'"),
+                    Interaction.recommendation_payload_id.is_(None)
+                ).order_by(Interaction.id).limit(self.batch_size).all()
+                
+                if not rows:
+                    break
+                
+                session_service.attach_recommendation_payloads(db, rows)
+                for row in rows:
+                    # Rows with an empty list get no reference; clear them so they are not revisited
+                    row.recommended_assessments = null()
+                last_id = rows[-1].id
+            
+            total += len(rows)
+        
+        self.compacted_count += total
+        return total
+    
+    def sweep(self, cutoff: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Archive and delete interactions older than the retention TTL
+        
+        Each batch is appended to its day's archive and fsynced before the
+        rows are deleted, so a crash can duplicate archived records but
+        never lose them.
+        
+        Args:
+            cutoff: Delete interactions older than this (defaults to now - TTL)
+        
+        Returns:
+            Counts of archived and deleted rows
+        """
+        cutoff = cutoff or datetime.utcnow() - timedelta(days=self.retention_days)
+        session_service = get_session_service()
+        archived = executions_deleted = payloads_removed = 0
+        
+        while True:
+            with db_manager.write_session() as db:
+                rows = db.query(Interaction).filter(
+                    Interaction.timestamp < cutoff
+                ).order_by(Interaction.id).limit(self.batch_size).all()
+                
+                if not rows:
+                    break
+                
+                ids = [row.id for row in rows]
+                executions = db.query(AgentExecution).filter(
+                    AgentExecution.interaction_id.in_(ids)
+                ).all()
+                payloads = session_service.resolve_recommendation_payloads(db, rows)
+                
+                self._archive(rows, executions, payloads)
+                
+                executions_deleted += db.query(AgentExecution).filter(
+                    AgentExecution.interaction_id.in_(ids)
+                ).delete(synchronize_session=False)
+                payloads_removed += session_service.release_recommendation_payloads(db, rows)
+                db.query(Interaction).filter(Interaction.id.in_(ids)).delete(synchronize_session=False)
+            
+            archived += len(rows)
+        
+        with db_manager.write_session() as db:
+            sessions_deleted = db.query(Session).filter(
+                Session.updated_at < cutoff,
+                ~db.query(Interaction.id).filter(Interaction.session_id == Session.id).exists()
+            ).delete(synchronize_session=False)
+            db.query(SessionStats).filter(
+                func.coalesce(SessionStats.last_interaction_at, SessionStats.created_at) < cutoff
+            ).delete(synchronize_session=False)
+        
+        self.archived_count += archived
+        self.deleted_executions_count += executions_deleted
+        self.deleted_sessions_count += sessions_deleted
+        self.payloads_removed_count += payloads_removed
+        
+        if archived:
+            logger.info(f"Archived {archived} interactions older than {cutoff.isoformat()}")
+        
+        return {
+            "archived": archived,
+            "deleted_executions": executions_deleted,
+            "deleted_sessions": sessions_deleted,
+            "payloads_removed": payloads_removed
+        }
+    
+    def _archive(
+        self,
+        rows: List[Interaction],
+        executions: List[AgentExecution],
+        payloads: Dict[str, Any]
+    ):
+        """Append rows to their per-day archive files as one compressed frame each"""
+        executions_by_interaction: Dict[int, List[Dict[str, Any]]] = {}
+        for execution in executions:
+            executions_by_interaction.setdefault(execution.interaction_id, []).append(execution.to_dict())
+        
+        lines_by_day: Dict[str, List[str]] = {}
+        for row in rows:
+            record = {column.name: getattr(row, column.name) for column in Interaction.__table__.columns}
+            if row.recommendation_payload_id:
+                record["recommended_assessments"] = payloads.get(row.recommendation_payload_id)
+            record["agent_executions"] = executions_by_interaction.get(row.id, [])
+            
+            day = row.timestamp.strftime("%Y%m%d")
+            lines_by_day.setdefault(day, []).append(json.dumps(record, default=str))
+        
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        for day, lines in lines_by_day.items():
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            path = self.archive_dir / f"interactions-{day}{self.archive_extension}"
+            with open(path, "ab") as f:
+                f.write(self._compress(data))
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def _compress(self, data: bytes) -> bytes:
+        """Compress one archive frame (concatenated frames/members stay readable)"""
+        if zstandard:
+            return zstandard.ZstdCompressor(level=settings.RETENTION_ZSTD_LEVEL).compress(data)
+        return gzip.compress(data)
+    
+    def vacuum(self, convert: bool = None) -> int:
+        """
+        Release free pages with incremental vacuum
+        
+        Databases created before auto_vacuum=INCREMENTAL was enabled need a
+        one-time full VACUUM, which rewrites the whole file and blocks every
+        writer while it runs. It only happens with convert=True (default
+        RETENTION_VACUUM_CONVERT), e.g. from scripts/vacuum_database.py;
+        otherwise such databases are left alone.
+        
+        Args:
+            convert: Run the full VACUUM conversion if still needed
+        
+        Returns:
+            Number of pages released
+        """
+        convert = settings.RETENTION_VACUUM_CONVERT if convert is None else convert
+        with db_manager.write_session() as db:
+            auto_vacuum = db.execute(text("PRAGMA auto_vacuum")).scalar()
+            free_before = db.execute(text("PRAGMA freelist_count")).scalar()
+        
+        if auto_vacuum != 2:
+            if not convert:
+                if not self._conversion_warned:
+                    logger.warning(
+                        "auto_vacuum is not INCREMENTAL, skipping vacuum; "
+                        "run scripts/vacuum_database.py during maintenance to convert"
+                    )
+                    self._conversion_warned = True
+                return 0
+            
+            logger.warning("auto_vacuum is not INCREMENTAL, converting with a full VACUUM")
+            with db_manager.write_connection(autocommit=True) as conn:
+                conn.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+                conn.execute(text("VACUUM"))
+            self.vacuumed_pages += free_before
+            return free_before
+        
+        if not free_before:
+            return 0
+        
+        pages = settings.RETENTION_VACUUM_PAGES
+        with db_manager.write_session() as db:
+            db.execute(text(f"PRAGMA incremental_vacuum({pages})")).fetchall()
+            free_after = db.execute(text("PRAGMA freelist_count")).scalar()
+        
+        with db_manager.write_connection() as conn:
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        
+        released = free_before - free_after
+        self.vacuumed_pages += released
+        return released
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get retention metrics
+        
+        Returns:
+            Metrics dictionary
+        """
+        database: Dict[str, Any] = {}
+        try:
+            with db_manager.get_session() as db:
+                page_size = db.execute(text("PRAGMA page_size")).scalar()
+                database = {
+                    "size_bytes": db.execute(text("PRAGMA page_count")).scalar() * page_size,
+                    "free_bytes": db.execute(text("PRAGMA freelist_count")).scalar() * page_size,
+                    "interactions": db.query(Interaction).count()
+                }
+        except Exception as e:
+            logger.error(f"Failed to read database size: {e}")
+        
+        return {
+            "running": self.is_running,
+            "retention_days": self.retention_days,
+            "interval_s": self.interval,
+            "archive_dir": str(self.archive_dir),
+            "archive_format": self.archive_extension,
+            "runs": self.run_count,
+            "failures": self.failure_count,
+            "archived": self.archived_count,
+            "deleted_executions": self.deleted_executions_count,
+            "deleted_sessions": self.deleted_sessions_count,
+            "compacted": self.compacted_count,
+            "payloads_removed": self.payloads_removed_count,
+            "vacuumed_pages": self.vacuumed_pages,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_run_duration_s": self.last_run_duration,
+            "last_result": self.last_result,
+            "database": database
+        }
+
+
+retention_service = RetentionService()
+
+
+def get_retention_service() -> RetentionService:
+    """Get retention service instance"""
+    return retention_service
+
+
+async def start_retention_service():
+    """Start the retention scheduler on startup if enabled"""
+    if settings.RETENTION_ENABLED:
+        retention_service.start()
+
+
+async def stop_retention_service():
+    """Stop the retention scheduler on shutdown"""
+    await retention_service.stop()
@@ -1,12 +1,23 @@
 import asyncio
+import hashlib
 import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-import requests
-from bs4 import BeautifulSoup
-import re
+from typing import Dict, Any, Optional, List, Tuple
+from urllib.parse import urlsplit
+import httpx
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.config import settings
+from app.database.sqlite_db import db_manager
+from app.models.database_models import CatalogPageState
+from app.services.parse_executor import get_parse_executor
+from app.utils.html_parsing import TEST_TYPE_MAPPING
 from app.utils.logger import get_logger
+from app.utils.rate_limiter import AsyncTokenBucket
 
 logger = get_logger("scraper_service")
 
@@ -14,361 +25,441 @@ logger = get_logger("scraper_service")
 class ScraperService:
     """Service for scraping SHL assessment catalog"""
     
-    def __init__(self):
-        self.base_url = "https://www.shl.com"
-        self.catalog_url = f"{self.base_url}/products/product-catalog/"
-        self.delay = settings.SCRAPER_DELAY
+    def __init__(
+        self,
+        catalog_url: str = None,
+        concurrency: int = None,
+        rate_limit: float = None,
+        max_retries: int = None
+    ):
+        self.catalog_url = catalog_url or settings.SHL_CATALOG_URL
+        parts = urlsplit(self.catalog_url)
+        self.base_url = f"{parts.scheme}://{parts.netloc}"
         self.timeout = settings.SCRAPER_TIMEOUT
+        self.concurrency = concurrency or settings.SCRAPER_CONCURRENCY
+        self.rate_limit = rate_limit or settings.SCRAPER_RATE_LIMIT
+        self.max_retries = settings.SCRAPER_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = settings.SCRAPER_BACKOFF_BASE
+        self.backoff_max = settings.SCRAPER_BACKOFF_MAX
+        self.parse_executor = get_parse_executor()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._rate_limiter: Optional[AsyncTokenBucket] = None
+        self.stats = {
+            "requests": 0, "retries": 0, "failures": 0,
+            "not_modified": 0, "unchanged": 0, "changed": 0
+        }
+        self.failed_listing_pages: List[int] = []
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
-        self.test_type_mapping = {
-            'A': 'Ability & Aptitude',
-            'B': 'Biodata & Situational Judgement',
-            'C': 'Competencies',
-            'D': 'Development & 360',
-            'E': 'Assessment Exercises',
-            'K': 'Knowledge & Skills',
-            'P': 'Personality & Behavior',
-            'S': 'Simulations'
-        }
+        self.test_type_mapping = dict(TEST_TYPE_MAPPING)
     
-    def get_catalog_page(self, start: int = 0) -> Optional[BeautifulSoup]:
-        """Fetch a single catalog page for Individual Test Solutions"""
-        try:
-            url = f"{self.catalog_url}?start={start}&type=1"
-            logger.info(f"Fetching URL: {url}")
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
-        except Exception as e:
-            logger.error(f"Error fetching catalog page (start={start}): {e}")
-            return None
+    @property
+    def last_scrape_complete(self) -> bool:
+        """Whether every listing page of the last scrape was fetched"""
+        return not self.failed_listing_pages
     
-    def find_all_individual_test_tables(self, soup: BeautifulSoup) -> List:
-        """Find all tables that might contain Individual Test Solutions"""
-        tables = []
-        section_headers = soup.find_all(['h3', 'h2', 'h4'])
-        for header in section_headers:
-            if 'Individual Test Solutions' in header.get_text():
-                logger.info(f"Found 'Individual Test Solutions' header: {header.get_text()}")
-                table_wrapper = header.find_next('div', class_='custom__table-wrapper')
-                if table_wrapper:
-                    tables.append(table_wrapper)
-                    break
-        if not tables:
-            logger.warning("Could not find by header, searching all table wrappers...")
-            all_wrappers = soup.find_all('div', class_='custom__table-wrapper')
-            logger.info(f"Found {len(all_wrappers)} table wrappers")
-            tables = all_wrappers
-        
-        return tables
+    async def open(self):
+        """Create the shared keep-alive client, semaphore and rate limiter"""
+        if self._client is not None:
+            return
+        
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency
+            )
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._rate_limiter = AsyncTokenBucket(self.rate_limit, capacity=self.concurrency)
     
-    def get_max_page_dynamically(self, soup: BeautifulSoup) -> int:
-        """Dynamically find the maximum page number for Individual Test Solutions"""
-        try:
-            paginations = soup.find_all('ul', class_='pagination')
-            logger.info(f"Found {len(paginations)} pagination elements")
-            
-            max_page = 1
-            
-            for idx, pagination in enumerate(paginations):
-                logger.info(f"Analyzing pagination element {idx + 1}...")
-                page_numbers = []
-                items = pagination.find_all('li', class_='pagination__item')
-                
-                for item in items:
-                    link = item.find('a', class_='pagination__link')
-                    if link:
-                        text = link.get_text(strip=True)
-                        if text.isdigit():
-                            page_numbers.append(int(text))
-                        href = link.get('href', '')
-                        match = re.search(r'start=(\d+)', href)
-                        if match:
-                            start_val = int(match.group(1))
-                            page_from_start = (start_val // 12) + 1
-                            page_numbers.append(page_from_start)
-                    span = item.find('span', class_='pagination__link')
-                    if span and span.get_text(strip=True).isdigit():
-                        page_numbers.append(int(span.get_text(strip=True)))
-                
-                if page_numbers:
-                    pagination_max = max(page_numbers)
-                    logger.info(f"Pagination {idx + 1} max page: {pagination_max} (pages found: {sorted(set(page_numbers))})")
-                    max_page = max(max_page, pagination_max)
-            for pagination in paginations:
-                last_links = pagination.find_all('a', class_='pagination__link')
-                for link in last_links:
-                    href = link.get('href', '')
-                    match = re.search(r'start=(\d+)', href)
-                    if match:
-                        start_val = int(match.group(1))
-                        calculated_page = (start_val // 12) + 1
-                        max_page = max(max_page, calculated_page)
+    async def close(self):
+        """Close the shared client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    async def _request(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[httpx.Response]:
+        """
+        GET a page with bounded concurrency, rate limiting and retries
+        
+        Transport errors, 429 and 5xx responses are retried with jittered
+        exponential backoff (Retry-After is honoured when present). Other
+        4xx responses are not retried.
+        
+        Args:
+            url: Page URL
+            headers: Extra request headers
             
-            logger.info(f"Final determined max page: {max_page}")
-            return max_page
+        Returns:
+            The 2xx/304 response or None on failure
+        """
+        await self.open()
+        
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                await self._rate_limiter.acquire()
+                self.stats["requests"] += 1
+                try:
+                    response = await self._client.get(url, headers=headers)
+                    if response.status_code == 304:
+                        return response
+                    if response.status_code == 429 or response.status_code >= 500:
+                        raise httpx.HTTPStatusError(
+                            f"Retryable status {response.status_code}",
+                            request=response.request,
+                            response=response
+                        )
+                    response.raise_for_status()
+                    return response
+                except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                    retryable = not isinstance(e, httpx.HTTPStatusError) or (
+                        e.response.status_code == 429 or e.response.status_code >= 500
+                    )
+                    if not retryable or attempt == self.max_retries:
+                        self.stats["failures"] += 1
+                        logger.error(f"Error fetching {url}: {e}")
+                        return None
+                    last_error = e
+                    delay = self._backoff(attempt)
+                    if isinstance(e, httpx.HTTPStatusError):
+                        retry_after = e.response.headers.get("Retry-After", "")
+                        if retry_after.isdigit():
+                            delay = max(delay, float(retry_after))
             
-        except Exception as e:
-            logger.error(f"Error determining max page: {e}")
-            return 1
+            self.stats["retries"] += 1
+            logger.warning(f"Retrying {url} in {delay:.2f}s (attempt {attempt + 1}/{self.max_retries}): {last_error}")
+            await asyncio.sleep(delay)
+        
+        return None
     
-    def extract_tests_from_page(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        """Extract test information from a catalog page"""
-        tests = []
+    async def fetch(self, url: str) -> Optional[bytes]:
+        """
+        GET a page body
         
-        try:
-
-            table_wrappers = self.find_all_individual_test_tables(soup)
+        Args:
+            url: Page URL
             
-            if not table_wrappers:
-                logger.warning("No table wrappers found!")
-                return tests
+        Returns:
+            Response body or None on failure
+        """
+        response = await self._request(url)
+        return response.content if response is not None else None
+    
+    async def fetch_conditional(
+        self,
+        url: str,
+        state: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Optional[bytes], Optional[Dict[str, Any]]]:
+        """
+        Conditional GET using the stored ETag/Last-Modified and content hash
+        
+        Args:
+            url: Page URL
+            state: Stored page state (etag, last_modified, content_hash, payload)
             
-            for wrapper_idx, table_wrapper in enumerate(table_wrappers):
-                logger.info(f"Processing table wrapper {wrapper_idx + 1}/{len(table_wrappers)}")
-                
-                table = table_wrapper.find('table')
-                if not table:
-                    logger.warning(f"No table found in wrapper {wrapper_idx + 1}")
-                    continue
-                
-                header_row = table.find('tr')
-                if header_row:
-                    header_text = header_row.get_text()
-                    logger.info(f"Table header: {header_text[:100]}")
-                    if 'Pre-packaged' in header_text or 'Job Solutions' in header_text:
-                        logger.info("Skipping Pre-packaged Job Solutions table")
-                        continue
-
-                rows = table.find_all('tr', attrs={'data-entity-id': True})
-                logger.info(f"Found {len(rows)} test rows in table {wrapper_idx + 1}")
-                
-                for row in rows:
-                    try:
-                        test_data = self.extract_test_from_row(row)
-                        if test_data:
-                            tests.append(test_data)
-                            logger.debug(f"Extracted: {test_data['name']}")
-                    except Exception as e:
-                        logger.warning(f"Error parsing row: {e}")
-                        continue
+        Returns:
+            (status, body, new_state) where status is "not_modified" (304),
+            "unchanged" (200 with the same content hash), "changed" or "failed".
+            The body is only returned for "changed".
+        """
+        headers = {}
+        if state:
+            if state.get("etag"):
+                headers["If-None-Match"] = state["etag"]
+            if state.get("last_modified"):
+                headers["If-Modified-Since"] = state["last_modified"]
         
-        except Exception as e:
-            logger.error(f"Error extracting tests from page: {e}")
+        response = await self._request(url, headers=headers or None)
+        if response is None:
+            return "failed", None, None
+        
+        now = datetime.utcnow()
+        if response.status_code == 304 and state:
+            self.stats["not_modified"] += 1
+            return "not_modified", None, {**state, "last_checked": now}
+        
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        new_state = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": content_hash,
+            "payload": state.get("payload") if state else None,
+            "last_checked": now,
+            "last_changed": state.get("last_changed", now) if state else now
+        }
+        
+        if state and state.get("content_hash") == content_hash and state.get("payload") is not None:
+            self.stats["unchanged"] += 1
+            return "unchanged", None, new_state
         
-        return tests
+        self.stats["changed"] += 1
+        new_state["last_changed"] = now
+        return "changed", response.content, new_state
     
-    def extract_test_from_row(self, row) -> Optional[Dict[str, Any]]:
-        """Extract test data from a single table row"""
+    def load_page_states(self) -> Dict[str, Dict[str, Any]]:
+        """Load stored page states keyed by URL"""
         try:
-            title_cell = row.find('td', class_='custom__table-heading__title')
-            if not title_cell:
-                return None
-            
-            link = title_cell.find('a')
-            if not link:
-                return None
-            
-            test_name = link.get_text(strip=True)
-            test_url = link.get('href', '')
-            if test_url.startswith('/'):
-                test_url = self.base_url + test_url
-            elif not test_url.startswith('http'):
-                test_url = self.base_url + '/' + test_url
-            general_cells = row.find_all('td', class_='custom__table-heading__general')
-            remote_support = "No"
-            adaptive_support = "No"
-            
-            if len(general_cells) >= 2:
-                remote_circle = general_cells[0].find('span', class_='catalogue__circle')
-                if remote_circle and '-yes' in ' '.join(remote_circle.get('class', [])):
-                    remote_support = "Yes"
-                
-                adaptive_circle = general_cells[1].find('span', class_='catalogue__circle')
-                if adaptive_circle and '-yes' in ' '.join(adaptive_circle.get('class', [])):
-                    adaptive_support = "Yes"
-            test_types = []
-            keys_cell = row.find('td', class_='product-catalogue__keys')
-            if keys_cell:
-                key_spans = keys_cell.find_all('span', class_='product-catalogue__key')
-                for span in key_spans:
-                    letter = span.get_text(strip=True)
-                    if letter in self.test_type_mapping:
-                        test_types.append(self.test_type_mapping[letter])
-            
-            return {
-                'name': test_name,
-                'url': test_url,
-                'remote_support': remote_support,
-                'adaptive_support': adaptive_support,
-                'test_type': test_types
-            }
+            with db_manager.get_session() as db:
+                return {row.url: {
+                    "url": row.url,
+                    "etag": row.etag,
+                    "last_modified": row.last_modified,
+                    "content_hash": row.content_hash,
+                    "payload": row.payload,
+                    "last_changed": row.last_changed
+                } for row in db.query(CatalogPageState).all()}
+        except Exception as e:
+            logger.error(f"Failed to load catalog page states: {e}")
+            return {}
+    
+    def save_page_states(self, states: Dict[str, Dict[str, Any]]):
+        """Upsert page states in one transaction"""
+        if not states:
+            return
+        
+        with db_manager.write_session() as db:
+            for state in states.values():
+                stmt = sqlite_insert(CatalogPageState).values(**state)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[CatalogPageState.url],
+                    set_={key: stmt.excluded[key] for key in state if key != "url"}
+                )
+                db.execute(stmt)
+        
+        logger.info(f"Saved {len(states)} catalog page states")
+    
+    async def get_catalog_page(self, start: int = 0) -> Optional[Dict[str, Any]]:
+        """Fetch and parse a single catalog page for Individual Test Solutions"""
+        url = self._catalog_page_url(start)
+        logger.info(f"Fetching URL: {url}")
+        content = await self.fetch(url)
+        if content is None:
+            return None
+        return await self.parse_catalog_page(content)
+    
+    def _catalog_page_url(self, start: int) -> str:
+        return f"{self.catalog_url}?start={start}&type=1"
+    
+    async def parse_catalog_page(self, content: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Parse a catalog listing page on the parse executor
         
+        Args:
+            content: Page body
+            
+        Returns:
+            {"tests": [...], "max_page": n}, or None if parsing failed
+        """
+        try:
+            return await self.parse_executor.parse_catalog_page(content, self.base_url)
         except Exception as e:
-            logger.warning(f"Error extracting test from row: {e}")
+            logger.error(f"Error extracting tests from page: {e}")
             return None
     
-    def get_test_details(self, test_url: str) -> Dict[str, Any]:
+    async def get_test_details(self, test_url: str) -> Dict[str, Any]:
         """Fetch detailed information from individual test page"""
+        content = await self.fetch(test_url)
+        if content is None:
+            return {}
+        return await self.parse_test_details(content, test_url) or {}
+    
+    async def parse_test_details(self, content: bytes, test_url: str = "") -> Optional[Dict[str, Any]]:
+        """Parse an individual test page on the parse executor, None if parsing failed"""
         try:
-            response = requests.get(test_url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            details = {
-                'description': '',
-                'job_levels': '',
-                'languages': '',
-                'duration': None,
-                'test_type': []
-            }
-            
-
-            desc_section = soup.find('h4', string='Description')
-            if desc_section:
-                desc_p = desc_section.find_next('p')
-                if desc_p:
-                    details['description'] = desc_p.get_text(strip=True)
-            
-
-            job_section = soup.find('h4', string='Job levels')
-            if job_section:
-                job_p = job_section.find_next('p')
-                if job_p:
-                    details['job_levels'] = job_p.get_text(strip=True)
-
-            lang_section = soup.find('h4', string='Languages')
-            if lang_section:
-                lang_p = lang_section.find_next('p')
-                if lang_p:
-                    details['languages'] = lang_p.get_text(strip=True)
-            
-            length_section = soup.find('h4', string='Assessment length')
-            if length_section:
-                parent = length_section.find_parent('div', class_='product-catalogue-training-calendar__row')
-                length_p = parent.find('p') if parent else length_section.find_next('p')
-                
-                if length_p:
-                    duration_text = length_p.get_text(strip=True)
-                    patterns = [
-                        r'=\s*(\d+)',  # "= 10"
-                        r'(\d+)\s*(?:minutes?|mins?)',  # "10 minutes"
-                        r'(\d+)\s*min',  # "10min"
-                        r'(\d+)'  # Any number
-                    ]
-                    for pattern in patterns:
-                        match = re.search(pattern, duration_text, re.IGNORECASE)
-                        if match:
-                            details['duration'] = int(match.group(1))
-                            break
-            
-            test_type_text = soup.find('p', class_='product-catalogue__small-text')
-            if test_type_text and 'Test Type:' in test_type_text.get_text():
-                type_spans = test_type_text.find_all('span', class_='product-catalogue__key')
-                test_types = []
-                for span in type_spans:
-                    letter = span.get_text(strip=True)
-                    if letter in self.test_type_mapping:
-                        test_types.append(self.test_type_mapping[letter])
-                if test_types:
-                    details['test_type'] = test_types
-            
-            return details
-            
+            return await self.parse_executor.parse_test_details(content)
         except Exception as e:
-            logger.error(f"Error fetching test details from {test_url}: {e}")
-            return {}
+            logger.error(f"Error parsing test details from {test_url}: {e}")
+            return None
     
-    async def scrape_all_tests(self) -> Dict[str, Dict[str, Any]]:
-        """Scrape all Individual Test Solutions dynamically"""
-        all_tests = {}
+    async def _scrape_listing(
+        self,
+        start: int,
+        states: Dict[str, Dict[str, Any]],
+        new_states: Dict[str, Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch one listing page, reusing the stored parse when unchanged
         
-        logger.info("="*80)
-        logger.info("Starting Dynamic Scrape of Individual Test Solutions")
-        logger.info("="*80)
-        logger.info("Step 1: Fetching first page...")
-        first_page = self.get_catalog_page(0)
+        A page that fails to fetch or to parse returns None and its state is
+        not saved, so the next run fetches and parses it again.
+        """
+        url = self._catalog_page_url(start)
+        status, content, state = await self.fetch_conditional(url, states.get(url))
+        if status == "failed":
+            return None
         
-        if not first_page:
-            logger.error("Failed to fetch first page!")
-            return all_tests
-        logger.info("Step 2: Determining total pages...")
-        max_page = self.get_max_page_dynamically(first_page)
-        logger.info(f"✓ Found maximum page: {max_page}")
+        if status == "changed":
+            payload = await self.parse_catalog_page(content)
+            if payload is None:
+                return None
+            state["payload"] = payload
         
-        logger.info("Step 3: Extracting tests from first page...")
-        first_page_tests = self.extract_tests_from_page(first_page)
-        logger.info(f"✓ Found {len(first_page_tests)} tests on page 1")
+        new_states[url] = state
+        return state["payload"]
+    
+    async def _scrape_details(
+        self,
+        url: str,
+        states: Dict[str, Dict[str, Any]],
+        new_states: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Fetch one detail page, reusing the stored parse when unchanged"""
+        status, content, state = await self.fetch_conditional(url, states.get(url))
+        previous = states.get(url)
+        if status == "failed":
+            return previous["payload"] if previous and previous.get("payload") else {}
         
-        for test in first_page_tests:
-            all_tests[test['url']] = test
+        if status == "changed":
+            payload = await self.parse_test_details(content, url)
+            if payload is None:
+                return previous["payload"] if previous and previous.get("payload") else {}
+            state["payload"] = payload
         
-        await asyncio.sleep(self.delay)
-
-        logger.info(f"Step 4: Processing pages 2-{max_page}...")
-        items_per_page = 12
+        new_states[url] = state
+        return state["payload"] or {}
+    
+    async def scrape_all_tests(self, incremental: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Scrape all Individual Test Solutions dynamically
         
-        for page_num in range(2, max_page + 1):
-            start_index = (page_num - 1) * items_per_page
-            logger.info(f"→ Page {page_num}/{max_page} (start={start_index})")
-            
-            page_soup = self.get_catalog_page(start_index)
-            if not page_soup:
-                logger.warning(f"  ✗ Failed to fetch page {page_num}")
-                continue
-            
-            tests = self.extract_tests_from_page(page_soup)
-            logger.info(f"  ✓ Found {len(tests)} tests")
-            
-            new_tests = 0
-            for test in tests:
-                if test['url'] not in all_tests:
-                    all_tests[test['url']] = test
-                    new_tests += 1
-            
-            if new_tests < len(tests):
-                logger.debug(f"  Note: {len(tests) - new_tests} duplicates skipped")
+        With incremental=True every page is requested conditionally with
+        its stored ETag/Last-Modified; pages answering 304, or 200 with an
+        unchanged content hash, reuse the stored parse instead of being
+        parsed again.
+        
+        Listing pages that still fail after retries are recorded in
+        failed_listing_pages; their tests are missing from the result, so
+        callers must check last_scrape_complete before treating it as the
+        whole catalog.
+        
+        Args:
+            incremental: Use stored page validators and content hashes
             
-            await asyncio.sleep(self.delay)
+        Returns:
+            Dictionary of assessments (url -> data)
+        """
+        all_tests = {}
+        self.failed_listing_pages = []
+        start_time = time.perf_counter()
+        states = await asyncio.to_thread(self.load_page_states) if incremental else {}
+        new_states: Dict[str, Dict[str, Any]] = {}
         
         logger.info("="*80)
-        logger.info(f"Catalog scraping complete! Total unique tests: {len(all_tests)}")
+        logger.info("Starting Dynamic Scrape of Individual Test Solutions")
+        logger.info(
+            f"Concurrency: {self.concurrency}, Rate limit: {self.rate_limit:.1f} req/s, "
+            f"Incremental: {incremental} ({len(states)} known pages)"
+        )
         logger.info("="*80)
         
-        logger.info("Step 5: Fetching detailed information for each test...")
-        for idx, (url, test_data) in enumerate(all_tests.items(), 1):
-            logger.info(f"[{idx}/{len(all_tests)}] {test_data['name']}")
-            details = self.get_test_details(url)
+        try:
+            logger.info("Step 1: Fetching first page...")
+            first_page = await self._scrape_listing(0, states, new_states)
             
-            if details:
-                test_data.update(details)
-
-            if idx % 10 == 0:
-                logger.info(f"  Progress: {idx}/{len(all_tests)} ({idx*100//len(all_tests)}%)")
+            if not first_page:
+                self.failed_listing_pages.append(1)
+                logger.error("Failed to fetch first page!")
+                return all_tests
+            max_page = first_page.get("max_page") or 1
+            logger.info(f"✓ Found maximum page: {max_page}")
+            logger.info(f"✓ Found {len(first_page['tests'])} tests on page 1")
             
-            await asyncio.sleep(self.delay)
+            for test in first_page["tests"]:
+                all_tests[test['url']] = dict(test)
+            
+            logger.info(f"Step 2: Processing pages 2-{max_page} concurrently...")
+            items_per_page = 12
+            starts = [(page_num - 1) * items_per_page for page_num in range(2, max_page + 1)]
+            pages = await asyncio.gather(*(self._scrape_listing(start, states, new_states) for start in starts))
+            
+            for page_num, page in enumerate(pages, 2):
+                if not page:
+                    self.failed_listing_pages.append(page_num)
+                    logger.warning(f"  ✗ Failed to fetch page {page_num}")
+                    continue
+                
+                for test in page["tests"]:
+                    if test['url'] not in all_tests:
+                        all_tests[test['url']] = dict(test)
+            
+            logger.info("="*80)
+            logger.info(f"Catalog scraping complete! Total unique tests: {len(all_tests)}")
+            if self.failed_listing_pages:
+                logger.error(f"Catalog is incomplete, failed listing pages: {self.failed_listing_pages}")
+            logger.info("="*80)
+            
+            logger.info("Step 3: Fetching detailed information for each test...")
+            completed = 0
+            
+            async def fetch_details(url: str, test_data: Dict[str, Any]):
+                nonlocal completed
+                details = await self._scrape_details(url, states, new_states)
+                if details:
+                    test_data.update(details)
+                completed += 1
+                if completed % 25 == 0:
+                    logger.info(f"  Progress: {completed}/{len(all_tests)} ({completed*100//len(all_tests)}%)")
+            
+            await asyncio.gather(*(fetch_details(url, data) for url, data in all_tests.items()))
+        
+        finally:
+            await self.close()
+            await asyncio.to_thread(self.save_page_states, new_states)
         
         logger.info("="*80)
-        logger.info(f"Total tests scraped: {len(all_tests)}")
+        logger.info(
+            f"Total tests scraped: {len(all_tests)} in {time.perf_counter() - start_time:.1f}s "
+            f"(requests={self.stats['requests']}, 304={self.stats['not_modified']}, "
+            f"unchanged={self.stats['unchanged']}, changed={self.stats['changed']}, "
+            f"retries={self.stats['retries']}, failures={self.stats['failures']})"
+        )
         logger.info("="*80)
         
         return all_tests
     
-    def save_to_json(self, data: Dict[str, Any], filename: str = None):
-        """Save scraped data to JSON file"""
+    def save_to_json(self, data: Dict[str, Any], filename: str = None) -> bool:
+        """
+        Save scraped data to JSON file
+        
+        The file is only rewritten when its content changes, and is replaced
+        atomically so readers never see a partial file.
+        
+        Returns:
+            True if the file was written
+        """
         filename = filename or settings.ASSESSMENTS_JSON_PATH
         
         try:
             output_path = Path(filename)
             output_path.parent.mkdir(parents=True, exist_ok=True)
+            serialized = json.dumps(data, indent=2, ensure_ascii=False)
+            
+            if output_path.exists() and output_path.read_text(encoding='utf-8') == serialized:
+                logger.info(f"{filename} is unchanged, not rewriting")
+                return False
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(serialized)
+                os.replace(tmp_path, output_path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
             
             logger.info(f"Data saved to {filename}")
             logger.info(f"Total tests saved: {len(data)}")
+            return True
         except Exception as e:
             logger.error(f"Error saving to JSON: {e}")
             raise
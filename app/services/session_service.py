@@ -1,8 +1,18 @@
 import uuid
-from datetime import datetime
+import json
+import hashlib
+from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
+from sqlalchemy import func, text
 from sqlalchemy.orm import Session as DBSession
-from app.models.database_models import Session, Interaction, AgentExecution
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models.database_models import (
+    Session,
+    Interaction,
+    AgentExecution,
+    SessionStats,
+    RecommendationPayload
+)
 from app.database.sqlite_db import db_manager
 from app.utils.logger import get_logger
 
@@ -26,13 +36,14 @@ class SessionService:
         try:
             session_id = str(uuid.uuid4())
             
-            with db_manager.get_session() as db:
+            with db_manager.write_session() as db:
                 session = Session(
                     id=session_id,
                     user_id=user_id,
                     session_metadata=metadata or {}
                 )
                 db.add(session)
+                db.add(SessionStats(session_id=session_id, intent_counts={}))
                 db.commit()
             
             logger.info(f"Created session: {session_id}")
@@ -93,31 +104,20 @@ class SessionService:
             Interaction ID
         """
         try:
-            with db_manager.get_session() as db:
-                interaction = Interaction(
+            with db_manager.write_session() as db:
+                interaction = self._build_interaction(
                     session_id=session_id,
                     query=query,
                     query_type=query_type,
                     intent=intent,
                     recommended_assessments=recommended_assessments,
-                    assessment_count=len(recommended_assessments) if recommended_assessments else 0,
                     processing_time=processing_time,
                     error_message=error_message,
-                    success=1 if not error_message else 0
+                    agent_outputs=agent_outputs
                 )
                 
-                if agent_outputs:
-                    if 'supervisor' in agent_outputs:
-                        interaction.supervisor_output = agent_outputs['supervisor']
-                    if 'jd_extractor' in agent_outputs:
-                        interaction.jd_extractor_output = agent_outputs['jd_extractor']
-                    if 'jd_processor' in agent_outputs:
-                        interaction.jd_processor_output = agent_outputs['jd_processor']
-                    if 'rag' in agent_outputs:
-                        interaction.rag_output = agent_outputs['rag']
-                    if 'general_query' in agent_outputs:
-                        interaction.general_query_output = agent_outputs['general_query']
-                
+                self.attach_recommendation_payloads(db, [interaction])
+                self._apply_session_stats(db, [interaction])
                 db.add(interaction)
                 db.commit()
                 db.refresh(interaction)
@@ -129,6 +129,322 @@ class SessionService:
             logger.error(f"Failed to save interaction: {e}")
             raise
     
+    def save_interactions_batch(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Save a batch of queued interactions in a single transaction
+        
+        Each record holds the keyword arguments of save_interaction (plus an
+        optional timestamp). One AgentExecution row is written per agent
+        output alongside its interaction.
+        
+        Args:
+            records: Interaction records from the write-behind queue
+            
+        Returns:
+            Number of interactions saved
+        """
+        if not records:
+            return 0
+        
+        try:
+            with db_manager.write_session() as db:
+                interactions = [self._build_interaction(**record) for record in records]
+                self.attach_recommendation_payloads(db, interactions)
+                self._apply_session_stats(db, interactions)
+                db.add_all(interactions)
+                db.flush()
+                
+                executions = []
+                for record, interaction in zip(records, interactions):
+                    executions.extend(self._build_agent_executions(interaction, record.get('agent_outputs')))
+                
+                if executions:
+                    db.add_all(executions)
+                
+                db.commit()
+                
+                logger.info(
+                    f"Saved batch of {len(interactions)} interactions "
+                    f"and {len(executions)} agent executions"
+                )
+                return len(interactions)
+                
+        except Exception as e:
+            logger.error(f"Failed to save interaction batch: {e}")
+            raise
+    
+    def _build_interaction(
+        self,
+        session_id: str,
+        query: str,
+        query_type: str,
+        intent: Optional[str] = None,
+        recommended_assessments: Optional[List[Dict[str, Any]]] = None,
+        processing_time: Optional[float] = None,
+        error_message: Optional[str] = None,
+        agent_outputs: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[datetime] = None
+    ) -> Interaction:
+        """Build an Interaction row from interaction fields"""
+        interaction = Interaction(
+            session_id=session_id,
+            timestamp=timestamp or datetime.utcnow(),
+            query=query,
+            query_type=query_type,
+            intent=intent,
+            recommended_assessments=recommended_assessments,
+            assessment_count=len(recommended_assessments) if recommended_assessments else 0,
+            processing_time=processing_time,
+            error_message=error_message,
+            success=1 if not error_message else 0
+        )
+        
+        if agent_outputs:
+            if 'supervisor' in agent_outputs:
+                interaction.supervisor_output = agent_outputs['supervisor']
+            if 'jd_extractor' in agent_outputs:
+                interaction.jd_extractor_output = agent_outputs['jd_extractor']
+            if 'jd_processor' in agent_outputs:
+                interaction.jd_processor_output = agent_outputs['jd_processor']
+            if 'rag' in agent_outputs:
+                interaction.rag_output = agent_outputs['rag']
+            if 'general_query' in agent_outputs:
+                interaction.general_query_output = agent_outputs['general_query']
+            
+            usages = [
+                output['token_usage'] for output in agent_outputs.values()
+                if isinstance(output, dict) and output.get('token_usage')
+            ]
+            if usages:
+                interaction.llm_input_tokens = sum(usage['input_tokens'] for usage in usages)
+                interaction.llm_output_tokens = sum(usage['output_tokens'] for usage in usages)
+                interaction.llm_cost_usd = sum(usage['cost_usd'] for usage in usages)
+        
+        return interaction
+    
+    def _apply_session_stats(self, db: DBSession, interactions: List[Interaction]):
+        """
+        Fold new interactions into the materialized session counters
+        
+        Runs inside the write transaction that inserts the interactions, so
+        counters and rows always commit together.
+        """
+        by_session: Dict[str, List[Interaction]] = {}
+        for interaction in interactions:
+            by_session.setdefault(interaction.session_id, []).append(interaction)
+        
+        existing = {
+            stats.session_id: stats
+            for stats in db.query(SessionStats).filter(SessionStats.session_id.in_(by_session.keys()))
+        }
+        
+        for session_id, rows in by_session.items():
+            stats = existing.get(session_id)
+            if stats is None:
+                stats = SessionStats(
+                    session_id=session_id,
+                    created_at=min(row.timestamp for row in rows),
+                    total_interactions=0,
+                    successful_interactions=0,
+                    total_recommendations=0,
+                    total_processing_time=0.0,
+                    intent_counts={}
+                )
+                db.add(stats)
+            
+            intent_counts = dict(stats.intent_counts or {})
+            for row in rows:
+                if row.intent:
+                    intent_counts[row.intent] = intent_counts.get(row.intent, 0) + 1
+            
+            stats.total_interactions += len(rows)
+            stats.successful_interactions += sum(1 for row in rows if row.success)
+            stats.total_recommendations += sum(row.assessment_count or 0 for row in rows)
+            stats.total_processing_time += sum(row.processing_time or 0.0 for row in rows)
+            stats.intent_counts = intent_counts
+            latest = max(row.timestamp for row in rows)
+            if stats.last_interaction_at is None or latest > stats.last_interaction_at:
+                stats.last_interaction_at = latest
+    
+    def backfill_session_stats(self) -> int:
+        """
+        Build session_stats from existing interactions
+        
+        Only runs when the counters table is empty, i.e. on the first start
+        after upgrading an existing database.
+        
+        Returns:
+            Number of sessions backfilled
+        """
+        try:
+            with db_manager.write_session() as db:
+                if db.query(SessionStats.session_id).first() is not None:
+                    return 0
+                
+                rows = db.query(
+                    Interaction.session_id,
+                    Interaction.intent,
+                    func.count(Interaction.id),
+                    func.sum(Interaction.success),
+                    func.sum(func.coalesce(Interaction.assessment_count, 0)),
+                    func.sum(func.coalesce(Interaction.processing_time, 0.0)),
+                    func.min(Interaction.timestamp),
+                    func.max(Interaction.timestamp)
+                ).group_by(Interaction.session_id, Interaction.intent).all()
+                
+                sessions: Dict[str, SessionStats] = {}
+                for session_id, intent, count, successes, recommendations, processing, first, last in rows:
+                    stats = sessions.get(session_id)
+                    if stats is None:
+                        stats = sessions[session_id] = SessionStats(
+                            session_id=session_id,
+                            created_at=first,
+                            last_interaction_at=last,
+                            total_interactions=0,
+                            successful_interactions=0,
+                            total_recommendations=0,
+                            total_processing_time=0.0,
+                            intent_counts={}
+                        )
+                    stats.total_interactions += count
+                    stats.successful_interactions += successes or 0
+                    stats.total_recommendations += recommendations or 0
+                    stats.total_processing_time += processing or 0.0
+                    stats.created_at = min(stats.created_at, first)
+                    stats.last_interaction_at = max(stats.last_interaction_at, last)
+                    if intent:
+                        stats.intent_counts = {**stats.intent_counts, intent: count}
+                
+                db.add_all(sessions.values())
+            
+            if sessions:
+                logger.info(f"Backfilled session stats for {len(sessions)} sessions")
+            return len(sessions)
+            
+        except Exception as e:
+            logger.error(f"Failed to backfill session stats: {e}")
+            return 0
+    
+    def attach_recommendation_payloads(self, db: DBSession, interactions: List[Interaction]) -> int:
+        """
+        Store recommendation lists once in recommendation_payloads
+        
+        Identical lists are common (same query, same catalog), so each
+        interaction keeps only the content hash and the payload row counts
+        its references.
+        
+        Args:
+            db: Open write session
+            interactions: Interactions whose recommended_assessments to move
+            
+        Returns:
+            Number of interactions that now reference a payload
+        """
+        counts: Dict[str, int] = {}
+        payloads: Dict[str, Any] = {}
+        
+        for interaction in interactions:
+            if not interaction.recommended_assessments:
+                continue
+            payload_id = payload_digest(interaction.recommended_assessments)
+            payloads[payload_id] = interaction.recommended_assessments
+            counts[payload_id] = counts.get(payload_id, 0) + 1
+            interaction.recommendation_payload_id = payload_id
+            interaction.recommended_assessments = None
+        
+        for payload_id, count in counts.items():
+            stmt = sqlite_insert(RecommendationPayload).values(
+                id=payload_id,
+                payload=payloads[payload_id],
+                ref_count=count,
+                created_at=datetime.utcnow()
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[RecommendationPayload.id],
+                set_={"ref_count": RecommendationPayload.ref_count + count}
+            )
+            db.execute(stmt)
+        
+        return sum(counts.values())
+    
+    def release_recommendation_payloads(self, db: DBSession, interactions: List[Interaction]) -> int:
+        """
+        Drop references held by interactions that are about to be deleted
+        
+        Payloads whose reference count reaches zero are removed.
+        
+        Args:
+            db: Open write session
+            interactions: Interactions being deleted
+            
+        Returns:
+            Number of payload rows removed
+        """
+        counts: Dict[str, int] = {}
+        for interaction in interactions:
+            if interaction.recommendation_payload_id:
+                counts[interaction.recommendation_payload_id] = counts.get(interaction.recommendation_payload_id, 0) + 1
+        
+        for payload_id, count in counts.items():
+            db.query(RecommendationPayload).filter(RecommendationPayload.id == payload_id).update(
+                {RecommendationPayload.ref_count: RecommendationPayload.ref_count - count},
+                synchronize_session=False
+            )
+        
+        if not counts:
+            return 0
+        
+        return db.query(RecommendationPayload).filter(
+            RecommendationPayload.id.in_(counts.keys()),
+            RecommendationPayload.ref_count <= 0
+        ).delete(synchronize_session=False)
+    
+    def resolve_recommendation_payloads(
+        self,
+        db: DBSession,
+        interactions: List[Interaction]
+    ) -> Dict[str, Any]:
+        """
+        Load the payloads referenced by a set of interactions
+        
+        Args:
+            db: Open session
+            interactions: Interactions to resolve
+            
+        Returns:
+            Mapping of payload ID to recommendation list
+        """
+        payload_ids = {i.recommendation_payload_id for i in interactions if i.recommendation_payload_id}
+        if not payload_ids:
+            return {}
+        
+        rows = db.query(RecommendationPayload).filter(RecommendationPayload.id.in_(payload_ids)).all()
+        return {row.id: row.payload for row in rows}
+    
+    def _build_agent_executions(
+        self,
+        interaction: Interaction,
+        agent_outputs: Optional[Dict[str, Any]]
+    ) -> List[AgentExecution]:
+        """Build AgentExecution rows from the per-agent outputs of an interaction"""
+        executions = []
+        
+        for agent_name, output in (agent_outputs or {}).items():
+            if not isinstance(output, dict) or 'execution_time' not in output:
+                continue
+            executions.append(AgentExecution(
+                interaction_id=interaction.id,
+                session_id=interaction.session_id,
+                agent_name=agent_name,
+                timestamp=interaction.timestamp,
+                output_data=output,
+                execution_time=output.get('execution_time'),
+                success=1 if output.get('success', True) else 0,
+                error_message=output.get('error')
+            ))
+        
+        return executions
+    
     def save_agent_execution(
         self,
         interaction_id: int,
@@ -157,7 +473,7 @@ class SessionService:
             Agent execution ID
         """
         try:
-            with db_manager.get_session() as db:
+            with db_manager.write_session() as db:
                 execution = AgentExecution(
                     interaction_id=interaction_id,
                     session_id=session_id,
@@ -194,8 +510,16 @@ class SessionService:
                 interactions = db.query(Interaction).filter(
                     Interaction.session_id == session_id
                 ).order_by(Interaction.timestamp).all()
+                payloads = self.resolve_recommendation_payloads(db, interactions)
+                
+                results = []
+                for interaction in interactions:
+                    data = interaction.to_dict()
+                    if interaction.recommendation_payload_id:
+                        data["recommended_assessments"] = payloads.get(interaction.recommendation_payload_id)
+                    results.append(data)
                 
-                return [interaction.to_dict() for interaction in interactions]
+                return results
                 
         except Exception as e:
             logger.error(f"Failed to get interactions for session {session_id}: {e}")
@@ -212,15 +536,21 @@ class SessionService:
             True if successful
         """
         try:
-            with db_manager.get_session() as db:
+            with db_manager.write_session() as db:
                 db.query(AgentExecution).filter(
                     AgentExecution.session_id == session_id
                 ).delete()
                 
+                interactions = db.query(Interaction).filter(
+                    Interaction.session_id == session_id
+                ).all()
+                self.release_recommendation_payloads(db, interactions)
+                
                 db.query(Interaction).filter(
                     Interaction.session_id == session_id
                 ).delete()
                 db.query(Session).filter(Session.id == session_id).delete()
+                db.query(SessionStats).filter(SessionStats.session_id == session_id).delete()
                 
                 db.commit()
                 
@@ -235,6 +565,8 @@ class SessionService:
         """
         Get statistics for a session
         
+        Reads the materialized counters with a single primary key lookup.
+        
         Args:
             session_id: Session ID
             
@@ -243,32 +575,147 @@ class SessionService:
         """
         try:
             with db_manager.get_session() as db:
-                session = db.query(Session).filter(Session.id == session_id).first()
+                stats = db.get(SessionStats, session_id)
                 
-                if not session:
+                if not stats:
                     return {}
                 
-                interaction_count = db.query(Interaction).filter(
-                    Interaction.session_id == session_id
-                ).count()
-                
-                successful_interactions = db.query(Interaction).filter(
-                    Interaction.session_id == session_id,
-                    Interaction.success == 1
-                ).count()
-                
-                return {
-                    "session_id": session_id,
-                    "created_at": session.created_at.isoformat(),
-                    "updated_at": session.updated_at.isoformat(),
-                    "total_interactions": interaction_count,
-                    "successful_interactions": successful_interactions,
-                    "success_rate": successful_interactions / interaction_count if interaction_count > 0 else 0
-                }
+                return stats.to_dict()
                 
         except Exception as e:
             logger.error(f"Failed to get session stats: {e}")
             return {}
+    
+    def get_intent_analytics(self, window_hours: int = 24, bucket_minutes: int = 60) -> Dict[str, Any]:
+        """
+        Per-intent latency and success rates over a time window
+        
+        A single GROUP BY over the (timestamp, intent, ...) covering index.
+        
+        Args:
+            window_hours: How far back to look
+            bucket_minutes: Width of each time bucket
+            
+        Returns:
+            Overall and bucketed metrics per intent
+        """
+        since = datetime.utcnow() - timedelta(hours=window_hours)
+        bucket_seconds = bucket_minutes * 60
+        
+        query = text("""
+            SELECT
+                COALESCE(intent, 'unknown') AS intent,
+                (CAST(strftime('%s', timestamp) AS INTEGER) / :bucket) * :bucket AS bucket,
+                COUNT(*) AS total,
+                SUM(success) AS successful,
+                COUNT(processing_time) AS timed,
+                SUM(processing_time) AS latency_sum,
+                MAX(processing_time) AS max_latency
+            FROM interactions
+            WHERE timestamp >= :since
+            GROUP BY 1, 2
+            ORDER BY 1, 2
+        """)
+        
+        try:
+            with db_manager.get_session() as db:
+                rows = db.execute(query, {"bucket": bucket_seconds, "since": since}).all()
+        except Exception as e:
+            logger.error(f"Failed to compute intent analytics: {e}")
+            return {}
+        
+        intents: Dict[str, Dict[str, Any]] = {}
+        for intent, bucket, total, successful, timed, latency_sum, max_latency in rows:
+            entry = intents.setdefault(intent, {
+                "total": 0,
+                "successful": 0,
+                "timed": 0,
+                "latency_sum": 0.0,
+                "max_latency": 0.0,
+                "buckets": []
+            })
+            entry["total"] += total
+            entry["successful"] += successful or 0
+            entry["timed"] += timed
+            entry["latency_sum"] += latency_sum or 0.0
+            entry["max_latency"] = max(entry["max_latency"], max_latency or 0.0)
+            entry["buckets"].append({
+                "start": datetime.utcfromtimestamp(bucket).isoformat(),
+                "total": total,
+                "success_rate": (successful or 0) / total,
+                "avg_latency": latency_sum / timed if timed else None,
+                "max_latency": max_latency
+            })
+        
+        for entry in intents.values():
+            entry["success_rate"] = entry["successful"] / entry["total"]
+            timed = entry.pop("timed")
+            latency_sum = entry.pop("latency_sum")
+            entry["avg_latency"] = latency_sum / timed if timed else None
+        
+        return {
+            "window_hours": window_hours,
+            "bucket_minutes": bucket_minutes,
+            "since": since.isoformat(),
+            "intents": intents
+        }
+    
+    def get_token_usage(self, window_hours: int = 24) -> Dict[str, Any]:
+        """
+        Persisted LLM token usage and cost per intent over a time window
+        
+        Args:
+            window_hours: How far back to look
+            
+        Returns:
+            Totals overall and per intent
+        """
+        since = datetime.utcnow() - timedelta(hours=window_hours)
+        query = text("""
+            SELECT
+                COALESCE(intent, 'unknown') AS intent,
+                COUNT(*) AS interactions,
+                COALESCE(SUM(llm_input_tokens), 0) AS input_tokens,
+                COALESCE(SUM(llm_output_tokens), 0) AS output_tokens,
+                COALESCE(SUM(llm_cost_usd), 0.0) AS cost_usd
+            FROM interactions
+            WHERE timestamp >= :since
+            GROUP BY 1
+            ORDER BY 1
+        """)
+        
+        try:
+            with db_manager.get_session() as db:
+                rows = db.execute(query, {"since": since}).all()
+        except Exception as e:
+            logger.error(f"Failed to compute token usage: {e}")
+            return {}
+        
+        intents = {
+            intent: {
+                "interactions": interactions,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cost_usd": round(cost_usd, 6),
+                "avg_cost_usd": round(cost_usd / interactions, 6) if interactions else 0.0
+            }
+            for intent, interactions, input_tokens, output_tokens, cost_usd in rows
+        }
+        return {
+            "window_hours": window_hours,
+            "since": since.isoformat(),
+            "input_tokens": sum(entry["input_tokens"] for entry in intents.values()),
+            "output_tokens": sum(entry["output_tokens"] for entry in intents.values()),
+            "cost_usd": round(sum(entry["cost_usd"] for entry in intents.values()), 6),
+            "intents": intents
+        }
+
+
+def payload_digest(payload: Any) -> str:
+    """Content hash of a JSON payload (key order independent)"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
 
 session_service = SessionService()
 
@@ -0,0 +1,182 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("token_ledger")
+
+_agent_usage: contextvars.ContextVar[Optional[Tuple[str, "UsageTotals"]]] = contextvars.ContextVar("agent_usage", default=None)
+
+
+class UsageTotals:
+    """Token and cost totals for one scope (an agent run, an agent, a model)"""
+    
+    __slots__ = ("calls", "input_tokens", "output_tokens", "cost_usd")
+    
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = 0.0
+    
+    def add(self, input_tokens: int, output_tokens: int, cost_usd: float):
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cost_usd += cost_usd
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'llm_calls': self.calls,
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'total_tokens': self.input_tokens + self.output_tokens,
+            'cost_usd': round(self.cost_usd, 6)
+        }
+
+
+class TokenLedger:
+    """
+    Token and cost accounting for LLM calls
+    
+    LLMService records the usage the provider reports for every call. The
+    usage is added to the agent currently running (a context variable set
+    by BaseAgent.run_with_metrics), to process-wide totals per agent, call
+    type and model, and to a one-minute sliding window of per-second buckets
+    that backs the token budget guard.
+    """
+    
+    def __init__(
+        self,
+        input_price_per_1m: float = None,
+        output_price_per_1m: float = None,
+        budget_per_minute: int = None
+    ):
+        self.input_price = (input_price_per_1m if input_price_per_1m is not None else settings.LLM_INPUT_PRICE_PER_1M) / 1_000_000
+        self.output_price = (output_price_per_1m if output_price_per_1m is not None else settings.LLM_OUTPUT_PRICE_PER_1M) / 1_000_000
+        self.budget_per_minute = budget_per_minute if budget_per_minute is not None else settings.LLM_TOKEN_BUDGET_PER_MINUTE
+        self.by_agent: Dict[str, UsageTotals] = {}
+        self.by_call: Dict[str, UsageTotals] = {}
+        self.by_model: Dict[str, UsageTotals] = {}
+        self.total = UsageTotals()
+        self.degraded: Dict[str, int] = {}
+        self._window = [0] * 60
+        self._window_seconds = [0] * 60
+        self._lock = threading.Lock()
+    
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        """Cost in USD at the configured per-million-token prices"""
+        return input_tokens * self.input_price + output_tokens * self.output_price
+    
+    @contextmanager
+    def agent_scope(self, agent: str) -> Iterator[UsageTotals]:
+        """
+        Attribute the LLM calls made inside the block to an agent
+        
+        Args:
+            agent: Agent name
+        
+        Yields:
+            Totals of the block, filled in as calls are recorded
+        """
+        usage = UsageTotals()
+        token = _agent_usage.set((agent, usage))
+        try:
+            yield usage
+        finally:
+            _agent_usage.reset(token)
+    
+    def record(self, model: str, call: str, input_tokens: int, output_tokens: int) -> float:
+        """
+        Account one LLM call
+        
+        Args:
+            model: Model name
+            call: Call type ("text" or the structured output schema)
+            input_tokens: Prompt tokens
+            output_tokens: Completion tokens
+        
+        Returns:
+            Cost of the call in USD
+        """
+        cost = self.cost(input_tokens, output_tokens)
+        scope = _agent_usage.get()
+        agent = "none"
+        if scope is not None:
+            agent, usage = scope
+            usage.add(input_tokens, output_tokens, cost)
+        
+        second = int(time.time())
+        with self._lock:
+            for key, table in ((agent, self.by_agent), (call, self.by_call), (model, self.by_model)):
+                totals = table.get(key)
+                if totals is None:
+                    totals = table[key] = UsageTotals()
+                totals.add(input_tokens, output_tokens, cost)
+            self.total.add(input_tokens, output_tokens, cost)
+            
+            slot = second % 60
+            if self._window_seconds[slot] != second:
+                self._window_seconds[slot] = second
+                self._window[slot] = 0
+            self._window[slot] += input_tokens + output_tokens
+        return cost
+    
+    def tokens_last_minute(self) -> int:
+        """Tokens recorded in the last 60 seconds"""
+        oldest = int(time.time()) - 59
+        with self._lock:
+            return sum(tokens for tokens, second in zip(self._window, self._window_seconds) if second >= oldest)
+    
+    def over_budget(self, feature: str) -> bool:
+        """
+        Whether an optional LLM step should be skipped for the token budget
+        
+        Args:
+            feature: Step being considered, counted when it is skipped
+        
+        Returns:
+            True if LLM_TOKEN_BUDGET_PER_MINUTE is set and has been used up
+        """
+        if self.budget_per_minute <= 0 or self.tokens_last_minute() < self.budget_per_minute:
+            return False
+        with self._lock:
+            self.degraded[feature] = self.degraded.get(feature, 0) + 1
+        logger.warning(f"Token budget of {self.budget_per_minute}/min used up, skipping {feature}")
+        return True
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get token and cost totals since startup
+        
+        Returns:
+            Totals overall and per agent, call type and model, plus budget state
+        """
+        last_minute = self.tokens_last_minute()
+        with self._lock:
+            return {
+                'total': self.total.to_dict(),
+                'by_agent': {key: totals.to_dict() for key, totals in self.by_agent.items()},
+                'by_call': {key: totals.to_dict() for key, totals in self.by_call.items()},
+                'by_model': {key: totals.to_dict() for key, totals in self.by_model.items()},
+                'budget': {
+                    'tokens_per_minute': self.budget_per_minute or None,
+                    'tokens_last_minute': last_minute,
+                    'degraded': dict(self.degraded)
+                },
+                'prices_per_1m': {
+                    'input': self.input_price * 1_000_000,
+                    'output': self.output_price * 1_000_000
+                }
+            }
+
+
+token_ledger = TokenLedger()
+
+
+def get_token_ledger() -> TokenLedger:
+    """Get token ledger instance"""
+    return token_ledger
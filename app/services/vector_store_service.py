@@ -1,7 +1,13 @@
-from typing import List, Dict, Any, Optional
+import asyncio
+import hashlib
+import json
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from app.database.chroma_db import get_chroma_client
+from app.database.sqlite_db import db_manager
+from app.models.database_models import VectorStoreMetadata
 from app.services.embedding_service import get_embedding_service
+from app.services.catalog_cache_service import get_catalog_cache_service
 from app.models.assessment import Assessment
 from app.config import settings
 from app.utils.logger import get_logger
@@ -18,6 +24,7 @@ class VectorStoreService:
     def __init__(self):
         self.chroma_manager = get_chroma_client()
         self.embedding_service = get_embedding_service()
+        self.catalog_cache = get_catalog_cache_service()
         self.similarity_threshold = settings.RAG_SIMILARITY_THRESHOLD
         
         logger.info(
@@ -56,28 +63,7 @@ class VectorStoreService:
                 logger.warning("No valid assessments to index")
                 return 0
             
-            documents = []
-            metadatas = []
-            ids = []
-            
-            for assessment in assessment_objects:
-                doc_text = assessment.to_embedding_text()
-                documents.append(doc_text)
-                metadata = {
-                    "name": assessment.name,
-                    "url": assessment.url,
-                    "test_type": ",".join(assessment.test_type),
-                    "remote_support": assessment.remote_support,
-                    "adaptive_support": assessment.adaptive_support,
-                    "duration": assessment.duration or -1,
-                    "job_levels": assessment.job_levels,
-                    "languages": assessment.languages,
-                    "description": assessment.description
-                }
-                metadatas.append(metadata)
-                
-                doc_id = assessment.url.replace("https://", "").replace("http://", "").replace("/", "_")
-                ids.append(doc_id)
+            documents, metadatas, ids = self._prepare_documents(assessment_objects)
             
             logger.info(f"Generating embeddings for {len(documents)} documents")
             embeddings = await self.embedding_service.generate_embeddings(
@@ -102,6 +88,11 @@ class VectorStoreService:
                     ids=batch_ids
                 )
             
+            await asyncio.to_thread(
+                self.catalog_cache.put_many,
+                [self._metadata_to_assessment(metadata) for metadata in metadatas]
+            )
+            
             logger.info(f"Successfully indexed {len(assessment_objects)} assessments")
             return len(assessment_objects)
             
@@ -109,6 +100,219 @@ class VectorStoreService:
             logger.error(f"Failed to index assessments: {e}")
             raise
     
+    @staticmethod
+    def _doc_id(url: str) -> str:
+        """Chroma document ID for an assessment URL"""
+        return url.replace("https://", "").replace("http://", "").replace("/", "_")
+    
+    @staticmethod
+    def _content_hash(doc_text: str, metadata: Dict[str, Any]) -> str:
+        """Hash of everything stored for a document, used for change detection"""
+        payload = json.dumps({"text": doc_text, "metadata": metadata}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _prepare_documents(
+        self,
+        assessments: List[Assessment]
+    ) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+        """
+        Build embedding texts, metadata and IDs for assessments
+        
+        Args:
+            assessments: Parsed assessments
+            
+        Returns:
+            (documents, metadatas, ids)
+        """
+        documents = []
+        metadatas = []
+        ids = []
+        
+        for assessment in assessments:
+            doc_text = assessment.to_embedding_text()
+            documents.append(doc_text)
+            metadata = {
+                "name": assessment.name,
+                "url": assessment.url,
+                "test_type": ",".join(assessment.test_type),
+                "remote_support": assessment.remote_support,
+                "adaptive_support": assessment.adaptive_support,
+                "duration": assessment.duration or -1,
+                "job_levels": assessment.job_levels,
+                "languages": assessment.languages,
+                "description": assessment.description
+            }
+            metadata["content_hash"] = self._content_hash(doc_text, metadata)
+            metadatas.append(metadata)
+            ids.append(self._doc_id(assessment.url))
+        
+        return documents, metadatas, ids
+    
+    async def sync_assessments(
+        self,
+        assessments: Dict[str, Dict[str, Any]],
+        batch_size: int = 20,
+        source: str = "scraper",
+        prune: bool = True
+    ) -> Dict[str, int]:
+        """
+        Bring the collection in line with a catalog snapshot
+        
+        Only new or changed assessments are embedded; changed ones are
+        updated in place and ones no longer in the catalog are deleted.
+        Documents indexed before content hashes were stored are compared on
+        their metadata and, if unchanged, only get the hash backfilled.
+        
+        Args:
+            assessments: Dictionary of assessments (url -> data)
+            batch_size: Batch size for embedding generation
+            source: Recorded in vector_store_metadata
+            prune: Delete documents missing from the snapshot; pass False
+                when the snapshot may be incomplete
+            
+        Returns:
+            Counts of added, updated, deleted and unchanged documents
+        """
+        assessment_objects = []
+        for url, data in assessments.items():
+            try:
+                assessment_objects.append(Assessment(**data))
+            except Exception as e:
+                logger.warning(f"Failed to parse assessment {url}: {e}")
+        
+        if not assessment_objects:
+            logger.warning("No valid assessments to sync, leaving the collection untouched")
+            return {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+        
+        documents, metadatas, ids = self._prepare_documents(assessment_objects)
+        existing = await asyncio.to_thread(self.chroma_manager.get_all_metadatas)
+        
+        added: List[int] = []
+        changed: List[int] = []
+        hash_only: List[int] = []
+        for i, doc_id in enumerate(ids):
+            current = existing.get(doc_id)
+            if current is None:
+                added.append(i)
+            elif current.get("content_hash") == metadatas[i]["content_hash"]:
+                continue
+            elif "content_hash" not in current and all(
+                current.get(key) == value for key, value in metadatas[i].items() if key != "content_hash"
+            ):
+                hash_only.append(i)
+            else:
+                changed.append(i)
+        
+        seen = set(ids)
+        removed = [doc_id for doc_id in existing if doc_id not in seen] if prune else []
+        
+        to_embed = added + changed
+        if to_embed:
+            logger.info(f"Generating embeddings for {len(to_embed)} new or changed documents")
+            embeddings = await self.embedding_service.generate_embeddings(
+                [documents[i] for i in to_embed],
+                batch_size=batch_size
+            )
+            embedded = dict(zip(to_embed, embeddings))
+            
+            for batch in chunk_list(added, 100):
+                self.chroma_manager.add_documents(
+                    documents=[documents[i] for i in batch],
+                    embeddings=[embedded[i] for i in batch],
+                    metadatas=[metadatas[i] for i in batch],
+                    ids=[ids[i] for i in batch]
+                )
+            for batch in chunk_list(changed, 100):
+                self.chroma_manager.update_documents(
+                    ids=[ids[i] for i in batch],
+                    documents=[documents[i] for i in batch],
+                    embeddings=[embedded[i] for i in batch],
+                    metadatas=[metadatas[i] for i in batch]
+                )
+        
+        for batch in chunk_list(hash_only, 100):
+            self.chroma_manager.update_documents(
+                ids=[ids[i] for i in batch],
+                metadatas=[metadatas[i] for i in batch]
+            )
+        
+        if removed:
+            self.chroma_manager.delete_documents(removed)
+        
+        result = {
+            "added": len(added),
+            "updated": len(changed),
+            "deleted": len(removed),
+            "unchanged": len(ids) - len(to_embed)
+        }
+        
+        if to_embed or removed:
+            await asyncio.to_thread(
+                self.catalog_cache.put_many,
+                [self._metadata_to_assessment(metadatas[i]) for i in to_embed]
+            )
+            for doc_id in removed:
+                await asyncio.to_thread(self.catalog_cache.invalidate, existing[doc_id].get("url"))
+            await asyncio.to_thread(self._record_update, source, result)
+        
+        logger.info(f"Catalog sync complete: {result}")
+        return result
+    
+    def _record_update(self, source: str, result: Dict[str, int]):
+        """Record a vector store update in vector_store_metadata"""
+        with db_manager.write_session() as db:
+            db.add(VectorStoreMetadata(
+                collection_name=self.chroma_manager.collection_name,
+                document_count=self.chroma_manager.count_documents(),
+                update_source=source,
+                update_notes=json.dumps(result)
+            ))
+    
+    @staticmethod
+    def _results_to_assessments(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Convert a Chroma query result into assessment dictionaries
+        
+        Args:
+            results: Result of a single-embedding Chroma query
+            
+        Returns:
+            Assessments with similarity scores, in result order
+        """
+        assessments = []
+        
+        if results and results['ids'] and len(results['ids']) > 0:
+            for i in range(len(results['ids'][0])):
+                metadata = results['metadatas'][0][i]
+                distance = results['distances'][0][i]
+                similarity_score = 1.0 - (distance / 2.0)
+                
+                similarity_score = max(0.0, min(1.0, similarity_score))
+                
+                test_types = metadata.get('test_type', '').split(',')
+                test_types = [t.strip() for t in test_types if t.strip()]
+                
+                assessment_data = {
+                    "name": metadata.get('name', ''),
+                    "url": metadata.get('url', ''),
+                    "test_type": test_types,
+                    "remote_support": metadata.get('remote_support', 'No'),
+                    "adaptive_support": metadata.get('adaptive_support', 'No'),
+                    "duration": metadata.get('duration', -1),
+                    "job_levels": metadata.get('job_levels', ''),
+                    "languages": metadata.get('languages', ''),
+                    "description": metadata.get('description', ''),
+                    "similarity_score": similarity_score,
+                    "cosine_distance": distance
+                }
+                
+                if assessment_data['duration'] == -1:
+                    assessment_data['duration'] = None
+                
+                assessments.append(assessment_data)
+        
+        return assessments
+    
     async def search_assessments(
         self,
         query: str,
@@ -136,37 +340,7 @@ class VectorStoreService:
                 where=filters
             )
             
-            assessments = []
-            
-            if results and results['ids'] and len(results['ids']) > 0:
-                for i in range(len(results['ids'][0])):
-                    metadata = results['metadatas'][0][i]
-                    distance = results['distances'][0][i]
-                    similarity_score = 1.0 - (distance / 2.0)
-                    
-                    similarity_score = max(0.0, min(1.0, similarity_score))
-                    
-                    test_types = metadata.get('test_type', '').split(',')
-                    test_types = [t.strip() for t in test_types if t.strip()]
-                    
-                    assessment_data = {
-                        "name": metadata.get('name', ''),
-                        "url": metadata.get('url', ''),
-                        "test_type": test_types,
-                        "remote_support": metadata.get('remote_support', 'No'),
-                        "adaptive_support": metadata.get('adaptive_support', 'No'),
-                        "duration": metadata.get('duration', -1),
-                        "job_levels": metadata.get('job_levels', ''),
-                        "languages": metadata.get('languages', ''),
-                        "description": metadata.get('description', ''),
-                        "similarity_score": similarity_score,
-                        "cosine_distance": distance
-                    }
-                    
-                    if assessment_data['duration'] == -1:
-                        assessment_data['duration'] = None
-                    
-                    assessments.append(assessment_data)
+            assessments = self._results_to_assessments(results)
             
             if assessments:
                 scores = [a['similarity_score'] for a in assessments]
@@ -268,6 +442,8 @@ class VectorStoreService:
         """
         Get specific assessment by URL
         
+        Served from the catalog cache; Chroma is only read on a cache miss.
+        
         Args:
             url: Assessment URL
             
@@ -275,32 +451,38 @@ class VectorStoreService:
             Assessment data or None
         """
         try:
-            doc_id = url.replace("https://", "").replace("http://", "").replace("/", "_")
-            results = self.chroma_manager.get_by_ids([doc_id])
-            
-            if results and results['ids']:
-                metadata = results['metadatas'][0]
-                test_types = metadata.get('test_type', '').split(',')
-                test_types = [t.strip() for t in test_types if t.strip()]
-                
-                return {
-                    "name": metadata.get('name', ''),
-                    "url": metadata.get('url', ''),
-                    "test_type": test_types,
-                    "remote_support": metadata.get('remote_support', 'No'),
-                    "adaptive_support": metadata.get('adaptive_support', 'No'),
-                    "duration": metadata.get('duration') if metadata.get('duration') != -1 else None,
-                    "job_levels": metadata.get('job_levels', ''),
-                    "languages": metadata.get('languages', ''),
-                    "description": metadata.get('description', ''),
-                }
-            
-            return None
+            return await self.catalog_cache.get(url, self._fetch_assessment_by_url)
             
         except Exception as e:
             logger.error(f"Failed to get assessment by URL: {e}")
             return None
     
+    async def _fetch_assessment_by_url(self, url: str) -> Optional[Dict[str, Any]]:
+        """Read one assessment from Chroma by URL"""
+        results = self.chroma_manager.get_by_ids([self._doc_id(url)])
+        
+        if results and results['ids']:
+            return self._metadata_to_assessment(results['metadatas'][0])
+        
+        return None
+    
+    def _metadata_to_assessment(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert Chroma metadata to an assessment dictionary"""
+        test_types = metadata.get('test_type', '').split(',')
+        test_types = [t.strip() for t in test_types if t.strip()]
+        
+        return {
+            "name": metadata.get('name', ''),
+            "url": metadata.get('url', ''),
+            "test_type": test_types,
+            "remote_support": metadata.get('remote_support', 'No'),
+            "adaptive_support": metadata.get('adaptive_support', 'No'),
+            "duration": metadata.get('duration') if metadata.get('duration') != -1 else None,
+            "job_levels": metadata.get('job_levels', ''),
+            "languages": metadata.get('languages', ''),
+            "description": metadata.get('description', ''),
+        }
+    
     async def filter_by_test_type(
         self,
         test_types: List[str],
@@ -360,6 +542,7 @@ class VectorStoreService:
         """Clear all documents from the collection"""
         try:
             self.chroma_manager.recreate_collection()
+            await asyncio.to_thread(self.catalog_cache.invalidate)
             logger.info("Collection cleared")
         except Exception as e:
             logger.error(f"Failed to clear collection: {e}")
@@ -1,8 +1,16 @@
 from app.utils.logger import get_logger, app_logger
-from app.utils.validators import validate_url, validate_query_length, extract_urls_from_text
+from app.utils.validators import validate_url, validate_query_length, extract_urls_from_text, canonicalize_url
 from app.utils.formatters import format_assessment_response,extract_json_from_response
 from app.utils.helpers import  clean_text,chunk_list,extract_duration_from_text
-from app.utils.assessment_map import get_assessment_map,get_fallback_skill
+from app.utils.assessment_map import get_assessment_map,get_fallback_skill,match_assessment_terms,match_fallback_skills
+from app.utils.cache import LRUCache, TTLCache
+from app.utils.keyword_matcher import KeywordMatcher
+from app.utils.jd_preprocessing import JDPreprocessor, get_jd_preprocessor
+from app.utils.url_detector import URLDetector, get_url_detector, detect_urls
+from app.utils.metrics import MetricsRegistry, get_metrics_registry
+from app.utils.tracing import Tracer, get_tracer, traced
+from app.utils.deadline import new_deadline, remaining, run_with_deadline
+from app.utils.rate_limiter import SlidingWindowRateLimiter, SQLiteRateLimiter, get_rate_limiter
 
 __all__ = [
     "get_logger",
@@ -10,11 +18,33 @@ __all__ = [
     "validate_url",
     "validate_query_length",
     "extract_urls_from_text",
+    "canonicalize_url",
     "format_assessment_response",
     "clean_text",
     "chunk_list",
     "extract_duration_from_text",
     "extract_json_from_response",
     "get_assessment_map",
-    "get_fallback_skill"
+    "get_fallback_skill",
+    "match_assessment_terms",
+    "match_fallback_skills",
+    "LRUCache",
+    "TTLCache",
+    "KeywordMatcher",
+    "JDPreprocessor",
+    "get_jd_preprocessor",
+    "URLDetector",
+    "get_url_detector",
+    "detect_urls",
+    "MetricsRegistry",
+    "get_metrics_registry",
+    "Tracer",
+    "get_tracer",
+    "traced",
+    "new_deadline",
+    "remaining",
+    "run_with_deadline",
+    "SlidingWindowRateLimiter",
+    "SQLiteRateLimiter",
+    "get_rate_limiter"
 ]
\ No newline at end of file
@@ -1,3 +1,7 @@
+from typing import List
+from app.utils.keyword_matcher import KeywordMatcher
+
+
 def get_assessment_map() -> dict:
     """
     Return comprehensive mapping of keywords to assessment names
@@ -342,3 +346,34 @@ def get_fallback_skill() -> list:
         'computer literacy', 'aptitude', 'cognitive', 'project management'
     ]
 
+
+# Built once at import; get_assessment_map() builds a new dict on every call
+ASSESSMENT_MAP = get_assessment_map()
+assessment_matcher = KeywordMatcher(ASSESSMENT_MAP)
+fallback_skill_matcher = KeywordMatcher(get_fallback_skill())
+
+
+def match_assessment_terms(text: str) -> List[str]:
+    """
+    Get assessment terms for every keyword in text
+    
+    Args:
+        text: Query or job description
+        
+    Returns:
+        Mapped assessment terms in keyword order
+    """
+    return [ASSESSMENT_MAP[keyword] for keyword in assessment_matcher.find(text)]
+
+
+def match_fallback_skills(text: str) -> List[str]:
+    """
+    Get fallback skill keywords occurring in text
+    
+    Args:
+        text: Query or job description
+        
+    Returns:
+        Matched keywords
+    """
+    return fallback_skill_matcher.find(text)
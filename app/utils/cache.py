@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache
+    
+    Args:
+        max_size: Maximum number of entries before the least recently used is evicted
+    """
+    
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it as most recently used"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+    
+    def set(self, key: Hashable, value: Any):
+        """Insert or replace a value, evicting the oldest entry if full"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove and return a value"""
+        with self._lock:
+            return self._data.pop(key, default)
+    
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+    
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Size, hit and eviction counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+
+class TTLCache(LRUCache):
+    """
+    Thread-safe LRU cache whose entries expire
+    
+    Args:
+        max_size: Maximum number of entries before the least recently used is evicted
+        default_ttl: Lifetime in seconds for entries set without an explicit TTL
+    """
+    
+    def __init__(self, max_size: int = 1024, default_ttl: float = 300.0):
+        super().__init__(max_size)
+        self.default_ttl = default_ttl
+        self.expirations = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a live value and mark it as most recently used"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Insert or replace a value
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Lifetime in seconds (default_ttl if None); <= 0 stores nothing
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        super().set(key, (time.monotonic() + ttl, value))
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove and return a value"""
+        entry = super().pop(key)
+        return entry[1] if entry is not None else default
+    
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Size, hit, eviction and expiry counters
+        """
+        stats = super().get_stats()
+        stats["default_ttl"] = self.default_ttl
+        stats["expirations"] = self.expirations
+        return stats
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.metrics import DEADLINE_EXCEEDED
+
+logger = get_logger("deadline")
+
+T = TypeVar("T")
+
+# Share of the time left that a stage may spend; the rest is kept for the
+# stages after it
+STAGE_SHARES = {
+    "supervisor": 0.2,
+    "url_extraction": 0.2,
+    "jd_fetch": 0.5,
+    "processor": 0.5,
+    "retrieval": 0.5,
+    "rerank": 0.8
+}
+
+# Below this fraction of the budget the JD is cut harder before the processor
+LOW_BUDGET_FRACTION = 0.5
+
+
+def new_deadline(budget: float = None) -> Dict[str, Any]:
+    """
+    Deadline entry for a new request's graph state
+    
+    Args:
+        budget: Seconds the request may take (default REQUEST_DEADLINE)
+    
+    Returns:
+        Entry with the monotonic expiry time and the stages that ran out
+    """
+    budget = settings.REQUEST_DEADLINE if budget is None else budget
+    return {'budget': budget, 'expires_at': time.monotonic() + budget, 'exceeded': [], 'timed_out': False}
+
+
+def remaining(state: Dict[str, Any]) -> Optional[float]:
+    """Seconds left for the request, or None when it has no deadline"""
+    deadline = state.get('deadline')
+    if not deadline:
+        return None
+    return max(deadline['expires_at'] - time.monotonic(), 0.0)
+
+
+def fraction_left(state: Dict[str, Any]) -> float:
+    """Share of the request budget still left (1.0 without a deadline)"""
+    left = remaining(state)
+    if left is None or not state['deadline']['budget']:
+        return 1.0
+    return left / state['deadline']['budget']
+
+
+def stage_budget(state: Dict[str, Any], stage: str) -> Optional[float]:
+    """
+    Seconds a stage may spend
+    
+    Args:
+        state: Graph state carrying the request's 'deadline' entry
+        stage: Stage name from STAGE_SHARES
+    
+    Returns:
+        The stage's share of the time left, or None when there is no deadline
+    """
+    left = remaining(state)
+    return None if left is None else left * STAGE_SHARES[stage]
+
+
+async def run_with_deadline(state: Dict[str, Any], stage: str, awaitable: Awaitable[T]) -> T:
+    """
+    Await within a stage's budget
+    
+    Args:
+        state: Graph state carrying the request's 'deadline' entry
+        stage: Stage name from STAGE_SHARES
+        awaitable: Call to bound
+    
+    Returns:
+        The call's result
+    
+    Raises:
+        asyncio.TimeoutError: If the budget ran out; the call is cancelled
+    """
+    return await asyncio.wait_for(awaitable, stage_budget(state, stage))
+
+
+def record_exceeded(state: Dict[str, Any], stage: str) -> Dict[str, Any]:
+    """
+    Record a stage that fell back because its budget ran out
+    
+    Args:
+        state: Current state
+        stage: Stage that ran out
+    
+    Returns:
+        State updates carrying the extended 'deadline' entry
+    """
+    deadline = state.get('deadline') or {}
+    DEADLINE_EXCEEDED.inc(1.0, stage)
+    logger.warning(f"Deadline: {stage} ran out of time, {remaining(state) or 0.0:.2f}s left")
+    return {'deadline': {**deadline, 'exceeded': deadline.get('exceeded', []) + [stage]}}
@@ -0,0 +1,369 @@
+import re
+from typing import Any, Dict, List, Optional, Union
+from lxml import etree, html as lxml_html
+
+TEST_TYPE_MAPPING = {
+    'A': 'Ability & Aptitude',
+    'B': 'Biodata & Situational Judgement',
+    'C': 'Competencies',
+    'D': 'Development & 360',
+    'E': 'Assessment Exercises',
+    'K': 'Knowledge & Skills',
+    'P': 'Personality & Behavior',
+    'S': 'Simulations'
+}
+
+ITEMS_PER_PAGE = 12
+MIN_JD_LENGTH = 200
+
+_REGEX_NS = {"re": "http://exslt.org/regular-expressions"}
+
+
+def _has_class(name: str) -> str:
+    """XPath predicate matching one class token"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Catalog listing pages
+_SECTION_HEADER_RE = re.compile(r'<h[234][^>]*>[^<]*Individual Test Solutions', re.I)
+_TABLE_WRAPPER_RE = re.compile(r'<div[^>]*class="[^"]*\bcustom__table-wrapper\b', re.I)
+_TABLE_END_RE = re.compile(r'</table\s*>', re.I)
+_PAGINATION_RE = re.compile(r'<ul[^>]*class="[^"]*\bpagination\b[^"]*"[^>]*>.*?</ul\s*>', re.I | re.S)
+_START_PARAM_RE = re.compile(r'start=(\d+)')
+
+_ALL_TABLE_WRAPPERS = etree.XPath(f"//div[{_has_class('custom__table-wrapper')}]")
+_TABLE = etree.XPath(".//table")
+_HEADER_ROW = etree.XPath(".//tr")
+_ENTITY_ROWS = etree.XPath(".//tr[@data-entity-id]")
+_TITLE_LINK = etree.XPath(f".//td[{_has_class('custom__table-heading__title')}]//a")
+_GENERAL_CELLS = etree.XPath(f".//td[{_has_class('custom__table-heading__general')}]")
+_CIRCLE = etree.XPath(f".//span[{_has_class('catalogue__circle')}]")
+_KEYS_CELL = etree.XPath(f".//td[{_has_class('product-catalogue__keys')}]")
+_KEY_SPANS = etree.XPath(f".//span[{_has_class('product-catalogue__key')}]")
+_PAGINATION_LINKS = etree.XPath(f"descendant-or-self::*[self::a or self::span][{_has_class('pagination__link')}]")
+
+# Assessment detail pages
+_H4_BY_LABEL = etree.XPath("//h4[normalize-space(.) = $label]")
+_FOLLOWING_P = etree.XPath("following::p[1]")
+_CALENDAR_ROW = etree.XPath(f"ancestor::div[{_has_class('product-catalogue-training-calendar__row')}][1]")
+_DESCENDANT_P = etree.XPath(".//p")
+_SMALL_TEXT = etree.XPath(f"//p[{_has_class('product-catalogue__small-text')}]")
+_DURATION_PATTERNS = [
+    re.compile(r'=\s*(\d+)'),  # "= 10"
+    re.compile(r'(\d+)\s*(?:minutes?|mins?)', re.I),  # "10 minutes"
+    re.compile(r'(\d+)\s*min', re.I),  # "10min"
+    re.compile(r'(\d+)')  # Any number
+]
+
+# Job description pages, in order of preference
+_JD_CONTAINERS = [
+    etree.XPath("//div[re:test(@class, 'job.*description', 'i')]", namespaces=_REGEX_NS),
+    etree.XPath("//div[re:test(@id, 'job.*description', 'i')]", namespaces=_REGEX_NS),
+    etree.XPath("//section[re:test(@class, 'job.*description', 'i')]", namespaces=_REGEX_NS),
+    etree.XPath("//div[re:test(@class, 'description', 'i')]", namespaces=_REGEX_NS),
+    etree.XPath("//article"),
+    etree.XPath("//main"),
+]
+_JD_KEYWORD_TEXT = [
+    etree.XPath(f"//text()[re:test(., '{keyword}', 'i')]", namespaces=_REGEX_NS)
+    for keyword in ('responsibilities', 'requirements', 'qualifications', 'job description')
+]
+_PARAGRAPHS = etree.XPath("//p")
+_BODY = etree.XPath("//body")
+_BODY_CHROME = etree.XPath(".//script | .//style | .//nav | .//header | .//footer")
+_TITLE = etree.XPath("//title")
+_META_DESCRIPTION = etree.XPath("//meta[@name='description']/@content")
+_H1 = etree.XPath("//h1")
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_XML_DECLARATION_RE = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+
+def decode_html(content: Union[bytes, str]) -> str:
+    """Decode a response body (UTF-8, falling back to cp1252)"""
+    if isinstance(content, str):
+        text = content
+    else:
+        try:
+            text = content.decode('utf-8')
+        except UnicodeDecodeError:
+            text = content.decode('cp1252', errors='replace')
+    # lxml refuses unicode input that carries an encoding declaration
+    return _XML_DECLARATION_RE.sub('', text, count=1)
+
+
+def parse_document(content: Union[bytes, str]):
+    """Parse a full HTML document"""
+    return lxml_html.document_fromstring(decode_html(content).strip() or "<html></html>")
+
+
+def warm_up() -> bool:
+    """Exercise the parser once (process pool initializer and readiness check)"""
+    parse_document("<html><body><p>warm</p></body></html>")
+    return True
+
+
+def text_of(element) -> str:
+    """Element text with each string stripped (like get_text(strip=True))"""
+    return "".join(s.strip() for s in element.itertext())
+
+
+def clean_text(text: str) -> str:
+    """Collapse whitespace runs"""
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def _first(results: List) -> Optional[Any]:
+    return results[0] if results else None
+
+
+def _absolute_url(href: str, base_url: str) -> str:
+    if href.startswith('/'):
+        return base_url + href
+    if not href.startswith('http'):
+        return base_url + '/' + href
+    return href
+
+
+def _test_types(element) -> List[str]:
+    return [
+        TEST_TYPE_MAPPING[letter]
+        for letter in (text_of(span) for span in _KEY_SPANS(element))
+        if letter in TEST_TYPE_MAPPING
+    ]
+
+
+def _individual_tests_table(text: str):
+    """
+    Parse only the Individual Test Solutions table wrapper
+    
+    Returns:
+        The wrapper element, or None if the page layout was not recognised
+    """
+    header = _SECTION_HEADER_RE.search(text)
+    if not header:
+        return None
+    wrapper = _TABLE_WRAPPER_RE.search(text, header.end())
+    if not wrapper:
+        return None
+    table_end = _TABLE_END_RE.search(text, wrapper.end())
+    if not table_end:
+        return None
+    return lxml_html.fragment_fromstring(text[wrapper.start():table_end.end()] + "</div>")
+
+
+def extract_test_from_row(row, base_url: str) -> Optional[Dict[str, Any]]:
+    """Extract test data from a single catalog table row"""
+    link = _first(_TITLE_LINK(row))
+    if link is None:
+        return None
+    
+    remote_support = "No"
+    adaptive_support = "No"
+    general_cells = _GENERAL_CELLS(row)
+    if len(general_cells) >= 2:
+        remote_circle = _first(_CIRCLE(general_cells[0]))
+        if remote_circle is not None and '-yes' in remote_circle.get('class', ''):
+            remote_support = "Yes"
+        adaptive_circle = _first(_CIRCLE(general_cells[1]))
+        if adaptive_circle is not None and '-yes' in adaptive_circle.get('class', ''):
+            adaptive_support = "Yes"
+    
+    keys_cell = _first(_KEYS_CELL(row))
+    return {
+        'name': text_of(link),
+        'url': _absolute_url(link.get('href', ''), base_url),
+        'remote_support': remote_support,
+        'adaptive_support': adaptive_support,
+        'test_type': _test_types(keys_cell) if keys_cell is not None else []
+    }
+
+
+def extract_max_page(pagination_html: List[str]) -> int:
+    """Highest page number referenced by the pagination lists"""
+    max_page = 1
+    for fragment in pagination_html:
+        for link in _PAGINATION_LINKS(lxml_html.fragment_fromstring(fragment)):
+            label = text_of(link)
+            if label.isdigit():
+                max_page = max(max_page, int(label))
+            match = _START_PARAM_RE.search(link.get('href', ''))
+            if match:
+                max_page = max(max_page, int(match.group(1)) // ITEMS_PER_PAGE + 1)
+    return max_page
+
+
+def parse_catalog_page(content: Union[bytes, str], base_url: str) -> Dict[str, Any]:
+    """
+    Parse a catalog listing page
+    
+    Only the Individual Test Solutions table and the pagination lists are
+    handed to the HTML parser; the rest of the page is skipped. Pages whose
+    layout is not recognised fall back to a full parse.
+    
+    Args:
+        content: Page body
+        base_url: Site root used to absolutise test links
+    
+    Returns:
+        {"tests": [...], "max_page": n}
+    """
+    text = decode_html(content)
+    
+    wrapper = _individual_tests_table(text)
+    wrappers = [wrapper] if wrapper is not None else _ALL_TABLE_WRAPPERS(parse_document(text))
+    
+    tests = []
+    for wrapper in wrappers:
+        table = _first(_TABLE(wrapper))
+        if table is None:
+            continue
+        header_row = _first(_HEADER_ROW(table))
+        if header_row is not None:
+            header_text = header_row.text_content()
+            if 'Pre-packaged' in header_text or 'Job Solutions' in header_text:
+                continue
+        for row in _ENTITY_ROWS(table):
+            test = extract_test_from_row(row, base_url)
+            if test:
+                tests.append(test)
+    
+    return {
+        "tests": tests,
+        "max_page": extract_max_page(_PAGINATION_RE.findall(text))
+    }
+
+
+def _labelled_paragraph(doc, label: str):
+    heading = _first(_H4_BY_LABEL(doc, label=label))
+    if heading is None:
+        return None
+    return _first(_FOLLOWING_P(heading))
+
+
+def parse_test_details(content: Union[bytes, str]) -> Dict[str, Any]:
+    """
+    Parse an assessment detail page
+    
+    Args:
+        content: Page body
+    
+    Returns:
+        Description, job levels, languages, duration and test types
+    """
+    doc = parse_document(content)
+    details = {
+        'description': '',
+        'job_levels': '',
+        'languages': '',
+        'duration': None,
+        'test_type': []
+    }
+    
+    for key, label in (('description', 'Description'), ('job_levels', 'Job levels'), ('languages', 'Languages')):
+        paragraph = _labelled_paragraph(doc, label)
+        if paragraph is not None:
+            details[key] = text_of(paragraph)
+    
+    length_heading = _first(_H4_BY_LABEL(doc, label='Assessment length'))
+    if length_heading is not None:
+        row = _first(_CALENDAR_ROW(length_heading))
+        length_p = _first(_DESCENDANT_P(row)) if row is not None else _first(_FOLLOWING_P(length_heading))
+        if length_p is not None:
+            duration_text = text_of(length_p)
+            for pattern in _DURATION_PATTERNS:
+                match = pattern.search(duration_text)
+                if match:
+                    details['duration'] = int(match.group(1))
+                    break
+    
+    small_text = _first(_SMALL_TEXT(doc))
+    if small_text is not None and 'Test Type:' in small_text.text_content():
+        test_types = _test_types(small_text)
+        if test_types:
+            details['test_type'] = test_types
+    
+    return details
+
+
+def extract_page_metadata(doc, url: str) -> Dict[str, Any]:
+    """Title, meta description and main heading of a page"""
+    metadata = {"url": url}
+    
+    title = _first(_TITLE(doc))
+    if title is not None:
+        metadata['title'] = title.text_content().strip()
+    
+    description = _first(_META_DESCRIPTION(doc))
+    if description and description.strip():
+        metadata['meta_description'] = description.strip()
+    
+    h1 = _first(_H1(doc))
+    if h1 is not None:
+        metadata['page_heading'] = h1.text_content().strip()
+    
+    return metadata
+
+
+def extract_job_description(doc) -> Optional[str]:
+    """
+    Extract job description text from a parsed page
+    
+    Tries, in order: job-description containers, the element around the
+    first JD keyword, all paragraphs, and finally the body without chrome.
+    
+    Args:
+        doc: Parsed document (modified: body chrome is dropped)
+    
+    Returns:
+        Extracted JD text or None
+    """
+    for containers in _JD_CONTAINERS:
+        container = _first(containers(doc))
+        if container is not None:
+            text = clean_text(container.text_content())
+            if len(text) > MIN_JD_LENGTH:
+                return text
+    
+    for keyword_text in _JD_KEYWORD_TEXT:
+        match = _first(keyword_text(doc))
+        if match is not None:
+            parent = match.getparent()
+            if match.is_tail and parent is not None:
+                parent = parent.getparent()
+            if parent is not None:
+                text = clean_text(parent.text_content())
+                if len(text) > MIN_JD_LENGTH:
+                    return text
+    
+    paragraphs = _PARAGRAPHS(doc)
+    if paragraphs:
+        text = clean_text('\n'.join(p.text_content() for p in paragraphs))
+        if len(text) > MIN_JD_LENGTH:
+            return text
+    
+    body = _first(_BODY(doc))
+    if body is not None:
+        for element in _BODY_CHROME(body):
+            element.drop_tree()
+        text = clean_text(body.text_content())
+        if len(text) > MIN_JD_LENGTH:
+            return text
+    
+    return None
+
+
+def parse_job_page(content: Union[bytes, str], url: str) -> Dict[str, Any]:
+    """
+    Parse a job posting page
+    
+    Args:
+        content: Page body
+        url: Page URL
+    
+    Returns:
+        {"jd_text": str or None, "metadata": {...}}
+    """
+    doc = parse_document(content)
+    metadata = extract_page_metadata(doc, url)
+    return {"jd_text": extract_job_description(doc), "metadata": metadata}
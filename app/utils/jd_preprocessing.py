@@ -0,0 +1,230 @@
+import re
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+from app.config import settings
+
+# Section headings, by kind. Requirement and responsibility sections are kept
+# first when the token budget runs out; boilerplate sections are dropped.
+SECTION_HEADINGS = {
+    'requirements': [
+        r'requirements?', r'qualifications?', r'(?:required|key|technical|desired) skills', r'skills',
+        r'what you(?:\'ll)? (?:need|bring)', r'who you are', r'must[- ]haves?', r'nice[- ]to[- ]haves?',
+        r'(?:minimum|preferred|basic) qualifications', r'experience', r'about you', r'your profile',
+        r'(?:key )?competenc(?:y|ies)', r'what we(?:\'re| are) looking for',
+    ],
+    'responsibilities': [
+        r'(?:key |main |primary )?responsibilit(?:y|ies)', r'what you(?:\'ll)? do', r'duties',
+        r'(?:about )?the role', r'role (?:overview|summary)', r'job (?:description|summary|overview)',
+        r'your role', r'position (?:summary|overview)', r'the opportunity', r'day[- ]to[- ]day',
+    ],
+    'boilerplate': [
+        r'about (?:us|the company|the team|our company)', r'who we are', r'our (?:story|mission|values|culture)',
+        r'benefits', r'perks(?: and benefits)?', r'what we offer', r'why (?:join us|work (?:with|for) us)',
+        r'compensation(?: and benefits)?', r'salary(?: range)?', r'equal (?:employment )?opportunity(?: employer)?',
+        r'eeo(?: statement)?', r'diversity(?:,? equity)?(?: and inclusion| statement)?', r'privacy(?: notice| policy)?',
+        r'how to apply', r'application process', r'disclaimer', r'legal notice', r'additional information',
+    ],
+}
+
+# Sentences dropped wherever they appear
+BOILERPLATE_SENTENCE_PATTERNS = [
+    r'equal (?:employment )?opportunit(?:y|ies)', r'without regard to', r'regardless of (?:race|gender|age|religion)',
+    r'\brace,? (?:colou?r|religion)', r'sexual orientation', r'gender identity', r'protected (?:veteran|characteristic|class)',
+    r'reasonable accommodations?', r'e-verify', r'background (?:check|screening)', r'drug[- ]free',
+    r'privacy (?:policy|notice)', r'\bcookies?\b', r'apply (?:now|today|online)', r'click (?:here|apply)',
+    r'follow us', r'all rights reserved', r'recruitment agenc(?:y|ies)', r'unsolicited (?:resumes|cvs)',
+    r'competitive (?:salary|pay|compensation|benefits)', r'health (?:insurance|care|benefits)', r'401\(?k\)?',
+    r'paid time off', r'parental leave', r'wellness (?:program|allowance|stipend)', r'we are (?:proud|committed) to',
+    r'founded in (?:19|20)\d\d', r'headquartered in', r'share this job', r'job alerts?',
+]
+
+_HEADING_KIND = {
+    kind: re.compile(r'\b(?:' + '|'.join(patterns) + r')\b', re.I)
+    for kind, patterns in SECTION_HEADINGS.items()
+}
+_ALL_HEADINGS = '|'.join(pattern for patterns in SECTION_HEADINGS.values() for pattern in patterns)
+
+# A heading on its own line (a known heading, or any short line ending in a
+# colon), or inline in flattened page text when followed by a colon
+_HEADING_LINE = re.compile(
+    r'^[ \t]*[#*\-•]*[ \t]*(' + _ALL_HEADINGS + r'|[A-Za-z][^\n:.!?]{1,60}(?=:))[ \t]*:?[ \t]*$',
+    re.I | re.M
+)
+_HEADING_INLINE = re.compile(r'(?:(?<=[.!?])|^)\s*(' + _ALL_HEADINGS + r')\s*:', re.I | re.M)
+_BOILERPLATE_SENTENCE = re.compile('|'.join(BOILERPLATE_SENTENCE_PATTERNS), re.I)
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?;])\s+(?=[A-Z0-9"(])|\s*[\n•▪●]+\s*|\s+[-*]\s+(?=[A-Z])')
+_NORMALIZE = re.compile(r'[\W_]+')
+
+SECTION_PRIORITY = {'requirements': 0, 'responsibilities': 1, 'intro': 2, 'other': 3}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text (about four characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def _classify_heading(heading: str) -> str:
+    for kind, pattern in _HEADING_KIND.items():
+        if pattern.search(heading):
+            return kind
+    return 'other'
+
+
+def segment_sections(text: str) -> List[Tuple[str, str, str]]:
+    """
+    Split a job description into sections
+    
+    Headings are recognised on their own line, or inline (followed by a
+    colon) in text flattened from a web page, and classified by the
+    heading phrases they contain.
+    
+    Args:
+        text: Job description
+    
+    Returns:
+        List of (kind, heading, body); the text before the first heading is 'intro'
+    """
+    pattern = _HEADING_LINE if _HEADING_LINE.search(text) else _HEADING_INLINE
+    sections = []
+    kind, heading, start = 'intro', '', 0
+    for match in pattern.finditer(text):
+        sections.append((kind, heading, text[start:match.start()]))
+        heading = match.group(1)
+        kind = _classify_heading(heading)
+        start = match.end()
+    sections.append((kind, heading, text[start:]))
+    return [section for section in sections if section[1] or section[2].strip()]
+
+
+class JDPreprocessor:
+    """
+    Shrinks long job descriptions before they reach the LLM
+    
+    Splits the text into sections, drops boilerplate sections (benefits,
+    company history, EEO statements) and boilerplate sentences elsewhere,
+    removes repeated sentences and fits what is left into a token budget,
+    keeping requirement and responsibility sections first.
+    """
+    
+    def __init__(self, max_tokens: int = None, min_chars: int = None):
+        self.max_tokens = settings.JD_PREPROCESS_MAX_TOKENS if max_tokens is None else max_tokens
+        self.min_chars = settings.JD_PREPROCESS_MIN_CHARS if min_chars is None else min_chars
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.skipped = 0
+        self.chars_in = 0
+        self.chars_out = 0
+        self.total_time = 0.0
+    
+    def process(self, text: str, max_tokens: int = None) -> Dict[str, Any]:
+        """
+        Preprocess a job description
+        
+        Args:
+            text: Job description
+            max_tokens: Token budget for this call (default max_tokens)
+        
+        Returns:
+            Dictionary with the reduced 'text' and what was removed
+        """
+        if len(text) < self.min_chars:
+            with self._lock:
+                self.skipped += 1
+            return {'text': text, 'applied': False}
+        
+        start_time = time.perf_counter()
+        seen = set()
+        sections = []
+        dropped_sections = []
+        boilerplate_sentences = duplicate_sentences = 0
+        
+        for kind, heading, body in segment_sections(text):
+            if kind == 'boilerplate':
+                dropped_sections.append(heading)
+                continue
+            sentences = []
+            for sentence in _SENTENCE_SPLIT.split(body):
+                sentence = sentence.strip(' \t-*')
+                if len(sentence) < 3:
+                    continue
+                if _BOILERPLATE_SENTENCE.search(sentence):
+                    boilerplate_sentences += 1
+                    continue
+                key = _NORMALIZE.sub(' ', sentence.lower()).strip()
+                if key in seen:
+                    duplicate_sentences += 1
+                    continue
+                seen.add(key)
+                sentences.append(sentence)
+            if sentences:
+                sections.append((kind, heading, sentences))
+        
+        kept, truncated = self._fit_budget(sections, self.max_tokens if max_tokens is None else max_tokens)
+        result_text = '\n'.join(
+            (f"{heading}: " if heading else "") + ' '.join(sentences)
+            for (_, heading, _), sentences in zip(sections, kept) if sentences
+        )
+        
+        elapsed = time.perf_counter() - start_time
+        with self._lock:
+            self.processed += 1
+            self.chars_in += len(text)
+            self.chars_out += len(result_text)
+            self.total_time += elapsed
+        
+        return {
+            'text': result_text,
+            'applied': True,
+            'original_chars': len(text),
+            'chars': len(result_text),
+            'estimated_tokens': estimate_tokens(result_text),
+            'dropped_sections': dropped_sections,
+            'boilerplate_sentences': boilerplate_sentences,
+            'duplicate_sentences': duplicate_sentences,
+            'truncated': truncated
+        }
+    
+    def _fit_budget(self, sections: List[Tuple[str, str, List[str]]], budget: int) -> Tuple[List[List[str]], bool]:
+        """Keep whole sentences by section priority until the token budget is spent"""
+        kept: List[List[str]] = [[] for _ in sections]
+        truncated = False
+        order = sorted(range(len(sections)), key=lambda i: SECTION_PRIORITY.get(sections[i][0], 3))
+        for i in order:
+            kind, heading, sentences = sections[i]
+            budget -= estimate_tokens(heading)
+            for sentence in sentences:
+                cost = estimate_tokens(sentence) + 1
+                if cost > budget:
+                    truncated = True
+                    break
+                kept[i].append(sentence)
+                budget -= cost
+        return kept, truncated
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get preprocessing metrics
+        
+        Returns:
+            Counts, character reduction and average time
+        """
+        with self._lock:
+            return {
+                'max_tokens': self.max_tokens,
+                'min_chars': self.min_chars,
+                'processed': self.processed,
+                'skipped': self.skipped,
+                'chars_in': self.chars_in,
+                'chars_out': self.chars_out,
+                'reduction': 1 - self.chars_out / self.chars_in if self.chars_in else 0.0,
+                'avg_ms': self.total_time * 1000 / self.processed if self.processed else 0.0
+            }
+
+
+jd_preprocessor = JDPreprocessor()
+
+
+def get_jd_preprocessor() -> JDPreprocessor:
+    """Get JD preprocessor instance"""
+    return jd_preprocessor
@@ -0,0 +1,107 @@
+import re
+from typing import Dict, Iterable, List, Set
+
+_WORD_CHAR = re.compile(r'\w')
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Build a regex alternation shaped like a prefix trie
+    
+    Shared prefixes are matched once, so the regex engine walks the trie
+    instead of retrying every keyword at each position. Longer branches are
+    tried first, and a keyword that is also a prefix of another becomes an
+    optional tail, which keeps matches longest-first.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def build(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return "(?:" + body + ")?"
+        return body
+    
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Whole-word keyword matching in one pass over the text
+    
+    Keywords are compiled once into a trie-shaped regex that is scanned at
+    every position, so all hits, including overlapping ones, are found in a
+    single pass whose cost does not grow with the number of keywords.
+    Matching is case-insensitive and never matches inside a word ('go' does
+    not hit 'good', 'java' does not hit 'javascript').
+    """
+    
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(k.lower() for k in keywords if k))
+        self._order = {keyword: i for i, keyword in enumerate(self.keywords)}
+        self._pattern = self._compile(self.keywords)
+        
+        # The scan reports the longest keyword at each position, so shorter
+        # keywords inside a hit ('data' in 'data analyst') are credited from here
+        self._contained: Dict[str, Set[str]] = {
+            keyword: {
+                other for other in self.keywords
+                if other != keyword and other in keyword and self._compile([other]).search(keyword)
+            }
+            for keyword in self.keywords
+        }
+    
+    def __len__(self) -> int:
+        return len(self.keywords)
+    
+    @staticmethod
+    def _compile(keywords: List[str]) -> re.Pattern:
+        """
+        Compile keywords into one overlapping-match pattern
+        
+        A keyword must start at a word start unless it begins with
+        punctuation ('.net'), and end at a word end unless it ends with
+        punctuation ('c++'). Each match is a zero-width lookahead, so the scan
+        tries every position and overlapping keywords are all reported.
+        """
+        word_start = [k for k in keywords if _WORD_CHAR.match(k[0])]
+        other_start = [k for k in keywords if not _WORD_CHAR.match(k[0])]
+        end_chars = sorted({k[-1] for k in keywords if not _WORD_CHAR.match(k[-1])})
+        end = r'(?:(?!\w)|(?<=[' + re.escape("".join(end_chars)) + ']))' if end_chars else r'(?!\w)'
+        
+        branches = []
+        if word_start:
+            branches.append(r'(?<!\w)(?=(' + _trie_pattern(word_start) + ')' + end + ')')
+        if other_start:
+            branches.append(r'(?=(' + _trie_pattern(other_start) + ')' + end + ')')
+        return re.compile("|".join(branches) or r'(?!)')
+    
+    def _scan(self, text: str) -> Set[str]:
+        return {match.group(match.lastindex) for match in self._pattern.finditer(text)}
+    
+    def find(self, text: str) -> List[str]:
+        """
+        Find keywords occurring in text
+        
+        Args:
+            text: Text to search
+        
+        Returns:
+            Matched keywords in the order they were given
+        """
+        if not text or not self.keywords:
+            return []
+        
+        hits = self._scan(text.lower())
+        for keyword in list(hits):
+            hits |= self._contained[keyword]
+        
+        return sorted(hits, key=self._order.__getitem__)
@@ -0,0 +1,232 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+
+def log_buckets(start: float = 0.0005, end: float = 120.0, per_doubling: int = 2) -> Tuple[float, ...]:
+    """
+    Log-spaced histogram bucket bounds
+    
+    With two buckets per doubling, any recorded latency is known to within
+    about 20%, from sub-millisecond cache lookups to multi-second LLM calls.
+    
+    Args:
+        start: Smallest bound in seconds
+        end: Largest bound in seconds
+        per_doubling: Buckets per factor of two
+    
+    Returns:
+        Ascending bucket upper bounds
+    """
+    count = math.ceil(math.log2(end / start) * per_doubling)
+    return tuple(float(f"{start * 2 ** (i / per_doubling):.6g}") for i in range(count + 1))
+
+
+LATENCY_BUCKETS = log_buckets()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels"""
+    
+    type = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0, *labels: str):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in items]
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram with labels
+    
+    An observation is one bisect and two additions under a lock; buckets
+    are only made cumulative when the exposition is rendered.
+    """
+    
+    type = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+    
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the duration of the block"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time, *labels)
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, list(series[0]), series[1]) for labels, series in self._series.items())
+        lines = []
+        bounds = self.buckets + (math.inf,)
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+# (name, type, help, [(labels, value)]) from a collector
+CollectedMetric = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+class MetricsRegistry:
+    """
+    Metrics exposed on /metrics in the Prometheus text format
+    
+    Counters and histograms are updated as events happen. Collectors are
+    called at scrape time to read counters that services already keep
+    (cache hits, queue depths), so those cost nothing per event.
+    """
+    
+    def __init__(self, namespace: str = "shl"):
+        self.namespace = namespace
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Callable[[], List[CollectedMetric]]] = []
+        self._lock = threading.Lock()
+    
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(f"{self.namespace}_{name}", documentation, labelnames))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(f"{self.namespace}_{name}", documentation, labelnames, buckets))
+    
+    def register_collector(self, collector: Callable[[], List[CollectedMetric]]):
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """
+        Render all metrics
+        
+        Returns:
+            Prometheus text exposition (version 0.0.4)
+        """
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        for collector in collectors:
+            for name, metric_type, documentation, samples in collector():
+                name = f"{self.namespace}_{name}"
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get metrics registry instance"""
+    return metrics_registry
+
+
+AGENT_DURATION = metrics_registry.histogram(
+    "agent_duration_seconds", "Agent execution time", ["agent", "outcome"]
+)
+LLM_DURATION = metrics_registry.histogram(
+    "llm_request_duration_seconds", "LLM call time by call type (text or structured output schema)", ["call", "outcome"]
+)
+LLM_TOKENS = metrics_registry.counter(
+    "llm_tokens_total", "LLM tokens reported by the provider", ["model", "kind"]
+)
+EMBEDDING_DURATION = metrics_registry.histogram(
+    "embedding_request_duration_seconds", "Embedding call time", ["call", "outcome"]
+)
+EMBEDDING_TEXTS = metrics_registry.counter(
+    "embedding_texts_total", "Texts sent for embedding", ["call"]
+)
+CHROMA_DURATION = metrics_registry.histogram(
+    "chroma_operation_duration_seconds", "Chroma collection operation time", ["operation"]
+)
+DB_WRITE_DURATION = metrics_registry.histogram(
+    "db_write_duration_seconds", "SQLite write transaction time", ["operation"]
+)
+HTTP_DURATION = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP request time by route template", ["method", "route", "status"]
+)
+DEADLINE_EXCEEDED = metrics_registry.counter(
+    "deadline_exceeded_total", "Stages that fell back because the request deadline ran out", ["stage"]
+)
@@ -0,0 +1,238 @@
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("profiler")
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{8}T[0-9]{12}-[0-9a-f]{8}$")
+
+# Leaf frames of a thread that is waiting rather than running Python code
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("threading.py", "wait"),
+    ("queue.py", "get")
+}
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class ProfileSession:
+    """
+    Samples the event loop thread and default-executor threads until stopped
+    
+    Every interval the sampler thread reads the stacks of the target threads
+    with sys._current_frames() and counts them in collapsed form. Samples
+    where a thread is only waiting (selector, executor queue) are counted as
+    idle and left out of the stacks.
+    """
+    
+    def __init__(self, loop_thread_id: int, interval: float, max_depth: int = 128):
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.started_at = time.time()
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.time() - self.started_at
+    
+    def _targets(self) -> Dict[int, str]:
+        targets = {self.loop_thread_id: "event_loop"}
+        for thread in threading.enumerate():
+            if thread.name.startswith("asyncio_") and thread.ident is not None:
+                targets[thread.ident] = "executor"
+        return targets
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id, role in self._targets().items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                self.samples += 1
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                    self.idle_samples += 1
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(role)
+                self.stacks[";".join(reversed(stack))] += 1
+    
+    def collapsed(self) -> str:
+        """Stacks in Brendan Gregg's collapsed format (flamegraph.pl, speedscope)"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """
+    Opt-in sampling profiler for single requests
+    
+    A request is profiled when it carries X-Profile with the admin key, or
+    every PROFILE_SAMPLE_RATE-th request. One request is profiled at a time;
+    the event loop is shared, so concurrent requests show up in its samples
+    and the number in flight is saved with the profile.
+    """
+    
+    def __init__(
+        self,
+        profile_dir: str,
+        sample_rate: int = 0,
+        interval_ms: float = 5.0,
+        max_profiles: int = 100
+    ):
+        self.profile_dir = Path(profile_dir)
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.max_profiles = max_profiles
+        self._counter = itertools.count()
+        self._busy = threading.Lock()
+        self.in_flight = 0
+        self.profiled = 0
+        self.skipped_busy = 0
+    
+    def should_sample(self) -> bool:
+        """1-in-N sampling decision"""
+        return self.sample_rate > 0 and next(self._counter) % self.sample_rate == 0
+    
+    def start(self) -> Optional[ProfileSession]:
+        """
+        Start profiling the calling event loop thread
+        
+        Returns:
+            Running session, or None if another request is being profiled
+        """
+        if not self._busy.acquire(blocking=False):
+            self.skipped_busy += 1
+            return None
+        session = ProfileSession(threading.get_ident(), self.interval)
+        session.start()
+        return session
+    
+    def stop(self, session: ProfileSession, metadata: Dict[str, Any]) -> Optional[str]:
+        """
+        Stop a session and save its profile
+        
+        Args:
+            session: Session from start()
+            metadata: Request details stored with the profile
+        
+        Returns:
+            Profile id, or None if saving failed
+        """
+        try:
+            session.stop()
+        finally:
+            self._busy.release()
+        
+        profile_id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+        info = {
+            'id': profile_id,
+            'created_at': datetime.fromtimestamp(session.started_at, timezone.utc).isoformat(),
+            'duration_ms': round(session.duration * 1000, 1),
+            'interval_ms': self.interval * 1000,
+            'samples': session.samples,
+            'idle_samples': session.idle_samples,
+            'stacks': len(session.stacks),
+            **metadata
+        }
+        try:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            (self.profile_dir / f"{profile_id}.collapsed").write_text(session.collapsed(), encoding="utf-8")
+            (self.profile_dir / f"{profile_id}.json").write_text(json.dumps(info), encoding="utf-8")
+            self.profiled += 1
+            self._prune()
+        except OSError as e:
+            logger.warning(f"Failed to save profile {profile_id}: {e}")
+            return None
+        
+        logger.info(f"Saved profile {profile_id} ({session.samples} samples, {info['duration_ms']}ms)")
+        return profile_id
+    
+    def _prune(self):
+        profiles = sorted(self.profile_dir.glob("*.json"))
+        for path in profiles[:max(len(profiles) - self.max_profiles, 0)]:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".collapsed").unlink(missing_ok=True)
+    
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """
+        Saved profiles, newest first
+        
+        Returns:
+            Metadata of each saved profile
+        """
+        profiles = []
+        for path in sorted(self.profile_dir.glob("*.json"), reverse=True):
+            try:
+                profiles.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        return profiles
+    
+    def get_profile(self, profile_id: str) -> Optional[str]:
+        """
+        Collapsed stacks of one profile
+        
+        Args:
+            profile_id: Id from list_profiles or the X-Profile-Id header
+        
+        Returns:
+            Collapsed stack text, or None if there is no such profile
+        """
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = self.profile_dir / f"{profile_id}.collapsed"
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            'enabled': settings.PROFILING_ENABLED,
+            'sample_rate': self.sample_rate,
+            'interval_ms': self.interval * 1000,
+            'profiled': self.profiled,
+            'skipped_busy': self.skipped_busy
+        }
+
+
+request_profiler = RequestProfiler(
+    profile_dir=settings.PROFILE_DIR,
+    sample_rate=settings.PROFILE_SAMPLE_RATE,
+    interval_ms=settings.PROFILE_INTERVAL_MS,
+    max_profiles=settings.PROFILE_MAX_FILES
+)
+
+
+def get_request_profiler() -> RequestProfiler:
+    """Get request profiler instance"""
+    return request_profiler
@@ -0,0 +1,169 @@
+import re
+from typing import Any, Dict, List, Optional
+from app.utils.assessment_map import assessment_matcher
+from app.utils.helpers import extract_duration_from_text
+from app.utils.keyword_matcher import KeywordMatcher
+
+JOB_LEVEL_TERMS = {
+    'Entry': ['entry-level', 'entry level', 'graduate', 'graduates', 'new graduate', 'new graduates',
+              'fresher', 'freshers', 'junior', 'intern', 'interns', 'trainee', 'trainees'],
+    'Mid': ['mid-level', 'mid level', 'intermediate', 'mid-senior'],
+    'Senior': ['senior', 'lead', 'principal'],
+    'Manager': ['manager', 'managers', 'supervisor', 'supervisors', 'team lead', 'head of'],
+    'Executive': ['executive', 'executives', 'director', 'directors', 'vp', 'vice president',
+                  'coo', 'ceo', 'cfo', 'cto', 'cxo', 'c-level', 'chief'],
+}
+
+TEST_TYPE_CUES = {
+    'A': ['aptitude', 'cognitive', 'reasoning', 'numerical', 'verbal ability', 'logical', 'learning potential'],
+    'B': ['situational judgement', 'situational judgment', 'judgement', 'judgment', 'decision making'],
+    'C': ['competency', 'competencies', 'leadership', 'people management', 'stakeholder'],
+    'P': ['personality', 'behavior', 'behaviour', 'behavioral', 'behavioural', 'culture', 'cultural',
+          'cultural fit', 'culturally', 'communication', 'collaborate', 'collaboration', 'teamwork',
+          'interpersonal', 'attitude', 'motivation', 'adaptability'],
+    'S': ['simulation', 'simulations', 'typing'],
+}
+
+# Test types implied by a job level
+LEVEL_TEST_TYPES = {'Entry': ['A'], 'Manager': ['C', 'P'], 'Executive': ['C', 'P']}
+
+# Words that carry no requirement of their own in a hiring query
+FILLER_WORDS = frozenset("""
+a an the i we am are is be been being to for of in on at by with and or but who which that this these
+those can could would will should must may also as so some any all both each my our me us you your
+their they them it its someone person people want wants need needs needed looking look hire hiring
+hired recruit recruiting find suggest recommend give show options option please assessment assessments
+assesment assesments test tests testing exam role roles position positions job jobs candidate candidates
+developer developers engineer engineers professional professionals specialist specialists team teams
+company organization business required require requires requirement requirements completed complete
+take takes taking long within under less than max maximum most about around up to budget time duration
+minute minutes mins min hour hours hr hrs year years yrs experience experienced skill skills skilled
+expert expertise proficient proficiency good strong knowledge effectively well new plus like such have
+has having able ability work working s
+""".split())
+
+# Assessment keywords that are too often plain English to count as a skill on their own
+AMBIGUOUS_SKILLS = frozenset({
+    'it', 'go', 'word', 'office', 'service', 'customer', 'client', 'content', 'online', 'digital',
+    'global', 'design', 'demo', 'proposal', 'organization', 'brand', 'network', 'security', 'express',
+    'spring', 'swift', 'rust', 'oracle', 'research', 'creative', 'admin', 'assistant', 'management'
+})
+
+_level_matcher = KeywordMatcher([term for terms in JOB_LEVEL_TERMS.values() for term in terms])
+_cue_matcher = KeywordMatcher([cue for cues in TEST_TYPE_CUES.values() for cue in cues])
+_LEVEL_OF = {term: level for level, terms in JOB_LEVEL_TERMS.items() for term in terms}
+_TYPE_OF = {cue: test_type for test_type, cues in TEST_TYPE_CUES.items() for cue in cues}
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-/][a-z0-9+#]+)*")
+_YEARS = re.compile(r'(\d+)\s*(?:\+|(?:-|to)\s*(\d+))?\s*(?:years?|yrs?)\b')
+_HOUR_WORDS = re.compile(r'\b(half an hour|an hour|one hour)\b')
+_DURATION_RANGE = re.compile(r'(\d+)\s*(?:-|to)\s*(\d+)\s*(?:minutes?|mins?)\b')
+_DURATION_WORDS = re.compile(r'\b(?:minutes?|mins?|hours?|hrs?)\b')
+
+# Exclusions the rules cannot express: a matched skill may be the one the
+# user does not want, so these always go to the LLM
+_NEGATION = re.compile(
+    r"\b(?:not|no|without|except|excluding|exclude|other than|rather than|instead of|never|avoid)\b"
+    r"|n['’]t\b"
+)
+# Time limits phrased with a negation ("no more than 30 minutes") are not exclusions
+_DURATION_LIMIT = re.compile(r"\b(?:no|not)\s+(?:more|longer)\s+than\b|\bnot\s+(?:to\s+)?exceed(?:ing)?\b")
+
+
+def _extract_duration(text_lower: str) -> Optional[int]:
+    """Duration in minutes; ranges resolve to their upper bound"""
+    match = _DURATION_RANGE.search(text_lower)
+    if match:
+        return int(match.group(2))
+    match = _HOUR_WORDS.search(text_lower)
+    if match:
+        return 30 if match.group(1) == 'half an hour' else 60
+    return extract_duration_from_text(text_lower)
+
+
+def _level_from_years(text_lower: str) -> Optional[str]:
+    match = _YEARS.search(text_lower)
+    if not match:
+        return None
+    years = int(match.group(2) or match.group(1))
+    if years <= 2:
+        return 'Entry'
+    return 'Mid' if years <= 5 else 'Senior'
+
+
+def extract_query_rules(text: str, max_chars: int = 300) -> Dict[str, Any]:
+    """
+    Rule-based extraction of query requirements
+    
+    Skills come from the assessment keyword matcher, job levels and test
+    types from fixed dictionaries and the duration from the duration
+    patterns. Confidence is the share of query words these rules account
+    for, lowered when no skill is found or a time limit cannot be read,
+    and zero when the query negates or excludes something.
+    
+    Args:
+        text: Query text
+        max_chars: Queries longer than this get zero confidence
+    
+    Returns:
+        EnhancedQuery fields plus 'confidence' and 'reasons'
+    """
+    text_lower = text.lower()
+    reasons: List[str] = []
+    
+    hits = assessment_matcher.find(text_lower)
+    level_hits = _level_matcher.find(text_lower)
+    cue_hits = _cue_matcher.find(text_lower)
+    
+    skills = [hit for hit in hits if hit not in _LEVEL_OF and hit != 'it']
+    
+    levels = list(dict.fromkeys(_LEVEL_OF[hit] for hit in level_hits))
+    if not levels:
+        years_level = _level_from_years(text_lower)
+        if years_level:
+            levels.append(years_level)
+    
+    test_types = list(dict.fromkeys(_TYPE_OF[hit] for hit in cue_hits))
+    if any(skill not in _TYPE_OF and skill not in AMBIGUOUS_SKILLS for skill in skills):
+        test_types.insert(0, 'K')
+    for level in levels:
+        test_types.extend(t for t in LEVEL_TEST_TYPES.get(level, []) if t not in test_types)
+    
+    duration = _extract_duration(text_lower)
+    
+    limits = _DURATION_LIMIT.findall(text_lower)
+    negations = _NEGATION.findall(_DURATION_LIMIT.sub(' ', text_lower))
+    
+    covered = {word for phrase in hits + level_hits + cue_hits + limits for word in _TOKEN.findall(phrase)}
+    tokens = _TOKEN.findall(text_lower)
+    explained = sum(
+        1 for token in tokens
+        if token in FILLER_WORDS or token in covered or any(char.isdigit() for char in token)
+    )
+    confidence = explained / len(tokens) if tokens else 0.0
+    
+    if len(text) > max_chars:
+        confidence = 0.0
+        reasons.append("too_long")
+    if negations:
+        confidence = 0.0
+        reasons.append("negation")
+    if not any(skill not in AMBIGUOUS_SKILLS for skill in skills) and not cue_hits:
+        confidence = min(confidence, 0.5)
+        reasons.append("no_skills")
+    if duration is None and _DURATION_WORDS.search(text_lower):
+        confidence = max(confidence - 0.2, 0.0)
+        reasons.append("unparsed_duration")
+    if confidence < 1.0 and tokens and explained < len(tokens):
+        reasons.append(f"unexplained_words:{len(tokens) - explained}")
+    
+    return {
+        'original_query': text,
+        'extracted_skills': skills,
+        'extracted_duration': duration,
+        'extracted_job_levels': levels,
+        'required_test_types': test_types,
+        'key_requirements': skills[:5] + cue_hits[:3],
+        'confidence': round(confidence, 3),
+        'reasons': reasons
+    }
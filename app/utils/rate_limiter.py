@@ -0,0 +1,303 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("rate_limiter")
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket rate limiter for asyncio code
+    
+    Tokens refill continuously at `rate` per second up to `capacity`, so
+    short bursts go through immediately while the long-run request rate
+    stays bounded.
+    
+    Args:
+        rate: Tokens added per second
+        capacity: Maximum tokens held (burst size)
+    """
+    
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.total_wait = 0.0
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    async def acquire(self, tokens: float = 1.0):
+        """
+        Wait until `tokens` are available and consume them
+        
+        Args:
+            tokens: Number of tokens to take
+        """
+        async with self._lock:
+            self._refill()
+            deficit = tokens - self._tokens
+            if deficit > 0:
+                wait = deficit / self.rate
+                self.total_wait += wait
+                await asyncio.sleep(wait)
+                self._refill()
+            self._tokens -= tokens
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class RateLimitDecision(NamedTuple):
+    """Outcome of one request against a client's limit"""
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+def _decide(calls: int, period: float, previous: int, current: int, elapsed: float) -> RateLimitDecision:
+    """
+    Sliding window counter decision
+    
+    The previous fixed window's count is weighted by how much of it still
+    overlaps the sliding window, which approximates a log of timestamps
+    with two counters.
+    
+    Args:
+        calls: Requests allowed per period
+        period: Window length in seconds
+        previous: Count in the previous fixed window
+        current: Count in the current fixed window
+        elapsed: Seconds since the current window started
+    
+    Returns:
+        Decision for a request arriving now
+    """
+    estimate = previous * (1 - elapsed / period) + current
+    if estimate < calls:
+        return RateLimitDecision(True, max(int(calls - estimate - 1), 0), 0.0)
+    if current >= calls or not previous:
+        retry_after = period - elapsed
+    else:
+        retry_after = period * (1 - (calls - current) / previous) - elapsed
+    return RateLimitDecision(False, 0, max(retry_after, 1.0))
+
+
+class SlidingWindowRateLimiter:
+    """
+    In-process per-client rate limiter
+    
+    Each client has two counters (this fixed window and the previous one),
+    so a request costs O(1) whatever the number of clients. Clients are kept
+    in an LRU of at most max_clients; an evicted client starts again from a
+    clean window, which only matters for clients idle long enough to be the
+    least recently seen.
+    """
+    
+    shared = False
+    
+    def __init__(self, calls: int, period: float, max_clients: int = 10000):
+        self.calls = calls
+        self.period = period
+        self.max_clients = max_clients
+        self._clients: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+    
+    def hit(self, key: str, now: float = None) -> RateLimitDecision:
+        """
+        Count a request from a client if it is within the limit
+        
+        Args:
+            key: Client key (IP address)
+            now: Current time in seconds (defaults to time.time())
+        
+        Returns:
+            Decision for the request
+        """
+        now = time.time() if now is None else now
+        window = int(now // self.period)
+        elapsed = now - window * self.period
+        with self._lock:
+            bucket = self._clients.get(key)
+            if bucket is None:
+                bucket = self._clients[key] = [window, 0, 0]
+                if len(self._clients) > self.max_clients:
+                    self._clients.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._clients.move_to_end(key)
+                if bucket[0] != window:
+                    bucket[2] = bucket[1] if bucket[0] == window - 1 else 0
+                    bucket[0], bucket[1] = window, 0
+            
+            decision = _decide(self.calls, self.period, bucket[2], bucket[1], elapsed)
+            if decision.allowed:
+                bucket[1] += 1
+                self.allowed += 1
+            else:
+                self.rejected += 1
+            return decision
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'backend': "memory",
+                'calls': self.calls,
+                'period': self.period,
+                'clients': len(self._clients),
+                'max_clients': self.max_clients,
+                'evictions': self.evictions,
+                'allowed': self.allowed,
+                'rejected': self.rejected
+            }
+
+
+class SQLiteRateLimiter:
+    """
+    Rate limiter shared by every worker process through a SQLite file
+    
+    Same sliding window counter as SlidingWindowRateLimiter, with one row
+    per client and fixed window. The read and increment run in one
+    BEGIN IMMEDIATE transaction, so uvicorn workers see each other's counts.
+    Rows older than the previous window are deleted when a process first
+    sees a new window. If the database fails the request is let through.
+    """
+    
+    shared = True
+    
+    def __init__(self, calls: int, period: float, path: str, busy_timeout_ms: int = 5000):
+        self.calls = calls
+        self.period = period
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.path),
+            timeout=busy_timeout_ms / 1000,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit ("
+            "client TEXT NOT NULL, window INTEGER NOT NULL, count INTEGER NOT NULL, "
+            "PRIMARY KEY (client, window)) WITHOUT ROWID"
+        )
+        self._lock = threading.Lock()
+        self._pruned_window: Optional[int] = None
+        self.allowed = 0
+        self.rejected = 0
+        self.errors = 0
+    
+    def hit(self, key: str, now: float = None) -> RateLimitDecision:
+        """
+        Count a request from a client if it is within the limit
+        
+        Args:
+            key: Client key (IP address)
+            now: Current time in seconds (defaults to time.time())
+        
+        Returns:
+            Decision for the request
+        """
+        now = time.time() if now is None else now
+        window = int(now // self.period)
+        elapsed = now - window * self.period
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    counts = dict(self._conn.execute(
+                        "SELECT window, count FROM rate_limit WHERE client = ? AND window IN (?, ?)",
+                        (key, window, window - 1)
+                    ).fetchall())
+                    decision = _decide(self.calls, self.period, counts.get(window - 1, 0), counts.get(window, 0), elapsed)
+                    if decision.allowed:
+                        self._conn.execute(
+                            "INSERT INTO rate_limit (client, window, count) VALUES (?, ?, 1) "
+                            "ON CONFLICT (client, window) DO UPDATE SET count = count + 1",
+                            (key, window)
+                        )
+                    if self._pruned_window != window:
+                        self._conn.execute("DELETE FROM rate_limit WHERE window < ?", (window - 1,))
+                        self._pruned_window = window
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error as e:
+                self.errors += 1
+                logger.warning(f"Rate limit check failed, allowing request: {e}")
+                return RateLimitDecision(True, self.calls, 0.0)
+            
+            if decision.allowed:
+                self.allowed += 1
+            else:
+                self.rejected += 1
+            return decision
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'backend': "sqlite",
+                'calls': self.calls,
+                'period': self.period,
+                'path': str(self.path),
+                'allowed': self.allowed,
+                'rejected': self.rejected,
+                'errors': self.errors
+            }
+
+
+def create_rate_limiter(backend: str = None):
+    """
+    Build the rate limiter configured in settings
+    
+    Args:
+        backend: "memory" or "sqlite" (default RATE_LIMIT_BACKEND)
+    
+    Returns:
+        Rate limiter
+    """
+    backend = (backend or settings.RATE_LIMIT_BACKEND).lower()
+    if backend == "sqlite":
+        return SQLiteRateLimiter(
+            settings.RATE_LIMIT_CALLS,
+            settings.RATE_LIMIT_PERIOD,
+            settings.RATE_LIMIT_SQLITE_PATH,
+            settings.SQLITE_BUSY_TIMEOUT_MS
+        )
+    if backend != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND '{backend}', using memory")
+    return SlidingWindowRateLimiter(
+        settings.RATE_LIMIT_CALLS,
+        settings.RATE_LIMIT_PERIOD,
+        settings.RATE_LIMIT_MAX_CLIENTS
+    )
+
+
+rate_limiter = create_rate_limiter()
+
+
+def get_rate_limiter():
+    """Get rate limiter instance"""
+    return rate_limiter
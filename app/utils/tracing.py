@@ -0,0 +1,407 @@
+import asyncio
+import contextvars
+import functools
+import json
+import queue
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("tracing")
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation within a trace"""
+    
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start_ns", "end_ns", "status", "error")
+    
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+    
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+    
+    def set_attributes(self, attributes: Dict[str, Any]):
+        self.attributes.update(attributes)
+    
+    def record_error(self, error: BaseException):
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+    
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+
+class Trace:
+    """Spans of one request, keyed by session id"""
+    
+    def __init__(self, session_id: Optional[str]):
+        self.trace_id = secrets.token_hex(16)
+        self.session_id = session_id
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def trace_to_otlp(trace: Trace, service_name: str = "shl-assessment-api") -> Dict[str, Any]:
+    """
+    Convert a trace to an OTLP/JSON ExportTraceServiceRequest
+    
+    Args:
+        trace: Finished trace
+        service_name: Resource service.name
+    
+    Returns:
+        OTLP/JSON payload, as written by the collector's file exporter
+    """
+    spans = []
+    for span in trace.spans:
+        attributes = dict(span.attributes)
+        if trace.session_id and span is trace.root:
+            attributes["session.id"] = trace.session_id
+        status = {"code": 2, "message": span.error or ""} if span.status == "error" else {"code": 1}
+        spans.append({
+            "traceId": trace.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_id or "",
+            "name": span.name,
+            "kind": 2 if span is trace.root else 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns or span.start_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()],
+            "status": status
+        })
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": "app.utils.tracing"}, "spans": spans}]
+        }]
+    }
+
+
+class FileSpanExporter:
+    """
+    Appends finished traces as OTLP/JSON lines, one trace per line
+    
+    export() only puts the trace on a bounded queue; serialization and
+    file writes happen on a background thread, so the request path (and
+    the event loop) never waits on disk. Traces are dropped when the queue
+    is full.
+    """
+    
+    def __init__(self, path: str, max_queue_size: int = 1000):
+        self.path = Path(path)
+        self._queue: "queue.Queue[Optional[Trace]]" = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.exported = 0
+        self.failed = 0
+        self.dropped = 0
+    
+    def export(self, trace: Trace):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+    
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            traces = [self._queue.get()]
+            while True:
+                try:
+                    traces.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            pending = [trace for trace in traces if trace is not None]
+            if pending:
+                self._write(pending)
+            for _ in traces:
+                self._queue.task_done()
+            if len(pending) < len(traces):
+                return
+    
+    def _write(self, traces: List[Trace]):
+        try:
+            lines = "".join(json.dumps(trace_to_otlp(trace), separators=(",", ":")) + "\n" for trace in traces)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            self.exported += len(traces)
+        except (OSError, TypeError, ValueError) as e:
+            self.failed += len(traces)
+            logger.warning(f"Failed to export {len(traces)} traces: {e}")
+    
+    def close(self, timeout: float = 5.0):
+        """Write the queued traces and stop the background thread"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+        self._thread = None
+
+
+class Tracer:
+    """
+    Span tracer for the request path
+    
+    The current span lives in a context variable, so it follows the request
+    through awaits, LangGraph node tasks and asyncio.to_thread without being
+    passed around. Finished traces are kept in memory by session id for the
+    debug view and appended to an OTLP/JSON file.
+    """
+    
+    def __init__(self, enabled: bool = True, export_path: Optional[str] = None, buffer_size: int = 500):
+        self.enabled = enabled
+        self.exporter = FileSpanExporter(export_path) if export_path else None
+        self.buffer_size = buffer_size
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+    
+    def start_span(self, name: str, session_id: Optional[str] = None, **attributes: Any) -> Optional[Span]:
+        """
+        Start a span under the current span, or a new trace if there is none
+        
+        Args:
+            name: Span name
+            session_id: Session id for a new trace
+            **attributes: Span attributes
+        
+        Returns:
+            Started span, or None when tracing is disabled
+        """
+        if not self.enabled:
+            return None
+        parent = _current_span.get()
+        if parent is None:
+            trace = Trace(session_id)
+            span = Span(trace, name, None, attributes)
+            trace.root = span
+        else:
+            span = Span(parent.trace, name, parent.span_id, attributes)
+        span.trace.spans.append(span)
+        return span
+    
+    def end_span(self, span: Optional[Span]):
+        if span is None or span.end_ns is not None:
+            return
+        span.end_ns = time.time_ns()
+        if span is span.trace.root:
+            self._finish(span.trace)
+    
+    def _finish(self, trace: Trace):
+        if trace.session_id:
+            with self._lock:
+                self._traces[trace.session_id] = trace
+                self._traces.move_to_end(trace.session_id)
+                while len(self._traces) > self.buffer_size:
+                    self._traces.popitem(last=False)
+        if self.exporter:
+            self.exporter.export(trace)
+    
+    @contextmanager
+    def use_span(self, span: Optional[Span]) -> Iterator[Optional[Span]]:
+        """Make an already started span current for the block"""
+        token = _current_span.set(span) if span is not None else None
+        try:
+            yield span
+        finally:
+            if token is not None:
+                _current_span.reset(token)
+    
+    @contextmanager
+    def span(self, name: str, session_id: Optional[str] = None, **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Run the block in a new span
+        
+        Args:
+            name: Span name
+            session_id: Session id when the span starts a trace
+            **attributes: Span attributes
+        
+        Yields:
+            The span (None when tracing is disabled)
+        """
+        span = self.start_span(name, session_id, **attributes)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+    
+    def get_trace(self, session_id: str) -> Optional[Trace]:
+        with self._lock:
+            return self._traces.get(session_id)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered = len(self._traces)
+        return {
+            'enabled': self.enabled,
+            'buffered_traces': buffered,
+            'exported': self.exporter.exported if self.exporter else 0,
+            'export_failures': self.exporter.failed if self.exporter else 0,
+            'export_dropped': self.exporter.dropped if self.exporter else 0,
+            'export_path': str(self.exporter.path) if self.exporter else None
+        }
+
+
+def critical_path(trace: Trace) -> List[Span]:
+    """
+    Spans on the critical path of a trace
+    
+    Walks back from the end of each span: the child that finished last is
+    on the path, then the child that finished last before that one started,
+    and so on. Time not covered by a child on the path is the span's own.
+    
+    Args:
+        trace: Finished trace
+    
+    Returns:
+        Spans on the path, in start order
+    """
+    children: Dict[str, List[Span]] = {}
+    for span in trace.spans:
+        if span.parent_id and span.end_ns is not None:
+            children.setdefault(span.parent_id, []).append(span)
+    
+    def walk(span: Span) -> List[Span]:
+        path = [span]
+        cursor = span.end_ns or time.time_ns()
+        for child in sorted(children.get(span.span_id, []), key=lambda s: s.end_ns, reverse=True):
+            if child.end_ns <= cursor:
+                path.extend(walk(child))
+                cursor = child.start_ns
+        return path
+    
+    if trace.root is None:
+        return []
+    return sorted(walk(trace.root), key=lambda s: s.start_ns)
+
+
+def render_trace(trace: Trace) -> Dict[str, Any]:
+    """
+    Trace as a span tree plus its critical path
+    
+    Args:
+        trace: Finished trace
+    
+    Returns:
+        Trace summary, critical path with self times, and the span tree
+    """
+    origin = trace.root.start_ns if trace.root else 0
+    path = critical_path(trace)
+    on_path = {span.span_id for span in path}
+    
+    def describe(span: Span) -> Dict[str, Any]:
+        data = {
+            'name': span.name,
+            'start_ms': round((span.start_ns - origin) / 1e6, 2),
+            'duration_ms': round(span.duration_ms, 2),
+            'status': span.status,
+            'attributes': span.attributes
+        }
+        if span.error:
+            data['error'] = span.error
+        return data
+    
+    critical = []
+    for span in path:
+        child_ms = sum(s.duration_ms for s in path if s.parent_id == span.span_id)
+        critical.append({**describe(span), 'self_ms': round(max(span.duration_ms - child_ms, 0.0), 2)})
+    
+    nodes = {span.span_id: {**describe(span), 'critical': span.span_id in on_path, 'children': []} for span in trace.spans}
+    for span in trace.spans:
+        if span.parent_id in nodes:
+            nodes[span.parent_id]['children'].append(nodes[span.span_id])
+    
+    return {
+        'trace_id': trace.trace_id,
+        'session_id': trace.session_id,
+        'duration_ms': round(trace.root.duration_ms, 2) if trace.root else 0.0,
+        'span_count': len(trace.spans),
+        'critical_path': critical,
+        'spans': nodes[trace.root.span_id] if trace.root else None
+    }
+
+
+def traced(name: str):
+    """
+    Decorator running an async function in a span
+    
+    Args:
+        name: Span name
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+tracer = Tracer(
+    enabled=settings.TRACING_ENABLED,
+    export_path=settings.TRACE_EXPORT_PATH or None,
+    buffer_size=settings.TRACE_BUFFER_SIZE
+)
+
+
+def get_tracer() -> Tracer:
+    """Get tracer instance"""
+    return tracer
+
+
+async def close_tracer():
+    """Write traces still queued for export on shutdown"""
+    if tracer.exporter:
+        await asyncio.to_thread(tracer.exporter.close)
@@ -0,0 +1,203 @@
+import re
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+from app.config import settings
+from app.utils.validators import validate_url
+
+# Public suffixes accepted for bare domains (no scheme, no www). Kept to
+# suffixes seen in job links; extensions that are also ccTLDs but usually
+# mean file names (.py, .md, .sh, .rs, ...) are deliberately left out.
+PUBLIC_SUFFIXES = frozenset({
+    "com", "net", "org", "edu", "gov", "mil", "int", "info", "biz", "name", "pro",
+    "io", "co", "ai", "app", "dev", "tech", "jobs", "careers", "career", "work", "works",
+    "team", "company", "global", "online", "site", "cloud", "digital", "solutions",
+    "us", "uk", "ca", "au", "nz", "in", "de", "fr", "nl", "be", "es", "pt", "it", "ie",
+    "ch", "at", "se", "no", "dk", "fi", "pl", "cz", "hu", "ro", "gr", "tr", "ru", "ua",
+    "br", "mx", "ar", "cl", "jp", "kr", "cn", "hk", "tw", "sg", "my", "ph", "id", "th",
+    "vn", "za", "ng", "ke", "eg", "ae", "sa", "qa", "il", "eu", "asia",
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "com.au", "net.au", "org.au", "co.nz",
+    "co.in", "net.in", "org.in", "gov.in", "co.za", "com.br", "com.mx", "com.sg",
+    "com.hk", "com.my", "com.ph", "co.jp", "co.kr", "com.cn", "com.tr", "co.il",
+})
+
+# Technology names that look like domains
+NOT_DOMAINS = frozenset({"asp.net", "vb.net", "ado.net", "socket.io", "chart.io", "deno.land"})
+
+_OBFUSCATIONS = [
+    (re.compile(r'\bhxxp(s?)(?=\[?:)', re.I), r'http\1'),
+    (re.compile(r'\s*(?:\[\.\]|\(\.\)|\{\.\}|\[dot\]|\(dot\)|\{dot\})\s*', re.I), '.'),
+    (re.compile(r'\[:\]'), ':'),
+    (re.compile(r'\[/\]'), '/'),
+]
+_MARKDOWN_LINK = re.compile(r'\[[^\]\n]*\]\((https?://[^\s)]+)\)', re.I)
+_SCHEME_URL = re.compile(r'https?://[^\s<>"\'`\]\[]+', re.I)
+_WWW_URL = re.compile(r'(?<![\w@./-])www\.[^\s<>"\'`\]\[]+', re.I)
+_BARE_DOMAIN = re.compile(
+    r'(?<![\w@./:-])((?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+([a-z]{2,24}))'
+    r'(?::\d{2,5})?(/[^\s<>"\'`\]\[]*)?(?![\w@-])',
+    re.I
+)
+_TRAILING_PUNCTUATION = '.,;:!?\'"*_>'
+
+# A bare domain without a path is only taken as a link in a query this short;
+# in a pasted JD it is usually a brand mention ("More at shl.com.")
+BARE_DOMAIN_MAX_QUERY_CHARS = 120
+
+_CATALOG_VIEW = re.compile(r'/product-catalog/view/([^/?#]+)')
+
+DETECTION_PATHS = ("markdown", "scheme", "obfuscated", "www", "bare_domain")
+
+
+class URLDetector:
+    """
+    Deterministic URL detection for user queries
+    
+    Finds, in order: markdown links, http(s) URLs, obfuscated links
+    (hxxp, [.], (dot)), www. hosts and bare domains whose suffix is a known
+    public suffix. A bare domain needs a path unless the query is short, so
+    brand mentions in a pasted JD are not fetched. Bare hosts are returned
+    with an https:// scheme.
+    Counts which path produced the URLs of each query.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {path: 0 for path in DETECTION_PATHS}
+        self.counts.update({"none": 0, "llm_fallback_calls": 0, "llm_fallback_hits": 0})
+        self.queries = 0
+    
+    @staticmethod
+    def _has_public_suffix(host: str) -> bool:
+        labels = host.lower().rstrip(".").split(".")
+        if len(labels) < 2:
+            return False
+        return ".".join(labels[-2:]) in PUBLIC_SUFFIXES or labels[-1] in PUBLIC_SUFFIXES
+    
+    @staticmethod
+    def _trim(url: str) -> str:
+        url = url.rstrip(_TRAILING_PUNCTUATION)
+        # Keep balanced parentheses (wiki-style URLs), drop an unmatched closing one
+        while url.endswith(")") and url.count(")") > url.count("("):
+            url = url[:-1].rstrip(_TRAILING_PUNCTUATION)
+        return url
+    
+    def _scan(self, text: str) -> Dict[str, List[str]]:
+        """Run each detector, masking spans already matched"""
+        found: Dict[str, List[str]] = {path: [] for path in DETECTION_PATHS}
+        
+        def take(path: str, pattern: re.Pattern, source: str, group: int = 0) -> str:
+            def replace(match: re.Match) -> str:
+                found[path].append(self._trim(match.group(group)))
+                return " " * len(match.group(0))
+            return pattern.sub(replace, source)
+        
+        text = take("markdown", _MARKDOWN_LINK, text, group=1)
+        text = take("scheme", _SCHEME_URL, text)
+        
+        deobfuscated = text
+        for pattern, replacement in _OBFUSCATIONS:
+            deobfuscated = pattern.sub(replacement, deobfuscated)
+        if deobfuscated != text:
+            text = take("obfuscated", _SCHEME_URL, deobfuscated)
+        
+        text = take("www", _WWW_URL, text)
+        short_query = len(text.strip()) <= BARE_DOMAIN_MAX_QUERY_CHARS
+        for match in _BARE_DOMAIN.finditer(text):
+            host, suffix, path = match.group(1), match.group(2), match.group(3)
+            # Upper-case suffixes are almost always technology names (ASP.NET, Socket.IO)
+            if not suffix.islower() or host.lower() in NOT_DOMAINS or not self._has_public_suffix(host):
+                continue
+            if short_query or self._trim(path or "").strip("/"):
+                found["bare_domain"].append(self._trim(match.group(0)))
+        
+        return found
+    
+    def detect(self, text: str, record: bool = True) -> List[str]:
+        """
+        Extract URLs from text
+        
+        Args:
+            text: User query
+            record: Count this query in the detection metrics
+        
+        Returns:
+            Unique valid URLs in order of detection path, then position
+        """
+        found = self._scan(text or "")
+        
+        urls: List[str] = []
+        paths = []
+        for path in DETECTION_PATHS:
+            for url in found[path]:
+                if not re.match(r'https?://', url, re.I):
+                    url = f"https://{url}"
+                if url not in urls and validate_url(url):
+                    urls.append(url)
+                    if path not in paths:
+                        paths.append(path)
+        
+        if record:
+            with self._lock:
+                self.queries += 1
+                for path in paths:
+                    self.counts[path] += 1
+                if not urls:
+                    self.counts["none"] += 1
+        
+        return urls
+    
+    def record_llm_fallback(self, found: bool):
+        """Count an LLM URL-extraction call and whether it found URLs"""
+        with self._lock:
+            self.counts["llm_fallback_calls"] += 1
+            if found:
+                self.counts["llm_fallback_hits"] += 1
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get detection metrics
+        
+        Returns:
+            Query count and how often each detection path fired
+        """
+        with self._lock:
+            return {"queries": self.queries, **self.counts}
+
+
+url_detector = URLDetector()
+
+
+def get_url_detector() -> URLDetector:
+    """Get URL detector instance"""
+    return url_detector
+
+
+def detect_urls(text: str, record: bool = False) -> List[str]:
+    """Extract URLs from text with the shared detector"""
+    return url_detector.detect(text, record=record)
+
+
+def catalog_assessment_url(url: str) -> Optional[str]:
+    """
+    Canonical catalog URL for a link to an assessment page of SHL_CATALOG_URL
+    
+    Links through /solutions/products/..., without a trailing slash or with
+    a query string map to the URL the assessment is indexed under.
+    
+    Args:
+        url: Extracted URL
+    
+    Returns:
+        Indexed assessment URL, or None for any other page
+    """
+    try:
+        parts = urlsplit(url if "://" in url else f"https://{url}")
+        host = (parts.hostname or "").removeprefix("www.")
+    except ValueError:
+        return None
+    catalog_host = (urlsplit(settings.SHL_CATALOG_URL).hostname or "").removeprefix("www.")
+    match = _CATALOG_VIEW.search(parts.path)
+    if host != catalog_host or not match:
+        return None
+    return f"{settings.SHL_CATALOG_URL.rstrip('/')}/view/{match.group(1)}/"
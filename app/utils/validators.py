@@ -1,11 +1,14 @@
 import re
 from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from validators import url as validate_url_validator
 from app.utils.logger import get_logger
 
 
 logger = get_logger("validators")
 
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid"}
+
 def validate_url(url: str) -> bool:
     """
     Validate if a string is a valid URL
@@ -68,3 +71,34 @@ def extract_urls_from_text(text: str) -> List[str]:
     
     return valid_urls
 
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for cache keys
+    
+    Lowercases scheme and host, drops default ports, fragments and
+    tracking parameters (utm_*, gclid, ...) and sorts the query. URLs that
+    cannot be parsed (e.g. a port out of range) are returned stripped but
+    otherwise unchanged, so the fetch itself reports the failure.
+    
+    Args:
+        url: URL string
+        
+    Returns:
+        str: Canonical URL
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url.strip()
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if port and (scheme, port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{port}"
+    
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
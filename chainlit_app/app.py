@@ -11,6 +11,7 @@ import chainlit as cl
 from chainlit_app.handlers.message_handler import MessageHandler
 from chainlit_app.handlers.session_handler import SessionHandler
 from chainlit_app.components.progress_tracker import ProgressTracker
+from app.services.interaction_writer import stop_interaction_writer
 from app.utils.logger import get_logger
 from chainlit_app.components.table_renderer import render_assessment_table, render_summary_stats
 from chainlit_app.components.table_renderer import render_assessment_list
@@ -103,8 +104,6 @@ async def on_message(message: cl.Message):
         else:
             await send_fallback_response(result)
         
-        await session_handler.update_session_stats(session_id, result)
-        
     except Exception as e:
         logger.error(f"Error processing message: {e}")
         try:
@@ -215,5 +214,17 @@ async def on_chat_end():
 """
         await cl.Message(content=farewell_msg, author="System").send()
 
+
+@cl.on_app_shutdown
+async def on_app_shutdown():
+    """
+    Called when the Chainlit server shuts down
+    
+    The interaction writer is started lazily by the first persisted message,
+    so its queue is drained here before the event loop goes away.
+    """
+    await stop_interaction_writer()
+    logger.info("Interaction writer drained on shutdown")
+
 if __name__ == "__main__":
     pass
\ No newline at end of file
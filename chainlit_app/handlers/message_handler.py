@@ -3,11 +3,14 @@ Message handler for processing user queries in Chainlit
 """
 
 import sys
+import time
 from pathlib import Path
 from typing import Dict, Any, Callable, Optional
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from app.graph.workflow import execute_query
+from app.services.interaction_writer import get_interaction_writer
+from app.utils.formatters import format_assessment_response
 from app.utils.logger import get_logger
 
 logger = get_logger("message_handler")
@@ -37,6 +40,7 @@ class MessageHandler:
             Structured response dictionary
         """
         self.logger.info(f"Handling message for session {session_id}")
+        start_time = time.time()
         
         try:
             if progress_callback:
@@ -62,6 +66,8 @@ class MessageHandler:
             if progress_callback:
                 await progress_callback("Complete!", 100)
             
+            await self._persist_interaction(query, session_id, final_state, result, time.time() - start_time)
+            
             return result
             
         except Exception as e:
@@ -73,6 +79,30 @@ class MessageHandler:
                 'intent': None
             }
     
+    async def _persist_interaction(
+        self,
+        query: str,
+        session_id: str,
+        final_state: Dict[str, Any],
+        result: Dict[str, Any],
+        processing_time: float
+    ):
+        """Queue the interaction so it lands in SQLite and the session counters"""
+        try:
+            recommendations = result.get('recommendations') or []
+            await get_interaction_writer().submit(
+                session_id=session_id,
+                query=query,
+                query_type=result.get('intent') or 'unknown',
+                intent=final_state.get('intent'),
+                recommended_assessments=format_assessment_response(recommendations) if recommendations else None,
+                processing_time=processing_time,
+                error_message=result.get('message') if result['type'] == 'error' else None,
+                agent_outputs=final_state.get('agent_outputs', {})
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to queue interaction: {e}")
+    
     async def _handle_jd_query_result(
         self,
         final_state: Dict[str, Any],
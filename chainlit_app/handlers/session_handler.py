@@ -3,6 +3,7 @@ Session handler for managing Chainlit sessions
 """
 
 import sys
+import asyncio
 from pathlib import Path
 import uuid
 from typing import Dict, Any, Optional
@@ -22,7 +23,6 @@ class SessionHandler:
     def __init__(self):
         self.session_service = get_session_service()
         self.logger = get_logger("session_handler")
-        self.session_stats = {}  
     
     async def create_session(self) -> str:
         """
@@ -32,17 +32,11 @@ class SessionHandler:
             Session ID
         """
         try:
-            session_id = self.session_service.create_session(
+            session_id = await asyncio.to_thread(
+                self.session_service.create_session,
                 metadata={'source': 'chainlit'}
             )
             
-          
-            self.session_stats[session_id] = {
-                'total_queries': 0,
-                'total_recommendations': 0,
-                'query_types': {}
-            }
-            
             self.logger.info(f"Created new session: {session_id}")
             
             return session_id
@@ -51,44 +45,13 @@ class SessionHandler:
             self.logger.error(f"Failed to create session: {e}")
             return str(uuid.uuid4())
     
-    async def update_session_stats(self, session_id: str, result: Dict[str, Any]):
-        """
-        Update session statistics
-        
-        Args:
-            session_id: Session identifier
-            result: Result from message processing
-        """
-        try:
-            if session_id not in self.session_stats:
-                self.session_stats[session_id] = {
-                    'total_queries': 0,
-                    'total_recommendations': 0,
-                    'query_types': {}
-                }
-            
-            stats = self.session_stats[session_id]
-            
-            
-            stats['total_queries'] += 1
-            
-            intent = result.get('intent')
-            if intent:
-                stats['query_types'][intent] = stats['query_types'].get(intent, 0) + 1
-            
-            
-            if result['type'] == 'recommendations':
-                stats['total_recommendations'] += result.get('count', 0)
-            
-            self.logger.debug(f"Updated stats for session {session_id}: {stats}")
-            
-        except Exception as e:
-            self.logger.error(f"Failed to update session stats: {e}")
-    
     async def get_session_stats(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
         Get session statistics
         
+        Counters are maintained in SQLite with each persisted interaction,
+        so they survive restarts and are shared between workers.
+        
         Args:
             session_id: Session identifier
             
@@ -96,10 +59,8 @@ class SessionHandler:
             Session statistics or None
         """
         try:
-            if session_id in self.session_stats:
-                return self.session_stats[session_id].copy()
-            
-            return None
+            stats = await asyncio.to_thread(self.session_service.get_session_stats, session_id)
+            return stats or None
             
         except Exception as e:
             self.logger.error(f"Failed to get session stats: {e}")
@@ -112,11 +73,4 @@ class SessionHandler:
         Args:
             session_id: Session identifier
         """
-        try:
-            if session_id in self.session_stats:
-                del self.session_stats[session_id]
-            
-            self.logger.info(f"Ended session: {session_id}")
-            
-        except Exception as e:
-            self.logger.error(f"Failed to end session: {e}")
\ No newline at end of file
+        self.logger.info(f"Ended session: {session_id}")
\ No newline at end of file
@@ -5,25 +5,60 @@ This script evaluates the recommendation system using:
 1. Recall@K metric on labeled training data
 2. Saves evaluation.txt with console output
 3. Saves train_evaluation.json with detailed results
+
+Queries run concurrently (--concurrency) with retries, either against a
+running API (--mode http) or by calling the workflow in-process
+(--mode inprocess, no server needed). Each result is appended to
+train_evaluation_<timestamp>.jsonl as soon as it completes.
+
+Supported datasets: a JSON object of {query: url} (labeled_train_set.json),
+a CSV with Query,Assessment_URL rows (several rows per query allowed) and a
+JSON object of {id: query} without labels (Test-Set.json, predictions only).
+
+Usage:
+    python evaluation.py
+    python evaluation.py --data Vinay_Kumar.csv --concurrency 8
+    python evaluation.py --mode inprocess --data data/Test-Set.json
 """
 
+import argparse
+import asyncio
+import csv
 import json
-import requests
+import random
 import time
 import re
-from typing import List, Dict, Any, Tuple
+import uuid
+from typing import List, Dict, Any, Optional, Tuple, Union
 from pathlib import Path
 from datetime import datetime
 import sys
 import io
 
+import httpx
+
 API_BASE_URL = "http://localhost:8000"
-RECOMMEND_ENDPOINT = f"{API_BASE_URL}/recommend"
 TRAIN_DATA_PATH = "./data/labeled_train_set.json"
 RESULTS_DIR = "./evaluation_results"
 
-K_VALUES = [1, 3, 5, 8, 10] 
-REQUEST_DELAY = 1.0  
+K_VALUES = [1, 3, 5, 8, 10]
+CONCURRENCY = 4
+MAX_RETRIES = 3
+REQUEST_TIMEOUT = 60.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Queries with exclusions that must never take the rule fast path: their
+# matched skills include the ones the user does not want
+RULE_GUARD_QUERIES = [
+    "Not a java developer, need sales people",
+    "Need a python developer without SQL",
+    "Sales roles except managers",
+    "Entry level sales, other than java",
+    "Java developer, no personality tests",
+    "Customer service hires, we don't need typing tests",
+    "Looking for analysts rather than data engineers",
+    "Graduate hiring, cognitive tests instead of coding tests"
+]
 
 
 def normalize_shl_url(url: str) -> str:
@@ -31,7 +66,7 @@ def normalize_shl_url(url: str) -> str:
     
     Args:
         url: Original URL
-        
+    
     Returns:
         Normalized URL string
     """
@@ -67,24 +102,25 @@ class EvaluationMetrics:
     """Calculate evaluation metrics"""
     
     @staticmethod
-    def recall_at_k(predicted_urls: List[str], ground_truth_url: str, k: int) -> float:
+    def recall_at_k(predicted_urls: List[str], ground_truth: Union[str, List[str]], k: int) -> float:
         """
         Calculate Recall@K with URL normalization
         
         Args:
             predicted_urls: List of predicted assessment URLs
-            ground_truth_url: Ground truth URL
+            ground_truth: Ground truth URL or list of relevant URLs
             k: Top K predictions to consider
-            
+        
         Returns:
-            Recall score (0.0 or 1.0 for single ground truth)
+            Share of relevant URLs found in the top K (0.0 or 1.0 for a single ground truth)
         """
-        if not predicted_urls or not ground_truth_url:
+        relevant = {normalize_shl_url(url) for url in ([ground_truth] if isinstance(ground_truth, str) else ground_truth)}
+        relevant.discard("")
+        if not predicted_urls or not relevant:
             return 0.0
-        predicted_normalized = [normalize_shl_url(url) for url in predicted_urls[:k]]
-        ground_truth_normalized = normalize_shl_url(ground_truth_url)
+        predicted_normalized = {normalize_shl_url(url) for url in predicted_urls[:k]}
         
-        return 1.0 if ground_truth_normalized in predicted_normalized else 0.0
+        return len(relevant & predicted_normalized) / len(relevant)
     
     @staticmethod
     def mean_recall_at_k(recalls: List[float]) -> float:
@@ -94,117 +130,320 @@ class EvaluationMetrics:
         return sum(recalls) / len(recalls)
 
 
+def load_dataset(path: str) -> List[Tuple[str, List[str]]]:
+    """
+    Load an evaluation dataset
+    
+    Args:
+        path: JSON {query: url}, JSON {id: query} or CSV with Query,Assessment_URL columns
+    
+    Returns:
+        List of (query, relevant URLs); the URL list is empty for unlabeled sets
+    """
+    if path.lower().endswith(".csv"):
+        grouped: Dict[str, List[str]] = {}
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                query = (row.get("Query") or "").strip()
+                if query:
+                    grouped.setdefault(query, [])
+                    url = (row.get("Assessment_URL") or "").strip()
+                    if url:
+                        grouped[query].append(url)
+        return list(grouped.items())
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return [(query, []) for query in data]
+    if all(str(value).startswith("http") for value in data.values()):
+        return [(query, [url]) for query, url in data.items()]
+    return [(query, []) for query in data.values()]
+
+
 class RecommendationEvaluator:
     """Main evaluation class"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        data_path: str = TRAIN_DATA_PATH,
+        mode: str = "http",
+        api_url: str = API_BASE_URL,
+        concurrency: int = CONCURRENCY,
+        retries: int = MAX_RETRIES,
+        timeout: float = REQUEST_TIMEOUT
+    ):
+        self.data_path = data_path
+        self.mode = mode
+        self.api_url = api_url.rstrip("/")
+        self.concurrency = max(1, concurrency)
+        self.retries = max(0, retries)
+        self.timeout = timeout
         self.results_dir = Path(RESULTS_DIR)
         self.results_dir.mkdir(exist_ok=True)
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.stream_file = self.results_dir / f"train_evaluation_{self.timestamp}.jsonl"
         self.train_results = []
+        self.client: Optional[httpx.AsyncClient] = None
         self.tee = TeeOutput()
         sys.stdout = self.tee
         
         print(f"Evaluation initialized - Results saved to: {self.results_dir}")
+        print(f"Mode: {self.mode}, concurrency: {self.concurrency}, retries: {self.retries}")
     
-    def load_data(self) -> Dict[str, str]:
-        """Load train data"""
-        with open(TRAIN_DATA_PATH, 'r', encoding='utf-8') as f:
-            train_data = json.load(f)
-        print(f"Loaded {len(train_data)} training queries")
+    def load_data(self) -> List[Tuple[str, List[str]]]:
+        """Load evaluation data"""
+        dataset = load_dataset(self.data_path)
+        labeled = sum(1 for _, urls in dataset if urls)
+        print(f"Loaded {len(dataset)} queries from {self.data_path} ({labeled} labeled)")
         
-        return train_data
+        return dataset
     
-    def call_recommend_api(self, query: str) -> Dict[str, Any]:
+    async def call_recommend_api(self, query: str) -> Dict[str, Any]:
         """
-        Call the /recommend API endpoint
+        Call the /recommend API endpoint, retrying transient failures
         
         Args:
             query: Job description or query text
-            
+        
         Returns:
             API response dict
         """
-        try:
-            response = requests.post(
-                RECOMMEND_ENDPOINT,
-                json={"query": query},
-                headers={"Content-Type": "application/json"},
-                timeout=60
-            )
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                response = await self.client.post(f"{self.api_url}/recommend", json={"query": query})
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code not in RETRY_STATUS_CODES:
+                    print(f"WARNING: API returned status {response.status_code}: {response.text[:200]}")
+                    return {"recommended_assessments": []}
+                retry_after = response.headers.get("Retry-After")
+                error = f"status {response.status_code}"
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {e}"
             
+            if attempt < self.retries:
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else min(2 ** attempt, 30)
+                await asyncio.sleep(delay + random.uniform(0, 0.5))
+        
+        print(f"ERROR: API call failed after {self.retries + 1} attempts: {error}")
+        return {"recommended_assessments": []}
+    
+    async def call_workflow(self, query: str) -> Dict[str, Any]:
+        """
+        Run the workflow in-process, shaped like the /recommend response
+        
+        Args:
+            query: Job description or query text
+        
+        Returns:
+            Response dict
+        """
+        from app.graph.workflow import execute_query
+        from app.utils.formatters import format_assessment_response
+        
+        for attempt in range(self.retries + 1):
+            try:
+                final_state = await execute_query(query, str(uuid.uuid4()))
+                recommendations = format_assessment_response(final_state.get('final_recommendations', []))
+                return {"recommended_assessments": recommendations[:10]}
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                if attempt < self.retries:
+                    await asyncio.sleep(min(2 ** attempt, 30))
+        
+        print(f"ERROR: Workflow failed after {self.retries + 1} attempts: {error}")
+        return {"recommended_assessments": []}
+    
+    async def get_stats(self, name: str) -> Dict[str, Any]:
+        """Fetch counters from a stats endpoint, or from the services in-process"""
+        if self.mode == "inprocess":
+            from app.agents.jd_processor_agent import get_jd_processor_agent
+            from app.utils.jd_preprocessing import get_jd_preprocessor
+            providers = {
+                "query-processing": get_jd_processor_agent().get_metrics,
+                "jd-preprocessing": get_jd_preprocessor().get_metrics
+            }
+            return providers[name]()
+        try:
+            response = await self.client.get(f"{self.api_url}/stats/{name}", timeout=10)
             if response.status_code == 200:
                 return response.json()
-            else:
-                print(f"WARNING: API returned status {response.status_code}: {response.text}")
-                return {"recommended_assessments": []}
+        except httpx.HTTPError as e:
+            print(f"WARNING: Could not fetch /stats/{name}: {e}")
+        return {}
+    
+    def query_processing_summary(self, before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compare query processing counters taken before and after the run
         
-        except requests.exceptions.RequestException as e:
-            print(f"ERROR: API call failed: {e}")
-            return {"recommended_assessments": []}
+        Returns:
+            Queries per extraction path during the run and the LLM skip rate
+        """
+        if not before or not after:
+            return {}
+        paths = {path: after.get(path, 0) - before.get(path, 0) for path in ("rules", "llm", "fallback")}
+        total = sum(paths.values())
+        summary = {**paths, "llm_skip_rate": paths["rules"] / total if total else 0.0}
+        print(
+            f"Query processing: {paths['rules']} rule fast path, {paths['llm']} LLM, "
+            f"{paths['fallback']} fallback - LLM skip rate {summary['llm_skip_rate']:.2%}"
+        )
+        return summary
     
-    def evaluate_train_set(self, train_data: Dict[str, str]) -> Dict[str, Any]:
+    def check_rule_guards(self) -> Dict[str, Any]:
         """
-        Evaluate on training set and calculate Recall@K
+        Run RULE_GUARD_QUERIES through the rule extractor
+        
+        Returns:
+            Number of guard queries and the ones the rules would have
+            answered without the LLM
+        """
+        try:
+            from app.config import settings
+            from app.utils.query_rules import extract_query_rules
+        except Exception as e:
+            print(f"WARNING: Could not load the rule extractor: {e}")
+            return {}
+        leaked = [
+            query for query in RULE_GUARD_QUERIES
+            if extract_query_rules(query, settings.QUERY_RULES_MAX_CHARS)["confidence"] >= settings.QUERY_RULES_MIN_CONFIDENCE
+        ]
+        print(f"Rule guards: {len(RULE_GUARD_QUERIES) - len(leaked)}/{len(RULE_GUARD_QUERIES)} negated queries sent to the LLM")
+        for query in leaked:
+            print(f"  LEAKED to rule fast path: {query!r}")
+        return {"queries": len(RULE_GUARD_QUERIES), "leaked": leaked}
+    
+    def preprocessing_summary(self, before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compare JD preprocessing counters taken before and after the run
+        
+        Returns:
+            JDs preprocessed during the run and their character reduction
+        """
+        if not before or not after:
+            return {}
+        processed = after.get("processed", 0) - before.get("processed", 0)
+        chars_in = after.get("chars_in", 0) - before.get("chars_in", 0)
+        chars_out = after.get("chars_out", 0) - before.get("chars_out", 0)
+        summary = {
+            "processed": processed,
+            "chars_in": chars_in,
+            "chars_out": chars_out,
+            "reduction": 1 - chars_out / chars_in if chars_in else 0.0
+        }
+        print(f"JD preprocessing: {processed} JDs, {chars_in} -> {chars_out} chars ({summary['reduction']:.2%} removed)")
+        return summary
+    
+    async def evaluate_query(self, index: int, query: str, ground_truth_urls: List[str]) -> Dict[str, Any]:
+        """
+        Evaluate one query
         
         Args:
-            train_data: Dictionary of {query: ground_truth_url}
-            
+            index: Position of the query in the dataset
+            query: Job description or query text
+            ground_truth_urls: Relevant assessment URLs (empty when unlabeled)
+        
+        Returns:
+            Result record
+        """
+        start_time = time.perf_counter()
+        if self.mode == "inprocess":
+            response = await self.call_workflow(query)
+        else:
+            response = await self.call_recommend_api(query)
+        predicted_urls = [a['url'] for a in response.get('recommended_assessments', [])]
+        
+        result = {
+            "index": index,
+            "query": query,
+            "ground_truth_urls": ground_truth_urls,
+            "predicted_urls": predicted_urls[:10],
+            "latency": round(time.perf_counter() - start_time, 3)
+        }
+        if ground_truth_urls:
+            for k in K_VALUES:
+                result[f"recall@{k}"] = EvaluationMetrics.recall_at_k(predicted_urls, ground_truth_urls, k)
+        return result
+    
+    async def evaluate_train_set(self, dataset: List[Tuple[str, List[str]]]) -> Dict[str, Any]:
+        """
+        Evaluate the dataset concurrently and calculate Recall@K
+        
+        Args:
+            dataset: List of (query, relevant URLs)
+        
         Returns:
             Evaluation metrics
         """
-        print(f"\nEvaluating on training set ({len(train_data)} queries)...")
+        print(f"\nEvaluating {len(dataset)} queries with concurrency {self.concurrency}...")
+        print(f"Streaming results to: {self.stream_file}")
         
-        recalls_by_k = {k: [] for k in K_VALUES}
-        query_count = 0
+        stats_before = await self.get_stats("query-processing")
+        preprocessing_before = await self.get_stats("jd-preprocessing")
+        semaphore = asyncio.Semaphore(self.concurrency)
         
-        for query, ground_truth_url in train_data.items():
-            query_count += 1
-            print(f"\n[{query_count}/{len(train_data)}] Processing query...")
-            print(f"Query: {query[:100]}...")
-            print(f"Ground Truth: {ground_truth_url}")
-            
-            response = self.call_recommend_api(query)
-            time.sleep(REQUEST_DELAY) 
-            predicted_assessments = response.get('recommended_assessments', [])
-            predicted_urls = [a['url'] for a in predicted_assessments]
-            
-            print(f"Predictions: {len(predicted_urls)} assessments returned")
-            
-            recalls_for_query = {}
-            for k in K_VALUES:
-                recall = EvaluationMetrics.recall_at_k(predicted_urls, ground_truth_url, k)
-                recalls_by_k[k].append(recall)
-                recalls_for_query[f"recall@{k}"] = recall
-                print(f"  Recall@{k}: {recall:.2f}")
-            
-            result = {
-                "query": query,
-                "ground_truth_url": ground_truth_url,
-                "predicted_urls": predicted_urls[:10],
-                **recalls_for_query
-            }
-            self.train_results.append(result)
-            if recalls_for_query["recall@5"] == 0.0:
-                print("INCORRECT: Ground truth not in top 5")
-            else:
-                print("CORRECT: Ground truth found in predictions")
+        async def bounded(index: int, query: str, urls: List[str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.evaluate_query(index, query, urls)
+        
+        run_start = time.perf_counter()
+        tasks = [asyncio.create_task(bounded(i, query, urls)) for i, (query, urls) in enumerate(dataset)]
+        with open(self.stream_file, 'w', encoding='utf-8') as stream:
+            for completed, task in enumerate(asyncio.as_completed(tasks), 1):
+                result = await task
+                self.train_results.append(result)
+                stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+                stream.flush()
+                
+                status = ""
+                if result["ground_truth_urls"]:
+                    status = "CORRECT" if result["recall@5"] > 0 else "INCORRECT: Ground truth not in top 5"
+                print(
+                    f"[{completed}/{len(dataset)}] #{result['index']} {result['query'][:60]!r}... "
+                    f"{len(result['predicted_urls'])} predictions in {result['latency']:.1f}s {status}"
+                )
+        wall_time = time.perf_counter() - run_start
+        self.train_results.sort(key=lambda r: r["index"])
         
+        labeled = [r for r in self.train_results if r["ground_truth_urls"]]
         mean_recalls = {}
         for k in K_VALUES:
-            mean_recall = EvaluationMetrics.mean_recall_at_k(recalls_by_k[k])
+            mean_recall = EvaluationMetrics.mean_recall_at_k([r[f"recall@{k}"] for r in labeled])
             mean_recalls[f"mean_recall@{k}"] = mean_recall
         
         print("\n" + "=" * 80)
         print("TRAINING SET EVALUATION RESULTS")
         print("=" * 80)
-        for k in K_VALUES:
-            print(f"Mean Recall@{k}: {mean_recalls[f'mean_recall@{k}']:.4f}")
+        if labeled:
+            for k in K_VALUES:
+                print(f"Mean Recall@{k}: {mean_recalls[f'mean_recall@{k}']:.4f}")
+            
+            incorrect_count = sum(1 for r in labeled if r["recall@5"] == 0.0)
+            print(f"\nIncorrect Predictions: {incorrect_count}/{len(labeled)}")
+        else:
+            print("Dataset is unlabeled - predictions only")
+        
+        latencies = sorted(r["latency"] for r in self.train_results)
+        if latencies:
+            print(
+                f"Wall time: {wall_time:.1f}s, mean latency: {sum(latencies) / len(latencies):.2f}s, "
+                f"p95 latency: {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]:.2f}s"
+            )
+        mean_recalls["wall_time"] = round(wall_time, 3)
         
-        incorrect_count = sum(1 for r in self.train_results if r["recall@5"] == 0.0)
-        print(f"\nIncorrect Predictions: {incorrect_count}/{len(train_data)}")
+        query_processing = self.query_processing_summary(stats_before, await self.get_stats("query-processing"))
+        preprocessing = self.preprocessing_summary(preprocessing_before, await self.get_stats("jd-preprocessing"))
+        rule_guards = self.check_rule_guards()
         print("=" * 80)
         
+        if query_processing:
+            mean_recalls["query_processing"] = query_processing
+        if preprocessing:
+            mean_recalls["jd_preprocessing"] = preprocessing
+        if rule_guards:
+            mean_recalls["rule_guards"] = rule_guards
         return mean_recalls
     
     def save_results(self, metrics: Dict[str, Any]):
@@ -214,6 +453,8 @@ class RecommendationEvaluator:
         with open(train_results_file, 'w', encoding='utf-8') as f:
             json.dump({
                 "timestamp": self.timestamp,
+                "dataset": self.data_path,
+                "mode": self.mode,
                 "metrics": metrics,
                 "total_queries": len(self.train_results),
                 "results": self.train_results
@@ -226,19 +467,48 @@ class RecommendationEvaluator:
         
         print("\nAll results saved successfully!")
     
+    async def _run(self):
+        dataset = self.load_data()
+        if self.mode == "inprocess":
+            from app.main import app, lifespan
+            async with lifespan(app):
+                metrics = await self.evaluate_train_set(dataset)
+        else:
+            limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+                self.client = client
+                metrics = await self.evaluate_train_set(dataset)
+        self.save_results(metrics)
+    
     def run_evaluation(self):
         """Main evaluation workflow"""
-        train_data = self.load_data()
-        metrics = self.evaluate_train_set(train_data)
-        self.save_results(metrics)
-        print(f"\nResults saved in: {self.results_dir}")
-        sys.stdout = self.tee.terminal
+        try:
+            asyncio.run(self._run())
+            print(f"\nResults saved in: {self.results_dir}")
+        finally:
+            sys.stdout = self.tee.terminal
 
 
 def main():
-    evaluator = RecommendationEvaluator()
+    parser = argparse.ArgumentParser(description="Evaluate SHL assessment recommendations")
+    parser.add_argument("--data", default=TRAIN_DATA_PATH, help="JSON or CSV evaluation set")
+    parser.add_argument("--mode", choices=["http", "inprocess"], default="http", help="Call the API or the workflow directly")
+    parser.add_argument("--api-url", default=API_BASE_URL, help="API base URL for http mode")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Queries in flight at once")
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES, help="Retries for failed queries")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT, help="Per-request timeout in seconds")
+    args = parser.parse_args()
+    
+    evaluator = RecommendationEvaluator(
+        data_path=args.data,
+        mode=args.mode,
+        api_url=args.api_url,
+        concurrency=args.concurrency,
+        retries=args.retries,
+        timeout=args.timeout
+    )
     evaluator.run_evaluation()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -11,6 +11,7 @@ from app.utils.logger import get_logger
 from app.database import init_db, init_chroma
 from scripts.initailize_vector_store import initialize_vector_store
 from app.services.vector_store_service import get_vector_store_service
+from app.services.session_service import get_session_service
 logger = get_logger("run_chainlit")
 
 async def pre_initialize_system():
@@ -19,6 +20,7 @@ async def pre_initialize_system():
         logger.info("Initializing databases...")
         init_db()
         init_chroma()
+        get_session_service().backfill_session_stats()
         logger.info("Databases initialized")
         
         logger.info("Checking vector store...")
@@ -0,0 +1,117 @@
+"""
+Keyword matching benchmark: substring scan vs the compiled keyword matcher
+
+Builds job descriptions of about --size KB from JD-style sentences and runs
+the assessment map and fallback skill lookups with the previous per-keyword
+substring test (`keyword in text.lower()`) and with the compiled matchers
+from app.utils.assessment_map. Reports time per JD and how many hits the
+substring scan produced only because a keyword sat inside another word.
+
+Usage:
+    python scripts/benchmark_keyword_matching.py --count 200 --size 10
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.assessment_map import (
+    assessment_matcher,
+    fallback_skill_matcher,
+    get_assessment_map,
+    get_fallback_skill
+)
+
+SENTENCES = [
+    "We are looking for a senior software engineer to join our growing platform team.",
+    "You will design, build and operate services written in Java, Python and Go.",
+    "Experience with SQL databases such as PostgreSQL or MySQL is required.",
+    "Familiarity with JavaScript frameworks like React or Angular is a plus.",
+    "Good communication skills and the ability to collaborate across teams are essential.",
+    "The role involves stakeholder management, mentoring and technical leadership.",
+    "You have a strong background in data analysis, machine learning or analytics.",
+    "Our customers rely on us for reliable, secure and scalable cloud infrastructure.",
+    "You enjoy problem solving and take ownership of features from idea to production.",
+    "Knowledge of CI/CD pipelines, Docker and Kubernetes is beneficial.",
+    "We offer flexible working, a learning budget and an inclusive, international culture.",
+    "Candidates should be comfortable with Excel, PowerPoint and the wider Office suite.",
+    "Previous experience in sales, marketing or customer service roles is welcome.",
+    "The successful applicant will report to the engineering manager.",
+    "Attention to detail, adaptability and good time management will help you thrive here.",
+    "This position is open to graduates and entry-level applicants with strong aptitude.",
+]
+
+
+def generate_jds(count: int, size_kb: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    jds = []
+    for _ in range(count):
+        parts: List[str] = []
+        while sum(len(p) + 1 for p in parts) < size_kb * 1024:
+            parts.append(rng.choice(SENTENCES))
+        jds.append(" ".join(parts))
+    return jds
+
+
+def substring_assessment_terms(text: str) -> List[str]:
+    """Previous lookup: rebuild the map and test every keyword as a substring"""
+    text_lower = text.lower()
+    return [terms for keyword, terms in get_assessment_map().items() if keyword in text_lower]
+
+
+def substring_fallback_skills(text: str) -> List[str]:
+    text_lower = text.lower()
+    return [keyword for keyword in get_fallback_skill() if keyword in text_lower]
+
+
+def substring_keywords(text: str, keywords: List[str]) -> List[str]:
+    text_lower = text.lower()
+    return [keyword for keyword in keywords if keyword in text_lower]
+
+
+def timed(fn: Callable[[str], List[str]], jds: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for jd in jds:
+            fn(jd)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword matching benchmark")
+    parser.add_argument("--count", type=int, default=200, help="Number of job descriptions")
+    parser.add_argument("--size", type=int, default=10, help="Size of each job description in KB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per method (best is reported)")
+    args = parser.parse_args()
+    
+    jds = generate_jds(args.count, args.size)
+    lookups: Dict[str, tuple] = {
+        "assessment_map": (substring_assessment_terms, assessment_matcher),
+        "fallback_skill": (substring_fallback_skills, fallback_skill_matcher),
+    }
+    
+    print(f"{args.count} JDs, {sum(map(len, jds)) / len(jds) / 1024:.1f} KB average")
+    print(f"{'lookup':<16}{'keywords':>9}{'substring ms':>14}{'matcher ms':>12}{'speedup':>10}{'in-word hits':>14}")
+    for name, (baseline, matcher) in lookups.items():
+        before = timed(baseline, jds, args.repeat)
+        after = timed(matcher.find, jds, args.repeat)
+        in_word = sum(
+            len(set(substring_keywords(jd, matcher.keywords)) - set(matcher.find(jd)))
+            for jd in jds
+        ) / len(jds)
+        print(
+            f"{name:<16}{len(matcher):>9}{before * 1000 / len(jds):>14.3f}{after * 1000 / len(jds):>12.3f}"
+            f"{before / after:>9.1f}x{in_word:>14.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+HTML parsing benchmark: BeautifulSoup baseline vs the lxml parsing layer
+
+Parses catalog listing pages, assessment detail pages and a job posting
+page with the previous BeautifulSoup('html.parser') extraction code and
+with app.utils.html_parsing, checks both produce the same data and reports
+time per page.
+
+Pages are rendered from data/shl_assessments.json with the fixture server
+templates and wrapped in site chrome (navigation, scripts, footer) so they
+weigh about as much as the live pages. Saved pages can be used instead:
+--save-dir writes the generated set, --pages-dir reads catalog-*.html,
+detail-*.html and jd-*.html from a directory.
+
+Usage:
+    python scripts/benchmark_parsing.py --repeat 5
+    python scripts/benchmark_parsing.py --save-dir /tmp/pages
+    python scripts/benchmark_parsing.py --pages-dir /tmp/pages
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bs4 import BeautifulSoup
+from app.utils.html_parsing import TEST_TYPE_MAPPING, parse_catalog_page, parse_job_page, parse_test_details
+from scripts.fixture_server import ITEMS_PER_PAGE, build_catalog_page, build_detail_page, load_fixture_assessments
+
+BASE_URL = "https://www.shl.com"
+
+JD_BODY = """
+<div class="job-posting">
+  <h1>Senior Python Developer</h1>
+  <div class="job-description">
+    <p>We are hiring a senior Python developer to build data services used by millions of candidates.</p>
+    <h3>Responsibilities</h3>
+    <ul><li>Design and build APIs in Python and FastAPI</li><li>Own SQL data models</li>
+    <li>Collaborate with product, design and data science teams</li></ul>
+    <h3>Requirements</h3>
+    <ul><li>5+ years of Python</li><li>Experience with SQL, JavaScript and cloud platforms</li>
+    <li>Strong communication and stakeholder management skills</li></ul>
+  </div>
+</div>
+"""
+
+
+def site_chrome(kb: int) -> Dict[str, str]:
+    """Header/navigation/footer markup of roughly `kb` kilobytes"""
+    links = []
+    while sum(len(link) for link in links) < kb * 1024:
+        n = len(links)
+        links.append(
+            f'<li class="menu__item"><a class="menu__link" href="/solutions/area-{n}/">'
+            f'Solutions area {n}</a><span class="menu__hint">Talent acquisition and development</span></li>'
+        )
+    half = len(links) // 2
+    return {
+        "head": (
+            "<head><title>SHL</title><meta name=\"description\" content=\"SHL talent assessment\">"
+            "<script>window.dataLayer = window.dataLayer || []; function gtag(){dataLayer.push(arguments);}</script>"
+            "<style>.menu__item{display:inline-block}.custom__table-wrapper{overflow:auto}</style></head>"
+        ),
+        "header": f"<header><nav><ul class=\"menu\">{''.join(links[:half])}</ul></nav></header>",
+        "footer": f"<footer><ul class=\"menu\">{''.join(links[half:])}</ul></footer>"
+    }
+
+
+def wrap(page: str, chrome: Dict[str, str]) -> str:
+    body = page.replace("<html><body>", "").replace("</body></html>", "")
+    return (
+        f"<!DOCTYPE html><html>{chrome['head']}<body>{chrome['header']}"
+        f"<main>{body}</main>{chrome['footer']}</body></html>"
+    )
+
+
+def generate_pages(chrome_kb: int, data: str = None) -> Dict[str, List[str]]:
+    assessments = load_fixture_assessments(data)
+    chrome = site_chrome(chrome_kb)
+    return {
+        "catalog": [
+            wrap(build_catalog_page(assessments, start), chrome)
+            for start in range(0, len(assessments), ITEMS_PER_PAGE)
+        ],
+        "detail": [wrap(build_detail_page(a), chrome) for a in assessments],
+        "jd": [wrap(JD_BODY, chrome)]
+    }
+
+
+def load_pages(directory: Path) -> Dict[str, List[str]]:
+    return {
+        kind: [p.read_text(encoding="utf-8") for p in sorted(directory.glob(f"{kind}-*.html"))]
+        for kind in ("catalog", "detail", "jd")
+    }
+
+
+def save_pages(pages: Dict[str, List[str]], directory: Path):
+    directory.mkdir(parents=True, exist_ok=True)
+    for kind, bodies in pages.items():
+        for i, body in enumerate(bodies):
+            (directory / f"{kind}-{i:04d}.html").write_text(body, encoding="utf-8")
+
+
+# BeautifulSoup baseline (the extraction code the lxml layer replaced)
+
+def bs4_catalog(content: str) -> Dict[str, Any]:
+    soup = BeautifulSoup(content, 'html.parser')
+    wrappers = []
+    for header in soup.find_all(['h3', 'h2', 'h4']):
+        if 'Individual Test Solutions' in header.get_text():
+            wrapper = header.find_next('div', class_='custom__table-wrapper')
+            if wrapper:
+                wrappers.append(wrapper)
+                break
+    if not wrappers:
+        wrappers = soup.find_all('div', class_='custom__table-wrapper')
+    
+    tests = []
+    for wrapper in wrappers:
+        table = wrapper.find('table')
+        if not table:
+            continue
+        header_row = table.find('tr')
+        if header_row and ('Pre-packaged' in header_row.get_text() or 'Job Solutions' in header_row.get_text()):
+            continue
+        for row in table.find_all('tr', attrs={'data-entity-id': True}):
+            title_cell = row.find('td', class_='custom__table-heading__title')
+            link = title_cell.find('a') if title_cell else None
+            if not link:
+                continue
+            href = link.get('href', '')
+            url = BASE_URL + href if href.startswith('/') else href if href.startswith('http') else BASE_URL + '/' + href
+            flags = []
+            for cell in row.find_all('td', class_='custom__table-heading__general')[:2]:
+                circle = cell.find('span', class_='catalogue__circle')
+                flags.append("Yes" if circle and '-yes' in ' '.join(circle.get('class', [])) else "No")
+            keys_cell = row.find('td', class_='product-catalogue__keys')
+            letters = [s.get_text(strip=True) for s in keys_cell.find_all('span', class_='product-catalogue__key')] if keys_cell else []
+            tests.append({
+                'name': link.get_text(strip=True),
+                'url': url,
+                'remote_support': flags[0] if len(flags) == 2 else "No",
+                'adaptive_support': flags[1] if len(flags) == 2 else "No",
+                'test_type': [TEST_TYPE_MAPPING[letter] for letter in letters if letter in TEST_TYPE_MAPPING]
+            })
+    
+    max_page = 1
+    for pagination in soup.find_all('ul', class_='pagination'):
+        for link in pagination.find_all(['a', 'span'], class_='pagination__link'):
+            text = link.get_text(strip=True)
+            if text.isdigit():
+                max_page = max(max_page, int(text))
+            match = re.search(r'start=(\d+)', link.get('href', ''))
+            if match:
+                max_page = max(max_page, int(match.group(1)) // 12 + 1)
+    return {"tests": tests, "max_page": max_page}
+
+
+def bs4_detail(content: str) -> Dict[str, Any]:
+    soup = BeautifulSoup(content, 'html.parser')
+    details = {'description': '', 'job_levels': '', 'languages': '', 'duration': None, 'test_type': []}
+    for key, label in (('description', 'Description'), ('job_levels', 'Job levels'), ('languages', 'Languages')):
+        section = soup.find('h4', string=label)
+        paragraph = section.find_next('p') if section else None
+        if paragraph:
+            details[key] = paragraph.get_text(strip=True)
+    length_section = soup.find('h4', string='Assessment length')
+    if length_section:
+        parent = length_section.find_parent('div', class_='product-catalogue-training-calendar__row')
+        length_p = parent.find('p') if parent else length_section.find_next('p')
+        if length_p:
+            for pattern in (r'=\s*(\d+)', r'(\d+)\s*(?:minutes?|mins?)', r'(\d+)\s*min', r'(\d+)'):
+                match = re.search(pattern, length_p.get_text(strip=True), re.IGNORECASE)
+                if match:
+                    details['duration'] = int(match.group(1))
+                    break
+    small_text = soup.find('p', class_='product-catalogue__small-text')
+    if small_text and 'Test Type:' in small_text.get_text():
+        letters = [s.get_text(strip=True) for s in small_text.find_all('span', class_='product-catalogue__key')]
+        test_types = [TEST_TYPE_MAPPING[letter] for letter in letters if letter in TEST_TYPE_MAPPING]
+        if test_types:
+            details['test_type'] = test_types
+    return details
+
+
+def bs4_jd(content: str) -> Optional[str]:
+    soup = BeautifulSoup(content, 'html.parser')
+    clean = lambda text: re.sub(r'\s+', ' ', text).strip()
+    for container in (
+        soup.find('div', class_=re.compile(r'job.*description', re.I)),
+        soup.find('div', id=re.compile(r'job.*description', re.I)),
+        soup.find('section', class_=re.compile(r'job.*description', re.I)),
+        soup.find('div', class_=re.compile(r'description', re.I)),
+        soup.find('article'),
+        soup.find('main'),
+    ):
+        if container and len(clean(container.get_text())) > 200:
+            return clean(container.get_text())
+    return None
+
+
+def normalize_newlines(value: Any) -> Any:
+    """lxml normalizes CR/CRLF to LF as browsers do; html.parser keeps them"""
+    if isinstance(value, str):
+        return value.replace('\r\n', '\n').replace('\r', '\n')
+    if isinstance(value, dict):
+        return {k: normalize_newlines(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [normalize_newlines(v) for v in value]
+    return value
+
+
+def timed(fn: Callable[[str], Any], pages: List[str], repeat: int) -> Dict[str, Any]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [fn(page) for page in pages]
+        best = min(best, time.perf_counter() - start)
+    return {"seconds": best, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML parsing benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per parser (best is reported)")
+    parser.add_argument("--chrome-kb", type=int, default=60, help="Site chrome added to generated pages")
+    parser.add_argument("--data", default=None, help="Assessments JSON to render pages from")
+    parser.add_argument("--pages-dir", default=None, help="Read saved pages instead of generating them")
+    parser.add_argument("--save-dir", default=None, help="Write the generated pages here")
+    args = parser.parse_args()
+    
+    if args.pages_dir:
+        pages = load_pages(Path(args.pages_dir))
+    else:
+        pages = generate_pages(args.chrome_kb, args.data)
+        if args.save_dir:
+            save_pages(pages, Path(args.save_dir))
+            print(f"Saved pages to {args.save_dir}")
+    
+    parsers = {
+        "catalog": (bs4_catalog, lambda page: parse_catalog_page(page, BASE_URL)),
+        "detail": (bs4_detail, parse_test_details),
+        "jd": (bs4_jd, lambda page: parse_job_page(page, "")["jd_text"]),
+    }
+    
+    print(f"{'pages':<10}{'count':>7}{'avg KB':>9}{'bs4 ms/page':>14}{'lxml ms/page':>14}{'speedup':>10}  match")
+    for kind, (baseline, optimized) in parsers.items():
+        bodies = pages.get(kind) or []
+        if not bodies:
+            continue
+        before = timed(baseline, bodies, args.repeat)
+        after = timed(optimized, bodies, args.repeat)
+        match = normalize_newlines(before["results"]) == after["results"]
+        print(
+            f"{kind:<10}{len(bodies):>7}{sum(map(len, bodies)) / len(bodies) / 1024:>9.1f}"
+            f"{before['seconds'] * 1000 / len(bodies):>14.2f}{after['seconds'] * 1000 / len(bodies):>14.2f}"
+            f"{before['seconds'] / after['seconds']:>9.1f}x  {'yes' if match else 'NO'}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
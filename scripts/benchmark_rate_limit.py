@@ -0,0 +1,114 @@
+"""
+Rate limiter benchmark: per-IP timestamp lists vs the sliding window counter
+
+Each limiter first sees one request from each of --clients distinct IPs
+(--rate requests per second in total), then --requests more requests from
+the same IPs are timed. The previous RateLimitMiddleware logic rebuilds the
+dict of all clients and filters each timestamp list on every request, so
+its cost grows with the number of clients in the window; app.utils.rate_limiter
+does a fixed amount of work per request. Reports time per request and how
+many entries each keeps in memory. The SQLite backend is measured as well
+unless --no-sqlite is given.
+
+Usage:
+    python scripts/benchmark_rate_limit.py --clients 10000 --requests 2000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.rate_limiter import SQLiteRateLimiter, SlidingWindowRateLimiter
+
+
+class ListRateLimiter:
+    """Previous RateLimitMiddleware.dispatch logic, without the HTTP parts"""
+    
+    def __init__(self, calls: int, period: float):
+        self.calls = calls
+        self.period = period
+        self.requests: Dict[str, List[float]] = {}
+    
+    def hit(self, key: str, now: float) -> bool:
+        self.requests = {
+            ip: times
+            for ip, times in self.requests.items()
+            if any(t > now - self.period for t in times)
+        }
+        if key in self.requests:
+            recent_requests = [t for t in self.requests[key] if t > now - self.period]
+            if len(recent_requests) >= self.calls:
+                return False
+            self.requests[key] = recent_requests + [now]
+        else:
+            self.requests[key] = [now]
+        return True
+
+
+def client_ip(i: int) -> str:
+    return f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"
+
+
+def replay(hit: Callable[[str, float], object], clients: int, requests: int, rate: float, warm: bool) -> float:
+    """
+    Seconds per timed request
+    
+    Args:
+        hit: Limiter check taking (ip, timestamp)
+        clients: Distinct client IPs
+        requests: Requests to time after the warm-up
+        rate: Simulated requests per second
+        warm: Whether to send the warm-up request from every client first
+    """
+    if warm:
+        for i in range(clients):
+            hit(client_ip(i), i / rate)
+    ips = [client_ip(i % clients) for i in range(requests)]
+    start_time = time.perf_counter()
+    for i, ip in enumerate(ips):
+        hit(ip, (clients + i) / rate)
+    return (time.perf_counter() - start_time) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate limiter benchmark")
+    parser.add_argument("--clients", type=int, default=10000, help="Distinct client IPs")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests to time after the warm-up")
+    parser.add_argument("--rate", type=float, default=200.0, help="Simulated requests per second")
+    parser.add_argument("--calls", type=int, default=100, help="RATE_LIMIT_CALLS")
+    parser.add_argument("--period", type=float, default=60.0, help="RATE_LIMIT_PERIOD")
+    parser.add_argument("--no-sqlite", action="store_true", help="Skip the SQLite backend")
+    args = parser.parse_args()
+    
+    # The warm-up of the list limiter is quadratic, so its dict is filled directly
+    listing = ListRateLimiter(args.calls, args.period)
+    listing.requests = {client_ip(i): [i / args.rate] for i in range(args.clients)}
+    window = SlidingWindowRateLimiter(args.calls, args.period, max_clients=args.clients)
+    limiters = [
+        ("timestamp lists", listing.hit, False, lambda: sum(len(times) for times in listing.requests.values())),
+        ("sliding window", window.hit, True, lambda: window.get_metrics()['clients'])
+    ]
+    if not args.no_sqlite:
+        tmp = tempfile.TemporaryDirectory()
+        shared = SQLiteRateLimiter(args.calls, args.period, str(Path(tmp.name) / "rate_limit.db"))
+        rows = lambda: shared._conn.execute("SELECT COUNT(*) FROM rate_limit").fetchone()[0]
+        limiters.append(("sliding window (sqlite)", shared.hit, True, rows))
+    
+    print(f"{args.requests} requests over {args.clients} clients at {args.rate:.0f} req/s, "
+          f"limit {args.calls}/{args.period:.0f}s")
+    print(f"{'limiter':<26}{'us/request':>12}{'entries':>10}")
+    baseline = None
+    for name, hit, warm, entries in limiters:
+        per_request = replay(hit, args.clients, args.requests, args.rate, warm)
+        baseline = baseline or per_request
+        print(f"{name:<26}{per_request * 1e6:>12.2f}{entries():>10}  {baseline / per_request:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,403 @@
+"""
+Retrieval benchmark: vector search, filters and final selection without the network
+
+Runs the retrieval stages of the RAG agent (vector search, duration and
+similarity-threshold filters, _select_final_recommendations) on recorded
+query and catalog embeddings, and reports per-stage latency, throughput and
+Recall@K, MRR and nDCG against the labeled queries. LLM reranking is not
+part of the benchmark; candidates are ordered by vector score, as when
+RAG_ENABLE_LLM_RERANKING is off.
+
+Fixtures live in a directory:
+    catalog.json     ids, documents and metadata as indexed by VectorStoreService
+    queries.json     query, relevant URLs and the enhanced query used for search
+    embeddings.npz   'catalog' and 'queries' embedding matrices
+
+--build record embeds with the configured OpenAI model once (catalog
+embeddings are read from the Chroma collection when it holds the whole
+catalog) and runs the processor agent for each query. --build synthetic
+needs no network: it uses a deterministic hashed bag-of-words embedding and
+rule-based query extraction, so its recall numbers describe that embedding,
+not the OpenAI one, while latencies and parameter trends remain comparable.
+
+Backends: 'exact' (numpy brute-force cosine) and 'chroma' (in-memory HNSW
+collection with the same settings as the persistent one).
+
+Usage:
+    python scripts/benchmark_retrieval.py --build record --fixtures data/benchmark
+    python scripts/benchmark_retrieval.py --fixtures data/benchmark --top-k 10,15,25 --thresholds 0.5,0.6
+    python scripts/benchmark_retrieval.py --build synthetic --fixtures /tmp/retrieval --backends exact,chroma
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.models.assessment import Assessment
+from app.models.schemas import EnhancedQuery
+from app.agents.jd_processor_agent import get_jd_processor_agent
+from app.agents.rag_agent import RAGAgent
+from app.services.model_providers import hashed_embedding
+from app.services.vector_store_service import VectorStoreService, get_vector_store_service
+from app.utils.query_rules import extract_query_rules
+from evaluation import load_dataset, normalize_shl_url
+
+DEFAULT_DATASETS = [settings.TRAIN_SET_PATH, "./Vinay_Kumar.csv"]
+SYNTHETIC_DIM = 1024
+K_VALUES = [3, 5, 10]
+
+def load_queries(paths: List[str]) -> List[Tuple[str, List[str]]]:
+    """Labeled queries from all datasets; relevant URLs of repeated queries are merged"""
+    merged: Dict[str, List[str]] = {}
+    for path in paths:
+        if not Path(path).exists():
+            print(f"Skipping missing dataset {path}")
+            continue
+        for query, urls in load_dataset(path):
+            if urls:
+                merged.setdefault(query, [])
+                merged[query].extend(url for url in urls if url not in merged[query])
+    return list(merged.items())
+
+
+def rules_enhanced_query(query: str) -> EnhancedQuery:
+    """Enhanced query from the rule-based extractor, whatever its confidence"""
+    rules = extract_query_rules(query, max_chars=len(query))
+    rules.pop('confidence')
+    rules.pop('reasons')
+    enhanced = EnhancedQuery(cleaned_query=query, **rules)
+    search_query = get_jd_processor_agent()._build_optimized_search_query(enhanced, query)
+    return enhanced.model_copy(update={'cleaned_query': search_query})
+
+
+async def build_fixtures(mode: str, fixtures_dir: Path, datasets: List[str]):
+    """
+    Record or synthesise benchmark fixtures
+    
+    Args:
+        mode: 'record' (OpenAI embeddings and processor agent) or 'synthetic'
+        fixtures_dir: Output directory
+        datasets: Labeled datasets to take queries from
+    """
+    vector_store = get_vector_store_service()
+    with open(settings.ASSESSMENTS_JSON_PATH, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    assessments = []
+    for data in raw.values():
+        try:
+            assessments.append(Assessment(**data))
+        except Exception:
+            continue
+    documents, metadatas, ids = vector_store._prepare_documents(assessments)
+    queries = load_queries(datasets)
+    
+    if mode == 'synthetic':
+        enhanced = [rules_enhanced_query(query) for query, _ in queries]
+        catalog = np.stack([hashed_embedding(doc, SYNTHETIC_DIM) for doc in documents])
+        query_embeddings = np.stack([hashed_embedding(eq.cleaned_query, SYNTHETIC_DIM) for eq in enhanced])
+    else:
+        collection = vector_store.chroma_manager
+        if collection.count_documents() >= len(ids):
+            stored = collection.collection.get(ids=ids, include=["embeddings"])
+            by_id = dict(zip(stored["ids"], stored["embeddings"]))
+            vectors = [by_id.get(doc_id) for doc_id in ids]
+        else:
+            vectors = [None] * len(ids)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            print(f"Embedding {len(missing)} catalog documents with {settings.OPENAI_EMBEDDING_MODEL}")
+            generated = await vector_store.embedding_service.generate_embeddings([documents[i] for i in missing])
+            for i, vector in zip(missing, generated):
+                vectors[i] = vector
+        catalog = np.asarray(vectors, dtype=np.float32)
+        if not np.all(np.linalg.norm(catalog, axis=1) > 0):
+            raise RuntimeError("Some catalog embeddings failed (zero vectors); not writing fixtures")
+        
+        processor = get_jd_processor_agent()
+        enhanced = []
+        for query, _ in queries:
+            state = await processor.execute({'query': query, 'agent_outputs': {}})
+            if not state.get('enhanced_query'):
+                raise RuntimeError(f"Processor agent failed for query: {query[:80]}")
+            enhanced.append(state['enhanced_query'])
+        query_embeddings = np.asarray([
+            await vector_store.embedding_service.generate_query_embedding(eq.cleaned_query)
+            for eq in enhanced
+        ], dtype=np.float32)
+    
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    with open(fixtures_dir / "catalog.json", 'w', encoding='utf-8') as f:
+        json.dump({'ids': ids, 'documents': documents, 'metadatas': metadatas}, f)
+    with open(fixtures_dir / "queries.json", 'w', encoding='utf-8') as f:
+        json.dump({
+            'embedding': 'synthetic' if mode == 'synthetic' else settings.OPENAI_EMBEDDING_MODEL,
+            'queries': [
+                {'query': query, 'relevant_urls': urls, 'enhanced_query': eq.model_dump()}
+                for (query, urls), eq in zip(queries, enhanced)
+            ]
+        }, f, indent=2)
+    np.savez_compressed(fixtures_dir / "embeddings.npz", catalog=catalog, queries=query_embeddings)
+    print(f"Wrote {len(ids)} catalog and {len(queries)} query embeddings to {fixtures_dir}")
+
+
+def load_fixtures(fixtures_dir: Path) -> Dict[str, Any]:
+    with open(fixtures_dir / "catalog.json", 'r', encoding='utf-8') as f:
+        catalog = json.load(f)
+    with open(fixtures_dir / "queries.json", 'r', encoding='utf-8') as f:
+        queries = json.load(f)
+    embeddings = np.load(fixtures_dir / "embeddings.npz")
+    return {
+        **catalog,
+        'embedding': queries.get('embedding', 'unknown'),
+        'queries': queries['queries'],
+        'catalog_embeddings': embeddings['catalog'].astype(np.float32),
+        'query_embeddings': embeddings['queries'].astype(np.float32)
+    }
+
+
+class ExactIndex:
+    """Brute-force cosine search over the whole catalog"""
+    
+    name = "exact"
+    
+    def __init__(self, fixtures: Dict[str, Any], search_ef: int = None):
+        matrix = fixtures['catalog_embeddings']
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.where(norms == 0, 1, norms)
+        self.ids = fixtures['ids']
+        self.documents = fixtures['documents']
+        self.metadatas = fixtures['metadatas']
+    
+    def query(self, embedding: np.ndarray, n_results: int) -> Dict[str, Any]:
+        norm = np.linalg.norm(embedding)
+        cosine = self.matrix @ (embedding / norm if norm else embedding)
+        n_results = min(n_results, len(cosine))
+        top = np.argpartition(-cosine, n_results - 1)[:n_results]
+        top = top[np.lexsort((top, -cosine[top]))]
+        return {
+            'ids': [[self.ids[i] for i in top]],
+            'documents': [[self.documents[i] for i in top]],
+            'metadatas': [[self.metadatas[i] for i in top]],
+            'distances': [[float(1.0 - cosine[i]) for i in top]]
+        }
+
+
+class ChromaIndex:
+    """In-memory Chroma collection with cosine HNSW, like the persistent store"""
+    
+    name = "chroma"
+    
+    def __init__(self, fixtures: Dict[str, Any], search_ef: int = None):
+        import chromadb
+        from chromadb.config import Settings
+        
+        client = chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False))
+        self.collection = client.create_collection(
+            name=f"benchmark-{uuid.uuid4().hex[:8]}",
+            metadata={"hnsw:space": "cosine", **({"hnsw:search_ef": search_ef} if search_ef else {})}
+        )
+        embeddings = fixtures['catalog_embeddings'].tolist()
+        for start in range(0, len(fixtures['ids']), 100):
+            end = start + 100
+            self.collection.add(
+                ids=fixtures['ids'][start:end],
+                documents=fixtures['documents'][start:end],
+                metadatas=fixtures['metadatas'][start:end],
+                embeddings=embeddings[start:end]
+            )
+    
+    def query(self, embedding: np.ndarray, n_results: int) -> Dict[str, Any]:
+        return self.collection.query(
+            query_embeddings=[embedding.tolist()],
+            n_results=n_results,
+            include=["documents", "metadatas", "distances"]
+        )
+
+
+BACKENDS = {ExactIndex.name: ExactIndex, ChromaIndex.name: ChromaIndex}
+
+
+def ranking_metrics(urls: List[str], relevant: set, k_values: List[int]) -> Dict[str, float]:
+    """Recall@K for each K, MRR and nDCG@max(K) with binary relevance"""
+    ranked = [normalize_shl_url(url) for url in urls]
+    metrics = {f"recall@{k}": len(relevant & set(ranked[:k])) / len(relevant) for k in k_values}
+    first = next((rank for rank, url in enumerate(ranked, 1) if url in relevant), None)
+    metrics['mrr'] = 1.0 / first if first else 0.0
+    k = max(k_values)
+    dcg = sum(1.0 / math.log2(rank + 1) for rank, url in enumerate(ranked[:k], 1) if url in relevant)
+    idcg = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(len(relevant), k) + 1))
+    metrics[f"ndcg@{k}"] = dcg / idcg
+    return metrics
+
+
+def run_config(
+    index: Any,
+    agent: RAGAgent,
+    fixtures: Dict[str, Any],
+    top_k: int,
+    threshold: float,
+    repeat: int
+) -> Dict[str, Any]:
+    """
+    Run every query through the retrieval stages with one parameter set
+    
+    Args:
+        index: Search backend
+        agent: RAG agent whose filter and selection stages are used
+        fixtures: Loaded fixtures
+        top_k: Candidates retrieved per query (RAG_TOP_K)
+        threshold: Primary similarity threshold (RAG_SIMILARITY_THRESHOLD)
+        repeat: Timed passes; the fastest pass is reported
+    
+    Returns:
+        Latency, throughput and ranking metrics
+    """
+    agent.top_k_retrieve = top_k
+    agent.similarity_threshold = threshold
+    queries = fixtures['queries']
+    enhanced = [EnhancedQuery(**q['enhanced_query']) for q in queries]
+    
+    best = None
+    rankings = None
+    deterministic = True
+    for _ in range(repeat):
+        stage_time = {'search': 0.0, 'filter': 0.0, 'select': 0.0}
+        pass_rankings = []
+        totals = []
+        for embedding, enhanced_query in zip(fixtures['query_embeddings'], enhanced):
+            start = time.perf_counter()
+            retrieved = VectorStoreService._results_to_assessments(index.query(embedding, top_k))
+            searched = time.perf_counter()
+            candidates = retrieved
+            if enhanced_query.extracted_duration:
+                candidates = agent._filter_by_duration(candidates, enhanced_query.extracted_duration)
+            candidates = sorted(
+                agent._filter_by_similarity_threshold(candidates),
+                key=lambda x: x.get('similarity_score', 0),
+                reverse=True
+            )
+            filtered = time.perf_counter()
+            final = agent._select_final_recommendations(candidates, enhanced_query)
+            done = time.perf_counter()
+            
+            stage_time['search'] += searched - start
+            stage_time['filter'] += filtered - searched
+            stage_time['select'] += done - filtered
+            totals.append(done - start)
+            pass_rankings.append(([a['url'] for a in retrieved], [a['url'] for a in final]))
+        
+        if rankings is None:
+            rankings = pass_rankings
+        elif pass_rankings != rankings:
+            deterministic = False
+        if best is None or sum(totals) < sum(best[1]):
+            best = (stage_time, totals)
+    
+    stage_time, totals = best
+    n = len(queries)
+    search_recall, final_metrics = [], []
+    for q, (retrieved_urls, final_urls) in zip(queries, rankings):
+        relevant = {normalize_shl_url(url) for url in q['relevant_urls']}
+        search_recall.append(len(relevant & {normalize_shl_url(url) for url in retrieved_urls}) / len(relevant))
+        final_metrics.append(ranking_metrics(final_urls, relevant, K_VALUES))
+    
+    result = {
+        'backend': index.name,
+        'top_k': top_k,
+        'threshold': threshold,
+        'search_ms': stage_time['search'] * 1000 / n,
+        'filter_ms': stage_time['filter'] * 1000 / n,
+        'select_ms': stage_time['select'] * 1000 / n,
+        'p95_ms': sorted(totals)[max(0, math.ceil(0.95 * n) - 1)] * 1000,
+        'qps': n / sum(totals) if sum(totals) else 0.0,
+        'search_recall': sum(search_recall) / n,
+        'avg_final': sum(len(final) for _, final in rankings) / n,
+        'deterministic': deterministic
+    }
+    for key in final_metrics[0]:
+        result[key] = sum(m[key] for m in final_metrics) / n
+    return result
+
+
+def parse_list(value: str, cast) -> List[Any]:
+    return [cast(item) for item in value.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline retrieval benchmark")
+    parser.add_argument("--fixtures", default="./data/benchmark", help="Fixture directory")
+    parser.add_argument("--build", choices=["record", "synthetic"], help="Build fixtures before running")
+    parser.add_argument("--data", action="append", help="Labeled dataset (repeatable, used with --build)")
+    parser.add_argument("--backends", default="exact,chroma", help="Comma-separated: exact, chroma")
+    parser.add_argument("--top-k", default=str(settings.RAG_TOP_K), help="Comma-separated RAG_TOP_K values")
+    parser.add_argument(
+        "--thresholds", default=str(settings.RAG_SIMILARITY_THRESHOLD),
+        help="Comma-separated RAG_SIMILARITY_THRESHOLD values"
+    )
+    parser.add_argument(
+        "--chroma-search-ef", type=int,
+        help="hnsw:search_ef for the chroma backend (Chroma's default of 10 caps recall for larger top_k)"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes per configuration (fastest is reported)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    fixtures_dir = Path(args.fixtures)
+    if args.build:
+        asyncio.run(build_fixtures(args.build, fixtures_dir, args.data or DEFAULT_DATASETS))
+    if not (fixtures_dir / "embeddings.npz").exists():
+        print(f"No fixtures in {fixtures_dir}; create them with --build record or --build synthetic")
+        return 1
+    
+    fixtures = load_fixtures(fixtures_dir)
+    catalog_urls = {normalize_shl_url(m['url']) for m in fixtures['metadatas']}
+    relevant_urls = {normalize_shl_url(url) for q in fixtures['queries'] for url in q['relevant_urls']}
+    print(
+        f"{len(fixtures['queries'])} queries, {len(fixtures['ids'])} catalog documents, "
+        f"{fixtures['catalog_embeddings'].shape[1]}-d {fixtures['embedding']} embeddings; "
+        f"{len(relevant_urls & catalog_urls)}/{len(relevant_urls)} relevant URLs are in the catalog"
+    )
+    
+    agent = RAGAgent()
+    agent.enable_llm_reranking = False
+    results = []
+    header = (
+        f"{'backend':<8}{'top_k':>6}{'thresh':>7}{'search ms':>10}{'filter ms':>10}{'select ms':>10}"
+        f"{'p95 ms':>8}{'qps':>9}{'cand R':>8}" + "".join(f"{'R@' + str(k):>7}" for k in K_VALUES)
+        + f"{'MRR':>7}{'nDCG':>7}"
+    )
+    print(header)
+    for backend in parse_list(args.backends, str):
+        index = BACKENDS[backend](fixtures, args.chroma_search_ef)
+        for top_k in parse_list(args.top_k, int):
+            for threshold in parse_list(args.thresholds, float):
+                r = run_config(index, agent, fixtures, top_k, threshold, args.repeat)
+                results.append(r)
+                print(
+                    f"{r['backend']:<8}{r['top_k']:>6}{r['threshold']:>7.2f}{r['search_ms']:>10.3f}"
+                    f"{r['filter_ms']:>10.3f}{r['select_ms']:>10.3f}{r['p95_ms']:>8.2f}{r['qps']:>9.0f}"
+                    f"{r['search_recall']:>8.3f}" + "".join(f"{r[f'recall@{k}']:>7.3f}" for k in K_VALUES)
+                    + f"{r['mrr']:>7.3f}{r[f'ndcg@{max(K_VALUES)}']:>7.3f}"
+                    + ("" if r['deterministic'] else "  (rankings varied between passes)")
+                )
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'fixtures': str(fixtures_dir), 'embedding': fixtures['embedding'], 'results': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
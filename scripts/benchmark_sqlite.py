@@ -0,0 +1,191 @@
+"""
+Concurrency benchmark for the SQLite storage profile
+
+Runs concurrent writer and reader threads against a temporary database
+with three setups and reports throughput, latency and "database is locked"
+errors for each:
+
+- legacy: StaticPool, i.e. one connection shared by every thread. The
+  sqlite3 module is not safe to drive from several threads at once, so
+  access is serialized here, which is what it amounts to in practice.
+- pooled: a regular connection pool but default journal mode and pragmas.
+- tuned: the profile used by SQLiteDatabase (WAL, pragmas, pooled reads,
+  single writer).
+
+Usage:
+    python scripts/benchmark_sqlite.py --writers 4 --readers 8 --ops 200
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database.sqlite_db import SQLiteDatabase
+from app.models.database_models import Base, Interaction
+
+
+class UntunedDatabase:
+    """Default journal mode and pragmas, optionally one shared connection"""
+    
+    def __init__(self, db_path: str, shared_connection: bool):
+        engine_args = {"poolclass": StaticPool} if shared_connection else {}
+        self.engine = create_engine(
+            f"sqlite:///{db_path}",
+            connect_args={"check_same_thread": False},
+            **engine_args
+        )
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self._lock = threading.Lock() if shared_connection else None
+        Base.metadata.create_all(bind=self.engine)
+    
+    @contextmanager
+    def get_session(self):
+        if self._lock:
+            self._lock.acquire()
+        session = self.SessionLocal()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+            if self._lock:
+                self._lock.release()
+    
+    write_session = get_session
+    
+    def close(self):
+        self.engine.dispose()
+
+
+def make_interaction(worker: int, i: int) -> Interaction:
+    return Interaction(
+        session_id=f"bench-{worker}",
+        query="Java developer who can collaborate with business teams, 40 minutes",
+        query_type="jd_query",
+        intent="jd_query",
+        recommended_assessments=[{"url": f"https://example.com/{j}", "name": f"Test {j}"} for j in range(10)],
+        assessment_count=10,
+        processing_time=1.0,
+        supervisor_output={"execution_time": 0.5, "success": True},
+        rag_output={"execution_time": 1.5, "success": True},
+        success=1
+    )
+
+
+def run(db, writers: int, readers: int, ops: int) -> dict:
+    write_latencies, read_latencies = [], []
+    errors = {"locked": 0, "other": 0}
+    lock = threading.Lock()
+    
+    def record(bucket, latency):
+        with lock:
+            bucket.append(latency)
+    
+    def record_error(e):
+        with lock:
+            errors["locked" if "locked" in str(e) else "other"] += 1
+    
+    def writer(worker: int):
+        for i in range(ops):
+            start = time.perf_counter()
+            try:
+                with db.write_session() as session:
+                    session.add(make_interaction(worker, i))
+                record(write_latencies, time.perf_counter() - start)
+            except Exception as e:
+                record_error(e)
+    
+    def reader(worker: int):
+        for i in range(ops):
+            start = time.perf_counter()
+            try:
+                with db.get_session() as session:
+                    session.query(func.count(Interaction.id)).filter(
+                        Interaction.session_id == f"bench-{i % max(writers, 1)}"
+                    ).scalar()
+                record(read_latencies, time.perf_counter() - start)
+            except Exception as e:
+                record_error(e)
+    
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    threads += [threading.Thread(target=reader, args=(r,)) for r in range(readers)]
+    
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    
+    def summarize(latencies):
+        if not latencies:
+            return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0}
+        ordered = sorted(latencies)
+        return {
+            "count": len(ordered),
+            "p50_ms": statistics.median(ordered) * 1000,
+            "p95_ms": ordered[int(len(ordered) * 0.95) - 1] * 1000
+        }
+    
+    return {
+        "elapsed_s": elapsed,
+        "ops_per_s": (len(write_latencies) + len(read_latencies)) / elapsed,
+        "writes": summarize(write_latencies),
+        "reads": summarize(read_latencies),
+        "errors": errors
+    }
+
+
+def print_result(label: str, result: dict):
+    print(f"\n{label}")
+    print("-" * 60)
+    print(f"  Elapsed:     {result['elapsed_s']:.2f}s ({result['ops_per_s']:.0f} ops/s)")
+    for kind in ("writes", "reads"):
+        r = result[kind]
+        print(f"  {kind.capitalize():<12} {r['count']:>6} ok  p50={r['p50_ms']:.2f}ms  p95={r['p95_ms']:.2f}ms")
+    print(f"  Errors:      locked={result['errors']['locked']} other={result['errors']['other']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite concurrency benchmark")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=200, help="Operations per thread")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print(f"SQLite benchmark: {args.writers} writers, {args.readers} readers, {args.ops} ops/thread")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = UntunedDatabase(str(Path(tmp) / "legacy.db"), shared_connection=True)
+        print_result("Legacy (StaticPool, shared connection)", run(legacy, args.writers, args.readers, args.ops))
+        legacy.close()
+        
+        pooled = UntunedDatabase(str(Path(tmp) / "pooled.db"), shared_connection=False)
+        print_result("Pooled (default journal mode, no pragmas)", run(pooled, args.writers, args.readers, args.ops))
+        pooled.close()
+        
+        tuned = SQLiteDatabase(str(Path(tmp) / "tuned.db"))
+        tuned.initialize()
+        print_result("Tuned (WAL, pooled reads, single writer)", run(tuned, args.writers, args.readers, args.ops))
+        tuned.close()
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Local fixture HTTP server for offline scraper runs
+
+Serves catalog and detail pages in the SHL product catalog markup,
+generated from data/shl_assessments.json, so the scraper can be run and
+benchmarked without network access. Latency and transient failures can be
+injected to exercise concurrency, rate limiting and retries. Pages carry
+an ETag and answer conditional requests with 304 Not Modified.
+
+Usage:
+    python scripts/fixture_server.py --port 8765 --latency 0.2 --fail-rate 0.1
+    python scripts/scrap_catalog.py --catalog-url http://127.0.0.1:8765/products/product-catalog/ --output /tmp/out.json
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+
+CATALOG_PATH = "/products/product-catalog/"
+ITEMS_PER_PAGE = 12
+
+TEST_TYPE_KEYS = {
+    'Ability & Aptitude': 'A',
+    'Biodata & Situational Judgement': 'B',
+    'Competencies': 'C',
+    'Development & 360': 'D',
+    'Assessment Exercises': 'E',
+    'Knowledge & Skills': 'K',
+    'Personality & Behavior': 'P',
+    'Simulations': 'S'
+}
+
+
+def detail_path(assessment: Dict[str, Any]) -> str:
+    """Path of an assessment detail page"""
+    return urlsplit(assessment["url"]).path
+
+
+def _keys_html(test_types: List[str]) -> str:
+    return "".join(
+        f'<span class="product-catalogue__key">{TEST_TYPE_KEYS[t]}</span>'
+        for t in test_types if t in TEST_TYPE_KEYS
+    )
+
+
+def _circle(flag: str) -> str:
+    state = "-yes" if flag == "Yes" else "-no"
+    return f'<span class="catalogue__circle {state}"></span>'
+
+
+def build_catalog_page(assessments: List[Dict[str, Any]], start: int) -> str:
+    """Render one catalog listing page"""
+    page = assessments[start:start + ITEMS_PER_PAGE]
+    rows = "".join(
+        f'<tr data-entity-id="{start + i}">'
+        f'<td class="custom__table-heading__title"><a href="{detail_path(a)}">{html.escape(a["name"])}</a></td>'
+        f'<td class="custom__table-heading__general">{_circle(a.get("remote_support", "No"))}</td>'
+        f'<td class="custom__table-heading__general">{_circle(a.get("adaptive_support", "No"))}</td>'
+        f'<td class="product-catalogue__keys">{_keys_html(a.get("test_type", []))}</td>'
+        f'</tr>'
+        for i, a in enumerate(page)
+    )
+    pages = (len(assessments) + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
+    pagination = "".join(
+        f'<li class="pagination__item"><a class="pagination__link" '
+        f'href="{CATALOG_PATH}?start={(n - 1) * ITEMS_PER_PAGE}&type=1">{n}</a></li>'
+        for n in (1, 2, 3, pages) if n <= pages
+    )
+    return (
+        "<html><body>"
+        "<h3>Individual Test Solutions</h3>"
+        '<div class="custom__table-wrapper"><table>'
+        "<tr><th>Individual Test Solutions</th><th>Remote Testing</th><th>Adaptive/IRT</th><th>Test Type</th></tr>"
+        f"{rows}</table></div>"
+        f'<ul class="pagination">{pagination}</ul>'
+        "</body></html>"
+    )
+
+
+def build_detail_page(assessment: Dict[str, Any]) -> str:
+    """Render one assessment detail page"""
+    duration = assessment.get("duration")
+    length = f"Approximate Completion Time in minutes = {duration}" if duration is not None else "Untimed"
+    return (
+        "<html><body>"
+        f"<h1>{html.escape(assessment['name'])}</h1>"
+        f"<h4>Description</h4><p>{html.escape(assessment.get('description') or '')}</p>"
+        f"<h4>Job levels</h4><p>{html.escape(assessment.get('job_levels') or '')}</p>"
+        f"<h4>Languages</h4><p>{html.escape(assessment.get('languages') or '')}</p>"
+        '<div class="product-catalogue-training-calendar__row">'
+        f"<h4>Assessment length</h4><p>{length}</p></div>"
+        f'<p class="product-catalogue__small-text">Test Type: {_keys_html(assessment.get("test_type", []))}</p>'
+        "</body></html>"
+    )
+
+
+def make_handler(assessments: List[Dict[str, Any]], latency: float, fail_rate: float):
+    """Build a request handler bound to a fixture dataset"""
+    details = {detail_path(a): a for a in assessments}
+    counters = {"requests": 0, "failures": 0, "not_modified": 0}
+    lock = threading.Lock()
+    
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        
+        def log_message(self, format, *args):
+            pass
+        
+        def _send(self, status: int, body: str = ""):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        
+        def _send_page(self, body: str):
+            """Send a page with an ETag, answering 304 when it matches"""
+            etag = '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                with lock:
+                    counters["not_modified"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                return self.end_headers()
+            
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(data)
+        
+        def do_GET(self):
+            with lock:
+                counters["requests"] += 1
+            if latency:
+                time.sleep(latency)
+            if fail_rate and random.random() < fail_rate:
+                with lock:
+                    counters["failures"] += 1
+                return self._send(503, "Service Unavailable")
+            
+            parts = urlsplit(self.path)
+            if parts.path == CATALOG_PATH:
+                start = int(parse_qs(parts.query).get("start", ["0"])[0])
+                return self._send_page(build_catalog_page(assessments, start))
+            if parts.path in details:
+                return self._send_page(build_detail_page(details[parts.path]))
+            return self._send(404, "Not Found")
+    
+    FixtureHandler.counters = counters
+    return FixtureHandler
+
+
+def load_fixture_assessments(path: str = None) -> List[Dict[str, Any]]:
+    """Load the assessments the fixture pages are rendered from"""
+    with open(path or settings.ASSESSMENTS_JSON_PATH, "r", encoding="utf-8") as f:
+        return list(json.load(f).values())
+
+
+def start_fixture_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.0,
+    fail_rate: float = 0.0,
+    assessments: List[Dict[str, Any]] = None
+) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the fixture server in a background thread
+    
+    Returns:
+        The server (call shutdown() when done) and its catalog URL
+    """
+    handler = make_handler(assessments or load_fixture_assessments(), latency, fail_rate)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    catalog_url = f"http://{host}:{server.server_address[1]}{CATALOG_PATH}"
+    return server, catalog_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve SHL catalog fixtures locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--data", default=None, help="Assessments JSON to render")
+    args = parser.parse_args()
+    
+    assessments = load_fixture_assessments(args.data)
+    handler = make_handler(assessments, args.latency, args.fail_rate)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Serving {len(assessments)} assessments at http://{args.host}:{args.port}{CATALOG_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,11 +12,12 @@ async def initialize_vector_store():
         vector_store = get_vector_store_service()
         count = vector_store.chroma_manager.count_documents()
         
-        if count > 0:
+        if count > 0 and not settings.CATALOG_SYNC_ON_STARTUP:
             logger.info(f"Vector store already initialized with {count} documents")
             return
         
-        logger.info("Vector store is empty, initializing with data...")
+        if count == 0:
+            logger.info("Vector store is empty, initializing with data...")
         assessments_path = Path(settings.ASSESSMENTS_JSON_PATH)
         
         if not assessments_path.exists():
@@ -33,6 +34,11 @@ async def initialize_vector_store():
         
         logger.info(f"Loading {len(assessments)} assessments from JSON")
         
+        if count > 0:
+            result = await vector_store.sync_assessments(assessments, source="startup")
+            logger.info(f"Vector store synced with {len(assessments)} assessments: {result}")
+            return
+        
         indexed_count = await vector_store.index_assessments(assessments)
         
         logger.info(f"Successfully indexed {indexed_count} assessments")
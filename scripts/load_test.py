@@ -0,0 +1,223 @@
+"""
+Load test for the /recommend endpoint
+
+Virtual users send /recommend requests back to back (plus --think-time)
+for --duration seconds after a --warmup period, cycling through the queries
+of the given datasets. Reports p50/p95/p99 latency, requests per second and
+errors for every combination of worker count and user count.
+
+With --workers the script starts the API itself for each worker count
+(uvicorn app.main:app --workers N) with MODEL_PROVIDER=--provider, stub by
+default, so no OpenAI key or network is needed and the numbers measure the
+service's own overhead on top of the synthetic model latency
+(--llm-latency-ms, --embedding-latency-ms). Use --provider replay with a
+recorded cassette (MODEL_PROVIDER=record during a normal run) to replay real
+responses. Without --workers, --api-url is targeted as is.
+
+Usage:
+    python scripts/load_test.py --workers 1,2,4 --users 8,32 --duration 30
+    python scripts/load_test.py --workers 2 --provider replay --llm-latency-ms 0
+    python scripts/load_test.py --api-url http://localhost:8000 --users 1,8
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from evaluation import load_dataset
+
+DEFAULT_DATASETS = ["./data/labeled_train_set.json", "./data/Test-Set.json"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+async def run_load(
+    api_url: str,
+    queries: List[str],
+    users: int,
+    duration: float,
+    warmup: float,
+    think_time: float,
+    timeout: float
+) -> Dict[str, Any]:
+    """
+    Run virtual users against /recommend
+    
+    Args:
+        api_url: API base URL
+        queries: Queries to cycle through
+        users: Concurrent virtual users
+        duration: Measured seconds
+        warmup: Unmeasured seconds before the measurement starts
+        think_time: Pause between a user's requests, in seconds
+        timeout: Request timeout in seconds
+    
+    Returns:
+        Latency percentiles, throughput and error counts
+    """
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    next_query = itertools.cycle(queries).__next__
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+    
+    async def user(client: httpx.AsyncClient):
+        while time.perf_counter() < stop_at:
+            sent = time.perf_counter()
+            try:
+                response = await client.post(f"{api_url}/recommend", json={"query": next_query()})
+                error = None if response.status_code == 200 else f"HTTP {response.status_code}"
+            except httpx.HTTPError as e:
+                error = type(e).__name__
+            done = time.perf_counter()
+            if sent >= measure_from and done <= stop_at:
+                if error:
+                    errors[error] = errors.get(error, 0) + 1
+                else:
+                    latencies.append(done - sent)
+            if think_time:
+                await asyncio.sleep(think_time)
+    
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        await asyncio.gather(*(user(client) for _ in range(users)))
+    
+    completed = len(latencies)
+    return {
+        'users': users,
+        'requests': completed,
+        'errors': errors,
+        'rps': completed / duration,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': max(latencies) * 1000 if latencies else 0.0
+    }
+
+
+def start_server(workers: int, port: int, args: argparse.Namespace) -> subprocess.Popen:
+    """Start the API with uvicorn and wait for /health"""
+    env = {
+        **os.environ,
+        'MODEL_PROVIDER': args.provider,
+        'MODEL_STUB_LLM_LATENCY_MS': str(args.llm_latency_ms),
+        'MODEL_STUB_EMBEDDING_LATENCY_MS': str(args.embedding_latency_ms),
+        'MODEL_REPLAY_RECORDED_LATENCY': 'false' if args.llm_latency_ms_set else 'true',
+        'CATALOG_SYNC_ON_STARTUP': 'false'
+    }
+    if not args.keep_rate_limit:
+        env['RATE_LIMIT_CALLS'] = str(10 ** 9)
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning"
+        ],
+        env=env,
+        cwd=str(Path(__file__).parent.parent)
+    )
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API exited during startup with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=2).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    stop_server(process)
+    raise RuntimeError(f"API did not become healthy within {args.startup_timeout}s")
+
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def parse_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/recommend load test")
+    parser.add_argument("--api-url", default="http://localhost:8000", help="API to target when --workers is not given")
+    parser.add_argument("--workers", help="Comma-separated uvicorn worker counts; starts the API for each")
+    parser.add_argument("--users", default="1,8,32", help="Comma-separated concurrent user counts")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before each run")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds between a user's requests")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Request timeout in seconds")
+    parser.add_argument("--data", action="append", help="Dataset(s) to take queries from (repeatable)")
+    parser.add_argument("--provider", default="stub", choices=["stub", "replay", "openai"], help="MODEL_PROVIDER for started APIs")
+    parser.add_argument("--llm-latency-ms", type=float, help="Synthetic LLM latency (default: recorded, or 800)")
+    parser.add_argument("--embedding-latency-ms", type=float, default=150.0, help="Synthetic embedding latency")
+    parser.add_argument("--port", type=int, default=8765, help="Port for started APIs")
+    parser.add_argument("--startup-timeout", type=float, default=120.0, help="Seconds to wait for a started API")
+    parser.add_argument("--keep-rate-limit", action="store_true", help="Keep the API rate limit on started APIs")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    args.llm_latency_ms_set = args.llm_latency_ms is not None
+    if args.llm_latency_ms is None:
+        args.llm_latency_ms = 800.0
+    
+    queries = [query for path in (args.data or DEFAULT_DATASETS) for query, _ in load_dataset(path)]
+    if not queries:
+        print("No queries loaded")
+        return 1
+    user_counts = parse_list(args.users)
+    
+    results = []
+    print(f"{len(queries)} queries, {args.duration:.0f}s per run after {args.warmup:.0f}s warm-up")
+    print(f"{'workers':>8}{'users':>7}{'requests':>10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}  errors")
+    for workers in (parse_list(args.workers) if args.workers else [None]):
+        process: Optional[subprocess.Popen] = None
+        api_url = args.api_url
+        if workers is not None:
+            process = start_server(workers, args.port, args)
+            api_url = f"http://127.0.0.1:{args.port}"
+        try:
+            for users in user_counts:
+                r = asyncio.run(run_load(api_url, queries, users, args.duration, args.warmup, args.think_time, args.timeout))
+                r['workers'] = workers
+                results.append(r)
+                print(
+                    f"{workers if workers is not None else '-':>8}{users:>7}{r['requests']:>10}{r['rps']:>9.1f}"
+                    f"{r['p50_ms']:>9.0f}{r['p95_ms']:>9.0f}{r['p99_ms']:>9.0f}{r['max_ms']:>9.0f}  "
+                    f"{', '.join(f'{k}: {v}' for k, v in r['errors'].items()) or '-'}"
+                )
+        finally:
+            if process is not None:
+                stop_server(process)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'provider': args.provider, 'results': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
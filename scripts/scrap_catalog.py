@@ -6,41 +6,78 @@ and saves them to a JSON file.
 
 Usage:
     python scripts/scrape_catalog.py
+    python scripts/scrape_catalog.py --concurrency 16 --rate-limit 10
+    python scripts/scrape_catalog.py --sync-index
+    python scripts/scrape_catalog.py --full
+    python scripts/scrape_catalog.py --sync-index --allow-partial
+    python scripts/scrape_catalog.py --catalog-url http://127.0.0.1:8765/products/product-catalog/ --output /tmp/out.json
 """
 
+import argparse
 import asyncio
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.services.scraper_service import get_scraper_service
+from app.services.scraper_service import ScraperService, get_scraper_service
+from app.services.parse_executor import start_parse_executor, stop_parse_executor
 from app.config import settings
 from app.utils.logger import get_logger
 
 logger = get_logger("scrape_script")
 
 
-async def main():
+async def main(args):
     logger.info("=" * 60)
     logger.info("SHL Assessment Catalog Scraper")
     logger.info("=" * 60)
     
     try:
-        scraper = get_scraper_service()
+        if args.catalog_url or args.concurrency or args.rate_limit:
+            scraper = ScraperService(
+                catalog_url=args.catalog_url,
+                concurrency=args.concurrency,
+                rate_limit=args.rate_limit
+            )
+        else:
+            scraper = get_scraper_service()
         logger.info("Starting catalog scraping...")
-        assessments = await scraper.scrape_all_tests()
+        await start_parse_executor()
+        try:
+            assessments = await scraper.scrape_all_tests(incremental=not args.full)
+        finally:
+            await stop_parse_executor()
         
         if not assessments:
             logger.error("No assessments scraped!")
             return 1
         
-        output_file = settings.ASSESSMENTS_JSON_PATH
+        if not scraper.last_scrape_complete and not args.allow_partial:
+            logger.error(
+                f"Listing pages {scraper.failed_listing_pages} failed; not overwriting the catalog "
+                f"or syncing the index (re-run, or pass --allow-partial to add/update only)"
+            )
+            return 1
+        
+        output_file = args.output or settings.ASSESSMENTS_JSON_PATH
         logger.info(f"Saving {len(assessments)} assessments to {output_file}...")
-        scraper.save_to_json(assessments, output_file)
+        if scraper.last_scrape_complete:
+            written = scraper.save_to_json(assessments, output_file)
+        else:
+            previous = scraper.load_from_json(output_file)
+            written = scraper.save_to_json({**previous, **assessments}, output_file)
         logger.info("Scraping completed successfully!")
         logger.info(f"Total assessments: {len(assessments)}")
-        logger.info(f"Output file: {output_file}")
+        logger.info(f"Output file: {output_file}{'' if written else ' (unchanged)'}")
+        
+        if args.sync_index:
+            from app.services.vector_store_service import get_vector_store_service
+            result = await get_vector_store_service().sync_assessments(
+                assessments,
+                prune=scraper.last_scrape_complete
+            )
+            logger.info(f"Vector store sync: {result}")
         
         return 0
         
@@ -50,5 +87,17 @@ async def main():
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Scrape the SHL assessment catalog")
+    parser.add_argument("--catalog-url", default=None, help="Catalog URL (e.g. a local fixture server)")
+    parser.add_argument("--concurrency", type=int, default=None, help="Maximum requests in flight")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second")
+    parser.add_argument("--output", default=None, help="Output JSON path")
+    parser.add_argument("--full", action="store_true", help="Ignore stored ETags/hashes and re-fetch everything")
+    parser.add_argument("--sync-index", action="store_true", help="Upsert/delete changed assessments in the vector store")
+    parser.add_argument(
+        "--allow-partial",
+        action="store_true",
+        help="Keep going when listing pages fail: merge into the existing catalog and skip index deletions"
+    )
+    exit_code = asyncio.run(main(parser.parse_args()))
     sys.exit(exit_code)
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""
+Maintenance vacuum of the sessions database
+
+Converts a database created before auto_vacuum=INCREMENTAL was enabled
+with a full VACUUM, then releases free pages. The full VACUUM rewrites the
+whole file and holds the writer lock until it is done, so run it while the
+API is stopped or idle. Databases that are already INCREMENTAL only get the
+regular incremental vacuum.
+
+Usage:
+    python scripts/vacuum_database.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.retention_service import get_retention_service
+from app.utils.logger import get_logger
+
+logger = get_logger("vacuum_script")
+
+
+def main() -> int:
+    try:
+        released = get_retention_service().vacuum(convert=True)
+    except Exception as e:
+        logger.error(f"Vacuum failed: {e}")
+        return 1
+    
+    logger.info(f"Vacuum complete, {released} pages released")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
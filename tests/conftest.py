@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Settings are read at import time; keep test runs out of the working tree
+_tmp = tempfile.mkdtemp(prefix="shl-tests-")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("REFRESH_API_KEY", "test")
+os.environ.setdefault("MODEL_PROVIDER", "stub")
+os.environ.setdefault("SQLITE_DB_PATH", os.path.join(_tmp, "sessions.db"))
+os.environ.setdefault("CHROMA_DB_PATH", os.path.join(_tmp, "chroma"))
+os.environ.setdefault("LOG_FILE", os.path.join(_tmp, "app.log"))
+os.environ.setdefault("RETENTION_ARCHIVE_DIR", os.path.join(_tmp, "archive"))
+os.environ.setdefault("TRACE_EXPORT_PATH", "")
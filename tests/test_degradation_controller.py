@@ -0,0 +1,32 @@
+from app.services.degradation_controller import DegradationController
+
+
+def test_disabled_by_default():
+    assert not DegradationController().enabled
+
+
+def test_slow_llm_alone_does_not_degrade():
+    controller = DegradationController(enabled=True, max_in_flight=16, llm_latency_target=5.0, latency_min_in_flight=4)
+    controller.observe_llm_latency(20.0)
+    
+    assert controller.begin_request()['mode'] == "normal"
+    controller.end_request()
+    
+    for _ in range(4):
+        controller.begin_request()
+    assert controller.evaluate() > 0
+
+
+def test_latency_window_stays_bounded(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.services.degradation_controller.time.monotonic", lambda: clock[0])
+    
+    disabled = DegradationController(enabled=False)
+    disabled.observe_llm_latency(1.0)
+    assert not disabled._llm_latencies
+    
+    controller = DegradationController(enabled=True, window=30.0)
+    for _ in range(100):
+        controller.observe_llm_latency(1.0)
+        clock[0] += 1.0
+    assert len(controller._llm_latencies) <= 31
@@ -0,0 +1,43 @@
+import asyncio
+import sqlite3
+from sqlalchemy.exc import OperationalError
+from app.services.interaction_writer import InteractionWriter
+from app.services.session_service import get_session_service
+
+
+def test_bad_record_only_drops_itself(monkeypatch):
+    saved = []
+    
+    def save_interactions_batch(records):
+        if any(record["query"] == "bad" for record in records):
+            raise ValueError("unserializable agent output")
+        saved.extend(record["query"] for record in records)
+        return len(records)
+    
+    monkeypatch.setattr(get_session_service(), "save_interactions_batch", save_interactions_batch)
+    writer = InteractionWriter(batch_size=10)
+    queries = ["q0", "q1", "bad", "q3", "q4", "q5", "bad", "q7"]
+    
+    asyncio.run(writer._flush([{"session_id": "s", "query": query} for query in queries]))
+    
+    assert sorted(saved) == sorted(query for query in queries if query != "bad")
+    assert writer.written_count == 6
+    assert writer.failed_count == 2
+    assert writer.flush_count == 1
+
+
+def test_unavailable_database_drops_batch_without_splitting(monkeypatch):
+    attempts = []
+    
+    def save_interactions_batch(records):
+        attempts.append(len(records))
+        raise OperationalError("INSERT INTO interactions", {}, sqlite3.OperationalError("database is locked"))
+    
+    monkeypatch.setattr(get_session_service(), "save_interactions_batch", save_interactions_batch)
+    writer = InteractionWriter(batch_size=50)
+    
+    asyncio.run(writer._flush([{"session_id": "s", "query": f"q{i}"} for i in range(50)]))
+    
+    assert attempts == [50]
+    assert writer.failed_count == 50
+    assert writer.written_count == 0
@@ -0,0 +1,35 @@
+import asyncio
+from app.agents.jd_extractor_agent import JDExtractorAgent
+
+JAVA_URL = "https://www.shl.com/products/product-catalog/view/java-8-new/"
+
+
+def test_catalog_links_are_resolved_through_the_catalog_cache(monkeypatch):
+    agent = JDExtractorAgent()
+    looked_up = []
+    
+    async def get_assessment_by_url(url):
+        looked_up.append(url)
+        if url == JAVA_URL:
+            return {"name": "Java 8 (New)", "url": url, "description": "Measures Java 8 knowledge.",
+                    "test_type": ["Knowledge & Skills"], "job_levels": "Mid-Professional,", "duration": 18}
+        return None
+    
+    async def fetch_jd_from_urls(urls, deadline=None):
+        assert urls == ["https://jobs.acme.com/123"]
+        return {"success": True, "jd_text": "Backend engineer", "source_urls": urls, "error_message": None}
+    
+    monkeypatch.setattr(agent.vector_store, "get_assessment_by_url", get_assessment_by_url)
+    monkeypatch.setattr(agent.jd_fetcher, "fetch_jd_from_urls", fetch_jd_from_urls)
+    
+    state = asyncio.run(agent._fetch_jd(
+        {"query": "like this"},
+        ["https://www.shl.com/solutions/products/product-catalog/view/java-8-new", "https://jobs.acme.com/123"]
+    ))
+    
+    assert looked_up == [JAVA_URL]
+    assert state["jd_extraction_success"]
+    assert state["jd_source_urls"] == [JAVA_URL, "https://jobs.acme.com/123"]
+    assert state["jd_text"].startswith("Assessment: Java 8 (New)\nMeasures Java 8 knowledge.")
+    assert "Job levels: Mid-Professional" in state["jd_text"]
+    assert state["jd_text"].endswith("Backend engineer")
@@ -0,0 +1,23 @@
+import asyncio
+import pytest
+from app.services.jd_fetcher_service import JDFetcherService
+from app.utils.validators import canonicalize_url
+
+
+def test_canonicalize_url_keeps_unparseable_urls():
+    assert canonicalize_url(" http://host:99999/jobs ") == "http://host:99999/jobs"
+    assert canonicalize_url("HTTPS://Jobs.Example.com:443/a?utm_source=x&b=1#top") == "https://jobs.example.com/a?b=1"
+
+
+@pytest.mark.parametrize("url", ["http://host:99999/", "http://[::1/job"])
+def test_malformed_url_is_a_failed_fetch(url):
+    async def fetch():
+        fetcher = JDFetcherService()
+        try:
+            return await fetcher.fetch_jd_from_urls([url], deadline=5.0)
+        finally:
+            await fetcher.close()
+    
+    result = asyncio.run(fetch())
+    assert result["success"] is False
+    assert result["error_message"]
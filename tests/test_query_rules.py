@@ -0,0 +1,22 @@
+import pytest
+from app.utils.query_rules import extract_query_rules
+from evaluation import RULE_GUARD_QUERIES
+
+
+@pytest.mark.parametrize("query", RULE_GUARD_QUERIES)
+def test_negated_queries_get_zero_confidence(query):
+    rules = extract_query_rules(query)
+    assert rules["confidence"] == 0.0
+    assert "negation" in rules["reasons"]
+
+
+@pytest.mark.parametrize("query, minutes", [
+    ("Java developer, no more than 30 minutes", 30),
+    ("Java developer, not to exceed 40 minutes", 40),
+    ("Python developer, no longer than an hour", 60)
+])
+def test_negated_time_limits_stay_on_rules(query, minutes):
+    rules = extract_query_rules(query)
+    assert rules["extracted_duration"] == minutes
+    assert "negation" not in rules["reasons"]
+    assert rules["confidence"] == 1.0
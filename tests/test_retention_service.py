@@ -0,0 +1,88 @@
+import importlib
+import sqlite3
+import threading
+import pytest
+from sqlalchemy import text
+from app.database.sqlite_db import SQLiteDatabase
+from app.models.database_models import Interaction
+from app.services.retention_service import RetentionService
+
+retention_module = importlib.import_module("app.services.retention_service")
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    database = SQLiteDatabase(str(tmp_path / "sessions.db"))
+    database.initialize()
+    monkeypatch.setattr(retention_module, "db_manager", database)
+    yield database
+    database.close()
+
+
+def run_with_timeout(func, timeout: float = 10.0):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", func()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "compact_payloads did not finish"
+    return result["value"]
+
+
+def test_compact_payloads_finishes_with_none_rows(db):
+    with db.write_session() as session:
+        session.add_all([
+            Interaction(session_id="general", query="what is verify?", recommended_assessments=None),
+            Interaction(session_id="empty", query="java developer", recommended_assessments=[]),
+            Interaction(session_id="jd", query="java developer", recommended_assessments=[{"name": "Java 8"}])
+        ])
+    with db.write_session() as session:
+        # Row written before None was stored as SQL NULL
+        session.execute(text(
+            "INSERT INTO interactions (session_id, timestamp, query, recommended_assessments) "
+            "VALUES ('legacy', CURRENT_TIMESTAMP, 'hello', 'null')"
+        ))
+    
+    service = RetentionService(batch_size=1)
+    assert run_with_timeout(service.compact_payloads) == 2
+    assert run_with_timeout(service.compact_payloads) == 0
+    
+    with db.get_session() as session:
+        rows = {row.session_id: row for row in session.query(Interaction).all()}
+        assert rows["jd"].recommendation_payload_id is not None
+        assert rows["empty"].recommendation_payload_id is None
+        stored = session.execute(text("SELECT recommended_assessments FROM interactions WHERE session_id = 'general'")).scalar()
+        assert stored is None
+
+
+def test_vacuum_conversion_needs_flag_and_writer_lock(tmp_path, monkeypatch):
+    path = tmp_path / "legacy.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE legacy (id INTEGER PRIMARY KEY)")
+    database = SQLiteDatabase(str(path))
+    database.initialize()
+    monkeypatch.setattr(retention_module, "db_manager", database)
+    service = RetentionService()
+    
+    def auto_vacuum():
+        with sqlite3.connect(path) as conn:
+            return conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    
+    assert service.vacuum() == 0
+    assert auto_vacuum() == 0
+    
+    database._write_lock.acquire()
+    thread = threading.Thread(target=service.vacuum, kwargs={"convert": True}, daemon=True)
+    thread.start()
+    thread.join(0.5)
+    assert thread.is_alive(), "full VACUUM ran without the writer lock"
+    database._write_lock.release()
+    thread.join(10)
+    
+    assert not thread.is_alive()
+    assert auto_vacuum() == 2
+    database.close()
+
+
+def test_new_database_uses_incremental_auto_vacuum(db, tmp_path):
+    with sqlite3.connect(tmp_path / "sessions.db") as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
@@ -0,0 +1,63 @@
+import asyncio
+from app.services.scraper_service import ScraperService
+
+
+def listing(start: int):
+    tests = [{"url": f"https://example.com/view/test-{start + i}/", "name": f"Test {start + i}"} for i in range(12)]
+    return {"max_page": 3, "tests": tests}
+
+
+def test_failed_listing_page_marks_scrape_incomplete(monkeypatch):
+    scraper = ScraperService(catalog_url="https://example.com/products/product-catalog/")
+    
+    async def scrape_listing(start, states, new_states):
+        return None if start == 12 else listing(start)
+    
+    async def scrape_details(url, states, new_states):
+        return {}
+    
+    monkeypatch.setattr(scraper, "_scrape_listing", scrape_listing)
+    monkeypatch.setattr(scraper, "_scrape_details", scrape_details)
+    monkeypatch.setattr(scraper, "load_page_states", lambda: {})
+    monkeypatch.setattr(scraper, "save_page_states", lambda states: None)
+    
+    tests = asyncio.run(scraper.scrape_all_tests())
+    
+    assert len(tests) == 24
+    assert scraper.failed_listing_pages == [2]
+    assert not scraper.last_scrape_complete
+
+
+class BrokenListingParser:
+    """Parse executor whose parse of the second listing page raises"""
+    
+    async def parse_catalog_page(self, content, base_url):
+        if content == b"page-12":
+            raise ValueError("unexpected markup")
+        start = int(content.decode().split("-")[1])
+        return listing(start)
+    
+    async def parse_test_details(self, content):
+        return {}
+
+
+def test_listing_page_parse_error_marks_scrape_incomplete(monkeypatch):
+    scraper = ScraperService(catalog_url="https://example.com/products/product-catalog/")
+    saved = {}
+    
+    async def fetch_conditional(url, state):
+        start = url.split("start=")[1].split("&")[0] if "start=" in url else "0"
+        return "changed", f"page-{start}".encode(), {"url": url, "content_hash": url, "payload": None}
+    
+    monkeypatch.setattr(scraper, "parse_executor", BrokenListingParser())
+    monkeypatch.setattr(scraper, "fetch_conditional", fetch_conditional)
+    monkeypatch.setattr(scraper, "load_page_states", lambda: {})
+    monkeypatch.setattr(scraper, "save_page_states", lambda states: saved.update(states))
+    
+    tests = asyncio.run(scraper.scrape_all_tests())
+    
+    assert len(tests) == 24
+    assert scraper.failed_listing_pages == [2]
+    assert not scraper.last_scrape_complete
+    assert scraper._catalog_page_url(12) not in saved
+    assert scraper._catalog_page_url(0) in saved
@@ -0,0 +1,19 @@
+import json
+from app.utils.tracing import Tracer
+
+
+def test_traces_are_written_by_the_exporter_thread(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(export_path=str(path))
+    
+    for i in range(3):
+        with tracer.span("recommend", session_id=f"s{i}"):
+            with tracer.span("retrieval"):
+                pass
+    tracer.exporter.close()
+    
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    assert all(json.loads(line)["resourceSpans"] for line in lines)
+    assert tracer.get_metrics()["exported"] == 3
+    assert not tracer.exporter._thread